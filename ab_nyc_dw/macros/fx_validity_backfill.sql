@@ -0,0 +1,37 @@
+{#
+  pre_hook de dim_exchange_rate: migra en su lugar una tabla creada antes de
+  las vigencias as-of (sin valid_from/valid_to, o con filas en NULL porque
+  on_schema_change agregó las columnas). Calcula la vigencia de esas filas con
+  lead() sobre todo el histórico de {{ this }} —stg_banxico solo trae el
+  archivo vigente, así que un --full-refresh perdería la historia— y crea el
+  índice por rango (dbt solo lo crea al construir la tabla).
+  Sin filas pendientes no emite SQL.
+#}
+
+{% macro fx_validity_backfill() %}
+  {%- set current = load_relation(this) if execute else none -%}
+  {%- if current is not none -%}
+    {%- set cols = adapter.get_columns_in_relation(current) | map(attribute='name') | list -%}
+    {%- set pending = 'valid_to' not in cols -%}
+    {%- if not pending -%}
+      {%- set pending = run_query('select 1 from ' ~ current ~ ' where valid_to is null limit 1').rows | length > 0 -%}
+    {%- endif -%}
+    {%- if pending -%}
+  alter table {{ current }} add column if not exists valid_from date, add column if not exists valid_to date;
+  update {{ current }} t
+  set valid_from = x.valid_from,
+      valid_to   = x.valid_to
+  from (
+    select
+      rate_date,
+      rate_date                                                               as valid_from,
+      coalesce(lead(rate_date) over (order by rate_date), '9999-12-31'::date) as valid_to
+    from {{ current }}
+  ) x
+  where t.rate_date = x.rate_date
+    and t.valid_to is null;
+  create index if not exists {{ current.identifier }}_valid_from_valid_to_idx
+    on {{ current }} (valid_from, valid_to);
+    {%- endif -%}
+  {%- endif -%}
+{% endmacro %}
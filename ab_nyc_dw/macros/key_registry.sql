@@ -0,0 +1,92 @@
+{#
+  Registros de llaves (models/silver/keys/kr_*.sql): mapeo persistente
+  llave natural → llave subrogada bigint, solo-append.
+
+  - Cada corrida agrega únicamente las llaves naturales nuevas, numeradas a
+    partir del máximo vigente; una llave ya asignada no cambia nunca.
+  - Los modelos kr_* se configuran con full_refresh=false: un
+    `dbt build --full-refresh` no los renumera.
+  - Las llaves naturales NULL no se registran (el hecho queda con llave NULL,
+    igual que antes no encontraba su fila en la dimensión).
+#}
+
+{% macro key_registry(key_column, natural_key, relations) %}
+  {%- set cols = natural_key | join(', ') -%}
+with src as (
+  {%- for rel in relations %}
+  select distinct {{ cols }}
+  from {{ rel }}
+  where {% for c in natural_key %}{{ c }} is not null{% if not loop.last %} and {% endif %}{% endfor %}
+  {%- if not loop.last %}
+  union
+  {%- endif %}
+  {%- endfor %}
+),
+
+new_keys as (
+  select s.*
+  from src s
+  {%- if is_incremental() %}
+  where not exists (
+    select 1 from {{ this }} t
+    where {% for c in natural_key %}t.{{ c }} = s.{{ c }}{% if not loop.last %} and {% endif %}{% endfor %}
+  )
+  {%- endif %}
+)
+
+select
+  (
+    {%- if is_incremental() %}(select coalesce(max({{ key_column }}), 0) from {{ this }}){% else %}0{% endif %}
+    + row_number() over (order by {{ cols }})
+  )::bigint              as {{ key_column }},
+  {{ cols }},
+  current_timestamp      as registered_at
+from new_keys
+{% endmacro %}
+
+
+{% macro md5_key_compat(natural_key, key_column) %}
+  {#- Columna <llave>_md5 (llave md5 de versiones anteriores) si var('surrogate_key_md5') -#}
+  {%- if var('surrogate_key_md5', false) -%}
+  {{ dbt_utils.generate_surrogate_key(natural_key) }} as {{ key_column }}_md5,
+  {%- endif -%}
+{% endmacro %}
+
+
+{% macro md5_key_columns(relation, rekey) %}
+  {#- Columnas de `rekey` que en relation siguen siendo texto (llaves md5 de versiones anteriores) -#}
+  {%- set found = [] -%}
+  {%- for c in relation_column_types(relation) -%}
+    {%- set parts = c.split(' ', 1) -%}
+    {%- if parts[0] in rekey and (parts[1] == 'text' or parts[1].startswith('character')) -%}
+      {%- do found.append(parts[0]) -%}
+    {%- endif -%}
+  {%- endfor -%}
+  {{ return(found) }}
+{% endmacro %}
+
+
+{% macro md5_rekey_select(relation, columns, rekey, md5_columns) %}
+  {#-
+    Select de relation con las llaves md5 de md5_columns traducidas a la
+    llave bigint del registro (rekey: columna → modelo kr_*). La llave md5 se
+    recalcula con generate_surrogate_key sobre la llave natural del registro
+    (sus columnas salvo la llave y registered_at, en el mismo orden).
+  -#}
+select
+  {%- for c in columns %}
+  {% if c in md5_columns %}k_{{ c }}.{{ c }}{% else %}t.{{ c }}{% endif %}{% if not loop.last %},{% endif %}
+  {%- endfor %}
+from {{ relation }} t
+  {%- for c in md5_columns %}
+    {%- set registry = ref(rekey[c]) -%}
+    {%- set natural_key = [] -%}
+    {%- for col in adapter.get_columns_in_relation(registry) -%}
+      {%- if col.name not in (c, 'registered_at') -%}
+        {%- do natural_key.append('k_' ~ c ~ '.' ~ col.name) -%}
+      {%- endif -%}
+    {%- endfor %}
+left join {{ registry }} k_{{ c }}
+  on {{ dbt_utils.generate_surrogate_key(natural_key) }} = t.{{ c }}
+  {%- endfor %}
+{% endmacro %}
@@ -0,0 +1,189 @@
+{#
+  Materialización `partitioned_incremental` (Postgres):
+  tabla con particionado nativo RANGE por una llave entera YYYYMMDD
+  (p.ej. snapshot_date_key), una partición por día (o por mes).
+
+  - Cada corrida construye el resultado del modelo en una tabla temporal y
+    REEMPLAZA solo las particiones de las llaves que trae: TRUNCATE de la
+    partición diaria (o DELETE de esas llaves dentro de la partición mensual)
+    + INSERT. El resto del histórico no se toca ni se escanea.
+  - Particiones creadas bajo demanda: <modelo>_pYYYYMMDD / <modelo>_pYYYYMM.
+  - ANALYZE de las particiones tocadas.
+  - Si la tabla existe pero NO está particionada (versiones anteriores), se
+    migra una vez conservando el histórico.
+  - Llaves md5 (texto) de versiones anteriores en las columnas de
+    `rekey_md5`: se migran una vez a la llave bigint del registro kr_*
+    (md5_rekey_select en macros/key_registry.sql), conservando el histórico.
+  - Otros cambios de columnas (nombre o tipo) → error: correr con --full-refresh.
+
+  Config:
+    partition_by          columna llave (int YYYYMMDD)      [requerido]
+    partition_granularity 'day' (default) | 'month'
+    indexes               como en table/incremental (índices particionados)
+    rekey_md5             {columna llave: modelo kr_*} para migrar llaves md5
+#}
+
+{% macro partition_bounds(key, granularity) %}
+  {%- set d = modules.datetime.datetime.strptime(key | string, '%Y%m%d') -%}
+  {%- if granularity == 'month' -%}
+    {%- set lo = d.replace(day=1) -%}
+    {%- set hi = (lo + modules.datetime.timedelta(days=32)).replace(day=1) -%}
+    {%- set suffix = lo.strftime('%Y%m') -%}
+  {%- else -%}
+    {%- set lo = d -%}
+    {%- set hi = d + modules.datetime.timedelta(days=1) -%}
+    {%- set suffix = lo.strftime('%Y%m%d') -%}
+  {%- endif -%}
+  {{ return({'suffix': suffix, 'from': lo.strftime('%Y%m%d'), 'to': hi.strftime('%Y%m%d')}) }}
+{% endmacro %}
+
+
+{% macro relation_column_types(relation) %}
+  {#- [(columna, tipo)] en orden físico; sirve también para tablas temporales -#}
+  {%- set res = run_query(
+        "select attname, format_type(atttypid, atttypmod) from pg_attribute"
+        ~ " where attrelid = '" ~ relation ~ "'::regclass and attnum > 0 and not attisdropped"
+        ~ " order by attnum") -%}
+  {%- set cols = [] -%}
+  {%- for row in res.rows -%}
+    {%- do cols.append(row[0] ~ ' ' ~ row[1]) -%}
+  {%- endfor -%}
+  {{ return(cols) }}
+{% endmacro %}
+
+
+{% macro replace_partitions(target_relation, source_relation, partition_by, granularity, columns) %}
+  {#- Reemplaza en target las llaves presentes en source; devuelve las particiones tocadas -#}
+  {%- set keys = run_query('select distinct ' ~ partition_by ~ ' from ' ~ source_relation ~ ' order by 1').columns[0].values() -%}
+  {%- set col_list = columns | join(', ') -%}
+  {%- set by_part = {} -%}
+  {%- for k in keys -%}
+    {%- if k is none -%}
+      {{ exceptions.raise_compiler_error(partition_by ~ ' nulo en ' ~ target_relation ~ ': no hay partición para NULL') }}
+    {%- endif -%}
+    {%- set b = partition_bounds(k | int, granularity) -%}
+    {%- do by_part.setdefault(b.suffix, {'bounds': b, 'keys': []}) -%}
+    {%- do by_part[b.suffix]['keys'].append(k | int) -%}
+  {%- endfor -%}
+
+  {%- set touched = [] -%}
+  {%- for suffix, p in by_part.items() -%}
+    {%- set part = api.Relation.create(database=target_relation.database, schema=target_relation.schema,
+                                       identifier=target_relation.identifier ~ '_p' ~ suffix, type='table') -%}
+    {%- set key_list = p['keys'] | join(', ') -%}
+    {% call statement('partition_' ~ suffix) %}
+      create table if not exists {{ part }}
+        partition of {{ target_relation }}
+        for values from ({{ p.bounds['from'] }}) to ({{ p.bounds['to'] }});
+      {% if granularity == 'month' %}
+      delete from {{ part }} where {{ partition_by }} in ({{ key_list }});
+      {% else %}
+      truncate table {{ part }};
+      {% endif %}
+      insert into {{ part }} ({{ col_list }})
+      select {{ col_list }} from {{ source_relation }} where {{ partition_by }} in ({{ key_list }});
+    {% endcall %}
+    {%- do touched.append(part) -%}
+  {%- endfor -%}
+  {{ return(touched) }}
+{% endmacro %}
+
+
+{% materialization partitioned_incremental, adapter='postgres' %}
+
+  {%- set partition_by = config.require('partition_by') -%}
+  {%- set granularity = config.get('partition_granularity', 'day') -%}
+  {%- set rekey = config.get('rekey_md5', {}) -%}
+  {%- set existing_relation = load_cached_relation(this) -%}
+  {%- set target_relation = this.incorporate(type='table') -%}
+  {%- set tmp_relation = make_temp_relation(target_relation) -%}
+  {%- set backup_relation = make_backup_relation(target_relation, 'table') -%}
+  {% set grant_config = config.get('grants') %}
+
+  {{ drop_relation_if_exists(load_cached_relation(backup_relation)) }}
+
+  {{ run_hooks(pre_hooks, inside_transaction=False) }}
+  {{ run_hooks(pre_hooks, inside_transaction=True) }}
+
+  -- resultado del modelo (solo las llaves de esta corrida)
+  {% call statement('build_tmp') %}
+    {{ get_create_table_as_sql(True, tmp_relation, sql) }}
+  {% endcall %}
+  {%- set columns = run_query('select * from ' ~ tmp_relation ~ ' limit 0').column_names | list -%}
+
+  {%- set migrate_from = none -%}
+  {% if existing_relation is not none %}
+    {%- set relkind = run_query(
+          "select c.relkind from pg_class c join pg_namespace n on n.oid = c.relnamespace"
+          ~ " where n.nspname = '" ~ existing_relation.schema ~ "' and c.relname = '" ~ existing_relation.identifier ~ "'"
+        ).columns[0].values() -%}
+    {%- set md5_columns = md5_key_columns(existing_relation, rekey) if rekey and existing_relation.type == 'table' else [] -%}
+    {% if should_full_refresh() or existing_relation.type != 'table' %}
+      {{ drop_relation_if_exists(existing_relation) }}
+      {%- set existing_relation = none -%}
+    {% elif md5_columns %}
+      -- llaves md5 de versiones anteriores: copia del histórico con las llaves
+      -- bigint de los registros kr_*, que luego se migra como una tabla heap
+      {%- set rekey_relation = make_temp_relation(target_relation, '__dbt_rekey') -%}
+      {% call statement('rekey') %}
+        {{ get_create_table_as_sql(True, rekey_relation, md5_rekey_select(existing_relation, columns, rekey, md5_columns)) }}
+      {% endcall %}
+      {{ drop_relation_if_exists(existing_relation) }}
+      {%- set migrate_from = rekey_relation -%}
+      {%- set existing_relation = none -%}
+    {% elif relkind and relkind[0] != 'p' %}
+      -- tabla heap de versiones anteriores: se conserva el histórico y se migra
+      {{ adapter.rename_relation(existing_relation, backup_relation) }}
+      {%- set migrate_from = backup_relation -%}
+      {%- set existing_relation = none -%}
+    {% endif %}
+  {% endif %}
+
+  {% if existing_relation is none %}
+    {% call statement('create_parent') %}
+      create table {{ target_relation }} (like {{ tmp_relation }})
+        partition by range ({{ partition_by }});
+    {% endcall %}
+    {% do create_indexes(target_relation) %}
+  {% else %}
+    {%- set target_columns = relation_column_types(target_relation) -%}
+    {%- set tmp_columns = relation_column_types(tmp_relation) -%}
+    {% if target_columns != tmp_columns %}
+      {{ exceptions.raise_compiler_error(
+           'Columnas de ' ~ target_relation ~ ' cambiaron (' ~ target_columns | join(', ') ~ ' -> '
+           ~ tmp_columns | join(', ') ~ '): correr con --full-refresh') }}
+    {% endif %}
+  {% endif %}
+
+  {%- set touched = [] -%}
+  {% if migrate_from is not none %}
+    {%- set touched = touched + replace_partitions(target_relation, migrate_from, partition_by, granularity, columns) -%}
+  {% endif %}
+  {%- set touched = touched + replace_partitions(target_relation, tmp_relation, partition_by, granularity, columns) -%}
+
+  {% call statement('main') %}
+    select count(*) as rows_loaded from {{ tmp_relation }};
+  {% endcall %}
+
+  {{ run_hooks(post_hooks, inside_transaction=True) }}
+
+  {% do apply_grants(target_relation, grant_config, should_revoke=should_revoke(existing_relation, full_refresh_mode=False)) %}
+  {% do persist_docs(target_relation, model) %}
+
+  {{ adapter.commit() }}
+
+  {% if migrate_from is not none %}
+    {{ drop_relation_if_exists(migrate_from) }}
+  {% endif %}
+
+  {% for part in touched | unique(attribute='identifier') %}
+    {% call statement('analyze_' ~ part.identifier) %}
+      analyze {{ part }};
+    {% endcall %}
+  {% endfor %}
+
+  {{ run_hooks(post_hooks, inside_transaction=False) }}
+
+  {{ return({'relations': [target_relation]}) }}
+
+{% endmaterialization %}
@@ -0,0 +1,47 @@
+{#
+  Pre-filtro de snapshots por hash de fila (strategy='check' sobre una sola
+  columna hash): deja pasar solo las filas nuevas o cuyo hash difiere de la
+  versión vigente (dbt_valid_to is null). Las ausentes no cambian nada porque
+  los snapshots no invalidan borrados (invalidate_hard_deletes=false).
+  Si el snapshot aún no existe o no tiene la columna hash (versiones
+  anteriores), no filtra; snapshot_hash_backfill (pre_hook) calcula el hash de
+  las versiones vigentes para que esa corrida no versione todo de nuevo.
+#}
+
+{% macro snapshot_changed_only(source_alias, unique_key, hash_column) %}
+  {%- set current = load_relation(this) if execute else none -%}
+  {%- if current is not none
+        and hash_column in (adapter.get_columns_in_relation(current) | map(attribute='name') | list) %}
+  where not exists (
+    select 1 from {{ current }} t
+    where t.dbt_valid_to is null
+      and t.{{ unique_key }}  = {{ source_alias }}.{{ unique_key }}
+      and t.{{ hash_column }} = {{ source_alias }}.{{ hash_column }}
+  )
+  {%- endif %}
+{% endmacro %}
+
+
+{% macro snapshot_hash_backfill(hash_column, tracked_columns) %}
+  {#- pre_hook: agrega la columna hash y la calcula para las versiones vigentes
+      de snapshots creados antes del hash (evita versionar todo una vez) -#}
+  {%- set current = load_relation(this) if execute else none -%}
+  {%- if current is not none -%}
+  alter table {{ current }} add column if not exists {{ hash_column }} text;
+  update {{ current }}
+     set {{ hash_column }} = {{ dbt_utils.generate_surrogate_key(tracked_columns) }}
+   where dbt_valid_to is null and {{ hash_column }} is null
+  {%- else -%}
+  select 1
+  {%- endif -%}
+{% endmacro %}
+
+
+{% macro scd_tracked_columns(entity) %}
+  {#- Atributos seguidos por cada snapshot SCD2; stg_ab_nyc calcula el hash con la misma lista -#}
+  {{ return({
+       'listing': ['host_id_nat', 'listing_name', 'borough_name', 'neighbourhood_name',
+                   'room_type', 'latitude', 'longitude'],
+       'host':    ['host_name', 'calculated_host_listings_count'],
+     }[entity]) }}
+{% endmacro %}
@@ -1,9 +1,11 @@
-{{ config(materialized='view') }}
+{{ config(materialized='table') }}
+
+-- Tabla reconstruida en cada corrida sobre fct_listing_current (último snapshot).
 
 
 with last_snapshot as (
-  select max(snapshot_date_key) as dk
-  from {{ ref('fct_listing_snapshot') }}
+  select snapshot_date_key as dk
+  from {{ ref('fct_listing_snapshot_latest_key') }}
 ),
 snap_date as (
   select d.date_key, d.date
@@ -15,9 +17,9 @@ snap_date as (
 fx_asof as (
   select e.usd_to_mxn
   from {{ ref('dim_exchange_rate') }} e
-  join snap_date s on e.rate_date <= s.date
-  order by e.rate_date desc
-  limit 1
+  join snap_date s
+    on s.date >= e.valid_from
+   and s.date <  e.valid_to
 ),
 fx_latest as (
   select e.usd_to_mxn
@@ -27,25 +29,16 @@ fx_latest as (
 ),
 
 
-f as (
-  select
-    f.borough_key,
-    f.neighbourhood_key,
-    f.price_usd
-  from {{ ref('fct_listing_snapshot') }} f
-  join last_snapshot ls on f.snapshot_date_key = ls.dk
-),
-
 base as (
   select
-    b.borough_name,
-    nb.neighbourhood_name,
+    f.borough_name,
+    f.neighbourhood_name,
     f.price_usd,
     (f.price_usd * (select usd_to_mxn from fx_asof))   ::numeric(12,2) as price_mxn_asof,
     (f.price_usd * (select usd_to_mxn from fx_latest)) ::numeric(12,2) as price_mxn_fx_latest
-  from f
-  join {{ ref('dim_borough') }}       b  using (borough_key)
-  join {{ ref('dim_neighbourhood') }} nb using (neighbourhood_key)
+  from {{ ref('fct_listing_current') }} f
+  where f.borough_name is not null
+    and f.neighbourhood_name is not null
 ),
 
 agg as (
@@ -61,6 +54,7 @@ agg as (
 
 select
   a.*,
-  rank() over (order by a.avg_price_usd desc) as price_rank_usd
+  rank() over (order by a.avg_price_usd desc) as price_rank_usd,
+  (select dk from last_snapshot) as snapshot_date_key
 from agg a
 order by a.avg_price_usd desc, a.borough_name, a.neighbourhood_name
@@ -1,12 +1,14 @@
-{{ config(materialized='view') }}
+{{ config(materialized='table') }}
+
+-- Tabla reconstruida en cada corrida sobre fct_listing_current (último snapshot).
 
 
 
 
 with last_snapshot as (
  
-  select max(snapshot_date_key) as dk
-  from {{ ref('fct_listing_snapshot') }}
+  select snapshot_date_key as dk
+  from {{ ref('fct_listing_snapshot_latest_key') }}
 ),
 last_date as (
   select d.date
@@ -20,8 +22,7 @@ f as (
     listing_key,
     price_usd,
     is_active
-  from {{ ref('fct_listing_snapshot') }}
-  join last_snapshot ls on snapshot_date_key = ls.dk
+  from {{ ref('fct_listing_current') }}
   where price_usd is not null
 ),
 per_host as (
@@ -58,7 +59,8 @@ select
   r.properties,
   r.properties_active,
   r.avg_price_usd,
-  r.std_price_usd
+  r.std_price_usd,
+  (select dk from last_snapshot) as snapshot_date_key
 from ranked r
 left join host_name_asof h using (host_key)
 where r.rn <= 20
@@ -1,27 +1,28 @@
-{{ config(materialized='view') }}
+{{ config(materialized='table') }}
+
+-- Tabla reconstruida en cada corrida sobre fct_listing_current (último snapshot).
 
 with last_snapshot as (
  
-  select max(snapshot_date_key) as dk
-  from {{ ref('fct_listing_snapshot') }}
+  select snapshot_date_key as dk
+  from {{ ref('fct_listing_snapshot_latest_key') }}
 ),
 base as (
   select
-    b.borough_name,
-    rt.room_type,
+    f.borough_name,
+    f.room_type,
     f.availability_365
-  from {{ ref('fct_listing_snapshot') }} f
-  join last_snapshot ls
-    on f.snapshot_date_key = ls.dk
-  join {{ ref('dim_borough') }}     b  using (borough_key)
-  join {{ ref('dim_room_type') }}   rt using (room_type_key)
+  from {{ ref('fct_listing_current') }} f
+  where f.borough_name is not null
+    and f.room_type is not null
   
 )
 select
   borough_name,
   room_type,
   avg(availability_365)::numeric(10,2) as avg_availability_yr,
-  percentile_cont(0.5) within group (order by availability_365) as p50_availability
+  percentile_cont(0.5) within group (order by availability_365) as p50_availability,
+  (select dk from last_snapshot) as snapshot_date_key
 from base
 group by 1,2
 order by 1,2
@@ -1,26 +1,27 @@
-{{ config(materialized='view') }}
+{{ config(materialized='table') }}
+
+-- Tabla reconstruida en cada corrida sobre fct_listing_current (último snapshot).
 
 with last_snapshot as (
  
-  select max(snapshot_date_key) as dk
-  from {{ ref('fct_listing_snapshot') }}
+  select snapshot_date_key as dk
+  from {{ ref('fct_listing_snapshot_latest_key') }}
 ),
 counts as (
   select
-    b.borough_name,
-    nb.neighbourhood_name,
+    f.borough_name,
+    f.neighbourhood_name,
     count(*) filter (where f.is_active) as active_listings
-  from {{ ref('fct_listing_snapshot') }} f
-  join last_snapshot ls
-    on f.snapshot_date_key = ls.dk
-  join {{ ref('dim_borough') }}       b  using (borough_key)
-  join {{ ref('dim_neighbourhood') }} nb using (neighbourhood_key)
+  from {{ ref('fct_listing_current') }} f
+  where f.borough_name is not null
+    and f.neighbourhood_name is not null
   group by 1,2
 )
 select
   borough_name,
   neighbourhood_name,
-  active_listings
+  active_listings,
+  (select dk from last_snapshot) as snapshot_date_key
 from counts
 order by active_listings desc, borough_name, neighbourhood_name
 limit 50
\ No newline at end of file
@@ -1,18 +1,18 @@
-{{ config(materialized='view') }}
+{{ config(materialized='table') }}
+
+-- Tabla reconstruida en cada corrida sobre fct_listing_current (último snapshot).
 
 with last_snapshot as (
   
-  select max(snapshot_date_key) as dk
-  from {{ ref('fct_listing_snapshot') }}
+  select snapshot_date_key as dk
+  from {{ ref('fct_listing_snapshot_latest_key') }}
 ),
 
 base as (
   select
     f.availability_365,
     f.reviews_per_month
-  from {{ ref('fct_listing_snapshot') }} f
-  join last_snapshot ls
-    on f.snapshot_date_key = ls.dk
+  from {{ ref('fct_listing_current') }} f
   where f.reviews_per_month is not null
 ),
 
@@ -47,5 +47,6 @@ select
   (lo || '–' || hi) as availability_range_days,  
   avg_availability_days,
   avg_reviews_per_month,
-  listings_count
+  listings_count,
+  (select dk from last_snapshot) as snapshot_date_key
 from labels
@@ -1,18 +1,19 @@
-{{ config(materialized='view') }}
+{{ config(materialized='table') }}
+
+-- Tabla reconstruida en cada corrida sobre fct_listing_current (último snapshot).
 
 
 with last_snapshot as (
-  select max(snapshot_date_key) as dk
-  from {{ ref('fct_listing_snapshot') }}
+  select snapshot_date_key as dk
+  from {{ ref('fct_listing_snapshot_latest_key') }}
 ),
 
 active_by_borough as (
   select
-    b.borough_name,
+    f.borough_name,
     count(*) filter (where f.is_active) as active_listings
-  from {{ ref('fct_listing_snapshot') }} f
-  join last_snapshot ls on f.snapshot_date_key = ls.dk
-  join {{ ref('dim_borough') }} b using (borough_key)
+  from {{ ref('fct_listing_current') }} f
+  where f.borough_name is not null
   group by 1
 ),
 
@@ -65,6 +66,7 @@ select
   rank_per_capita,
   rank_density,
   pctl_combined,
-  semaforo_combined
+  semaforo_combined,
+  (select dk from last_snapshot) as snapshot_date_key
 from scored
 
@@ -1,9 +1,11 @@
 {{ config(materialized='table') }}
 
 select
-  {{ dbt_utils.generate_surrogate_key(['borough_name']) }} as borough_key,
-  borough_name,
-  population,
-  land_area_km2,
-  density_km2
-from {{ ref('stg_boroughs') }}
\ No newline at end of file
+  k.borough_key,
+  {{ md5_key_compat(['s.borough_name'], 'borough_key') }}
+  s.borough_name,
+  s.population,
+  s.land_area_km2,
+  s.density_km2
+from {{ ref('stg_boroughs') }} s
+join {{ ref('kr_borough') }} k using (borough_name)
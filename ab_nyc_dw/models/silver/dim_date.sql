@@ -30,7 +30,9 @@ used_bounds as (
 bounds as (
   select
     
-    greatest(to_date('{{ date_floor }}','YYYY-MM-DD'), min_d)              as min_date,
+    -- desde date_floor (no desde el snapshot más viejo): los días que
+    -- reconstruye el backfill (src/backfill.py) ya tienen su fila
+    to_date('{{ date_floor }}','YYYY-MM-DD')                               as min_date,
     
     (max_d + interval '{{ days_ahead }} day')                              as max_date
   from used_bounds
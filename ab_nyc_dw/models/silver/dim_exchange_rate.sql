@@ -2,19 +2,67 @@
     materialized='incremental',
     incremental_strategy='delete+insert',
     unique_key='rate_date',
-    on_schema_change='sync_all_columns'
+    on_schema_change='sync_all_columns',
+  pre_hook="{{ fx_validity_backfill() }}",
+    indexes=[
+      {'columns': ['valid_from', 'valid_to']},
+    ]
 ) }}
 
+-- Vigencia as-of de cada tasa: [valid_from, valid_to) = desde su rate_date hasta
+-- la siguiente publicación (cubre fines de semana y feriados); la última queda
+-- abierta hasta 9999-12-31. Los hechos resuelven la tasa con un join por rango.
+
 with src as (
   select
     rate_date::date as rate_date,
     usd_to_mxn::numeric(12,6) as usd_to_mxn
   from {{ ref('stg_banxico') }}
+),
+
+{% if is_incremental() %}
+-- Las filas nuevas cambian el valid_to de su vecina anterior (y de las ya
+-- cargadas dentro del rango): se recalculan junto con la vecina siguiente.
+bounds as (
+  select
+    coalesce((select max(rate_date) from {{ this }} where rate_date < (select min(rate_date) from src)),
+             (select min(rate_date) from src)) as lo,
+    coalesce((select min(rate_date) from {{ this }} where rate_date > (select max(rate_date) from src)),
+             '9999-12-31'::date)                as hi
+),
+rates as (
+  select rate_date, usd_to_mxn from src
+  union all
+  select t.rate_date, t.usd_to_mxn
+  from {{ this }} t, bounds b
+  where t.rate_date between b.lo and b.hi
+    and not exists (select 1 from src s where s.rate_date = t.rate_date)
+),
+{% else %}
+rates as (
+  select rate_date, usd_to_mxn from src
+),
+{% endif %}
+
+intervals as (
+  select
+    rate_date,
+    usd_to_mxn,
+    rate_date                                                         as valid_from,
+    coalesce(lead(rate_date) over (order by rate_date), '9999-12-31'::date) as valid_to
+  from rates
 )
+
 select
   {{ dbt_utils.generate_surrogate_key(['rate_date']) }} as rate_key,
   rate_date,
   to_char(rate_date,'YYYYMMDD')::int as rate_date_key,
   usd_to_mxn,
+  valid_from,
+  valid_to,
   current_timestamp as updated_at
-from src
\ No newline at end of file
+from intervals
+{% if is_incremental() %}
+-- la vecina siguiente solo se usó para el lead(): no cambia
+where rate_date < (select hi from bounds)
+{% endif %}
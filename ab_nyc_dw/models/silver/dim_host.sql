@@ -1,11 +1,13 @@
 {{ config(materialized='table') }}
 
 select
-  {{ dbt_utils.generate_surrogate_key(['host_id_nat']) }} as host_key,
-  host_id_nat,
-  host_name,
-  calculated_host_listings_count,
-  dbt_valid_from::date as effective_from,
-  coalesce(dbt_valid_to::date, '9999-12-31') as effective_to,
-  (dbt_valid_to is null) as is_current
-from {{ ref('host_snapshot') }}
\ No newline at end of file
+  k.host_key,
+  {{ md5_key_compat(['s.host_id_nat'], 'host_key') }}
+  s.host_id_nat,
+  s.host_name,
+  s.calculated_host_listings_count,
+  s.dbt_valid_from::date as effective_from,
+  coalesce(s.dbt_valid_to::date, '9999-12-31') as effective_to,
+  (s.dbt_valid_to is null) as is_current
+from {{ ref('host_snapshot') }} s
+left join {{ ref('kr_host') }} k using (host_id_nat)
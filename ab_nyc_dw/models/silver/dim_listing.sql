@@ -1,21 +1,29 @@
 {{ config(materialized='table') }}
 
 -- dim_listing.sql (Silver) — con listing_name (SCD2)
+-- Llaves bigint de los registros kr_* (models/silver/keys)
 select
-  {{ dbt_utils.generate_surrogate_key(['listing_id_nat']) }} as listing_key,
-  listing_id_nat,
-  listing_name,
+  kl.listing_key,
+  {{ md5_key_compat(['s.listing_id_nat'], 'listing_key') }}
+  s.listing_id_nat,
+  s.listing_name,
 
-  {{ dbt_utils.generate_surrogate_key(['host_id_nat']) }}                        as host_key,
-  {{ dbt_utils.generate_surrogate_key(['borough_name']) }}                       as borough_key,
-  {{ dbt_utils.generate_surrogate_key(['borough_name','neighbourhood_name']) }}  as neighbourhood_key,
-  {{ dbt_utils.generate_surrogate_key(['room_type']) }}                          as room_type_key,
+  kh.host_key,
+  kb.borough_key,
+  kn.neighbourhood_key,
+  kr.room_type_key,
 
-  latitude,
-  longitude,
+  s.latitude,
+  s.longitude,
 
   
-  dbt_valid_from::date                         as effective_from,
-  coalesce(dbt_valid_to::date, '9999-12-31')   as effective_to,
-  (dbt_valid_to is null)                       as is_current
-from {{ ref('listing_snapshot') }}
\ No newline at end of file
+  s.dbt_valid_from::date                         as effective_from,
+  coalesce(s.dbt_valid_to::date, '9999-12-31')   as effective_to,
+  (s.dbt_valid_to is null)                       as is_current
+from {{ ref('listing_snapshot') }} s
+left join {{ ref('kr_listing') }}       kl on kl.listing_id_nat = s.listing_id_nat
+left join {{ ref('kr_host') }}          kh on kh.host_id_nat    = s.host_id_nat
+left join {{ ref('kr_borough') }}       kb on kb.borough_name   = s.borough_name
+left join {{ ref('kr_neighbourhood') }} kn on kn.borough_name   = s.borough_name
+                                          and kn.neighbourhood_name = s.neighbourhood_name
+left join {{ ref('kr_room_type') }}     kr on kr.room_type      = s.room_type
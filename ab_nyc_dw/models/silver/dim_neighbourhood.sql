@@ -6,7 +6,10 @@ with base as (
   where borough_name is not null and neighbourhood_name is not null
 )
 select
-  {{ dbt_utils.generate_surrogate_key(['borough_name','neighbourhood_name']) }} as neighbourhood_key,
-  neighbourhood_name,
-  {{ dbt_utils.generate_surrogate_key(['borough_name']) }} as borough_key
-from base
\ No newline at end of file
+  kn.neighbourhood_key,
+  {{ md5_key_compat(['base.borough_name','base.neighbourhood_name'], 'neighbourhood_key') }}
+  base.neighbourhood_name,
+  kb.borough_key
+from base
+join {{ ref('kr_neighbourhood') }} kn using (borough_name, neighbourhood_name)
+join {{ ref('kr_borough') }}       kb using (borough_name)
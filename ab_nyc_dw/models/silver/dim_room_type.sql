@@ -6,6 +6,8 @@ with src as (
   where room_type is not null
 )
 select
-  {{ dbt_utils.generate_surrogate_key(['room_type']) }} as room_type_key,
-  room_type
-from src
\ No newline at end of file
+  k.room_type_key,
+  {{ md5_key_compat(['src.room_type'], 'room_type_key') }}
+  src.room_type
+from src
+join {{ ref('kr_room_type') }} k using (room_type)
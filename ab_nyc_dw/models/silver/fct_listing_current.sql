@@ -0,0 +1,38 @@
+{{ config(
+  materialized='table',
+  indexes=[
+    {'columns': ['listing_key'], 'unique': True},
+    {'columns': ['borough_name', 'neighbourhood_name']},
+  ]
+) }}
+
+-- Corte vigente (último snapshot) de fct_listing_snapshot, desnormalizado con
+-- los nombres de borough / barrio / tipo de habitación. Se reconstruye una vez
+-- por corrida: GOLD agrega sobre esta tabla en lugar de filtrar el histórico y
+-- repetir los joins a las dimensiones en cada consulta.
+-- Los nombres quedan NULL si la llave no existe en su dimensión (left join):
+-- los modelos que antes hacían inner join filtran esos NULL.
+
+with last_snapshot as (
+  select snapshot_date_key as dk, snapshot_date
+  from {{ ref('fct_listing_snapshot_latest_key') }}
+)
+
+select
+  f.listing_key, f.host_key, f.borough_key, f.neighbourhood_key, f.room_type_key,
+  b.borough_name,
+  nb.neighbourhood_name,
+  rt.room_type,
+  f.snapshot_date_key,
+  (select snapshot_date from last_snapshot) as snapshot_date,
+  f.exchange_rate_date_key,
+  f.price_usd, f.price_mxn,
+  f.availability_365, f.minimum_nights,
+  f.number_of_reviews, f.reviews_per_month, f.last_review_date,
+  f.is_active,
+  f.revenue_proxy_mxn
+from {{ ref('fct_listing_snapshot') }} f
+left join {{ ref('dim_borough') }}       b  using (borough_key)
+left join {{ ref('dim_neighbourhood') }} nb using (neighbourhood_key)
+left join {{ ref('dim_room_type') }}     rt using (room_type_key)
+where f.snapshot_date_key = (select dk from last_snapshot)
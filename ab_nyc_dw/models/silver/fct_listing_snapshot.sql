@@ -1,10 +1,24 @@
 {{ config(
-  materialized='incremental',
-  incremental_strategy='delete+insert',
-  unique_key=['listing_key','snapshot_date_key'],
-  on_schema_change='sync_all_columns'
+  materialized='partitioned_incremental',
+  partition_by='snapshot_date_key',
+  partition_granularity='day',
+  indexes=[
+    {'columns': ['snapshot_date_key']},
+    {'columns': ['listing_key', 'snapshot_date_key'], 'unique': True},
+  ],
+  rekey_md5={
+    'listing_key': 'kr_listing',
+    'host_key': 'kr_host',
+    'borough_key': 'kr_borough',
+    'neighbourhood_key': 'kr_neighbourhood',
+    'room_type_key': 'kr_room_type',
+  }
 ) }}
 
+-- Particionada por día (snapshot_date_key): cada corrida reemplaza solo la(s)
+-- partición(es) de los snapshots que trae (macros/partitioned_incremental.sql).
+-- rekey_md5: un histórico con llaves md5 se migra a las llaves bigint de kr_*.
+
 with base as (
   select
     listing_id_nat, host_id_nat, borough_name, neighbourhood_name, room_type,
@@ -15,15 +29,31 @@ with base as (
     last_review_date::date
   from {{ ref('stg_ab_nyc') }}
 ),
+-- Llaves bigint de los registros kr_* (models/silver/keys): joins por entero
 keys as (
   select
-    {{ dbt_utils.generate_surrogate_key(['listing_id_nat']) }}                     as listing_key,
-    {{ dbt_utils.generate_surrogate_key(['host_id_nat']) }}                        as host_key,
-    {{ dbt_utils.generate_surrogate_key(['borough_name']) }}                       as borough_key,
-    {{ dbt_utils.generate_surrogate_key(['borough_name','neighbourhood_name']) }}  as neighbourhood_key,
-    {{ dbt_utils.generate_surrogate_key(['room_type']) }}                          as room_type_key,
-    *
-  from base
+    kl.listing_key,
+    kh.host_key,
+    kb.borough_key,
+    kn.neighbourhood_key,
+    kr.room_type_key,
+    b.*
+  from base b
+  left join {{ ref('kr_listing') }}       kl on kl.listing_id_nat = b.listing_id_nat
+  left join {{ ref('kr_host') }}          kh on kh.host_id_nat    = b.host_id_nat
+  left join {{ ref('kr_borough') }}       kb on kb.borough_name   = b.borough_name
+  left join {{ ref('kr_neighbourhood') }} kn on kn.borough_name   = b.borough_name
+                                            and kn.neighbourhood_name = b.neighbourhood_name
+  left join {{ ref('kr_room_type') }}     kr on kr.room_type      = b.room_type
+),
+-- Tasa as-of por fecha de snapshot (pocas fechas): join por rango contra las
+-- vigencias [valid_from, valid_to) de dim_exchange_rate; luego equi-join por fecha
+fx_asof as (
+  select d.snapshot_date, e.rate_date, e.usd_to_mxn
+  from (select distinct snapshot_date from keys) d
+  join {{ ref('dim_exchange_rate') }} e
+    on d.snapshot_date >= e.valid_from
+   and d.snapshot_date <  e.valid_to
 ),
 fx_join as (
   select
@@ -35,13 +65,8 @@ fx_join as (
   from keys k
   join {{ ref('dim_date') }} dd
     on dd.date = k.snapshot_date
-  left join lateral (
-    select e.rate_date, e.usd_to_mxn
-    from {{ ref('dim_exchange_rate') }} e
-    where e.rate_date <= k.snapshot_date
-    order by e.rate_date desc
-    limit 1
-  ) fx on true
+  left join fx_asof fx
+    on fx.snapshot_date = k.snapshot_date
 )
 select
   listing_key, host_key, borough_key, neighbourhood_key, room_type_key,
@@ -0,0 +1,10 @@
+{{ config(materialized='table') }}
+
+-- Metadato: último snapshot cargado en fct_listing_snapshot (una fila).
+-- max() sobre el índice de snapshot_date_key (una lectura por partición);
+-- GOLD lo usa como subconsulta escalar → poda de particiones en ejecución.
+select
+  max(snapshot_date_key)                  as snapshot_date_key,
+  to_date(max(snapshot_date_key)::text, 'YYYYMMDD') as snapshot_date,
+  current_timestamp                       as updated_at
+from {{ ref('fct_listing_snapshot') }}
@@ -0,0 +1,12 @@
+{{ config(
+  materialized='incremental',
+  incremental_strategy='append',
+  full_refresh=false,
+  indexes=[
+    {'columns': ['borough_name'], 'unique': True},
+    {'columns': ['borough_key'], 'unique': True},
+  ]
+) }}
+
+-- Registro de llaves borough: borough_name → borough_key (bigint). Ver macros/key_registry.sql.
+{{ key_registry('borough_key', ['borough_name'], [ref('stg_boroughs'), ref('stg_ab_nyc'), ref('listing_snapshot')]) }}
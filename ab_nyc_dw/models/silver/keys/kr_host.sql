@@ -0,0 +1,12 @@
+{{ config(
+  materialized='incremental',
+  incremental_strategy='append',
+  full_refresh=false,
+  indexes=[
+    {'columns': ['host_id_nat'], 'unique': True},
+    {'columns': ['host_key'], 'unique': True},
+  ]
+) }}
+
+-- Registro de llaves host: host_id_nat → host_key (bigint). Ver macros/key_registry.sql.
+{{ key_registry('host_key', ['host_id_nat'], [ref('stg_ab_nyc'), ref('host_snapshot')]) }}
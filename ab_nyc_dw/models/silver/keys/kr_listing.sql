@@ -0,0 +1,12 @@
+{{ config(
+  materialized='incremental',
+  incremental_strategy='append',
+  full_refresh=false,
+  indexes=[
+    {'columns': ['listing_id_nat'], 'unique': True},
+    {'columns': ['listing_key'], 'unique': True},
+  ]
+) }}
+
+-- Registro de llaves listing: listing_id_nat → listing_key (bigint). Ver macros/key_registry.sql.
+{{ key_registry('listing_key', ['listing_id_nat'], [ref('stg_ab_nyc'), ref('listing_snapshot')]) }}
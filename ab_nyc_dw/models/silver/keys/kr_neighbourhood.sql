@@ -0,0 +1,12 @@
+{{ config(
+  materialized='incremental',
+  incremental_strategy='append',
+  full_refresh=false,
+  indexes=[
+    {'columns': ['borough_name', 'neighbourhood_name'], 'unique': True},
+    {'columns': ['neighbourhood_key'], 'unique': True},
+  ]
+) }}
+
+-- Registro de llaves neighbourhood: (borough_name, neighbourhood_name) → neighbourhood_key (bigint). Ver macros/key_registry.sql.
+{{ key_registry('neighbourhood_key', ['borough_name', 'neighbourhood_name'], [ref('stg_ab_nyc'), ref('listing_snapshot')]) }}
@@ -0,0 +1,12 @@
+{{ config(
+  materialized='incremental',
+  incremental_strategy='append',
+  full_refresh=false,
+  indexes=[
+    {'columns': ['room_type'], 'unique': True},
+    {'columns': ['room_type_key'], 'unique': True},
+  ]
+) }}
+
+-- Registro de llaves room_type: room_type → room_type_key (bigint). Ver macros/key_registry.sql.
+{{ key_registry('room_type_key', ['room_type'], [ref('stg_ab_nyc'), ref('listing_snapshot')]) }}
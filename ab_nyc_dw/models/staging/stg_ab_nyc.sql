@@ -1,8 +1,26 @@
 -- models/staging/stg_ab_nyc.sql
 {% set snap_date = var('snapshot_date', run_started_at.strftime('%Y-%m-%d')) %}
 {% set snap_key  = var('snapshot_date_key', run_started_at.strftime('%Y%m%d')) %}
+-- Replay/backfill (src/backfill.py): con var ab_nyc_file_md5 se lee esa versión
+-- de raw.ab_nyc (no la vigente) y el modelo es ephemeral: cada corrida en
+-- paralelo lo compila dentro de sus modelos sin tocar la vista compartida.
+{% set replay_md5 = var('ab_nyc_file_md5', none) %}
+{% if replay_md5 and var('raw_schema', 'raw') != 'raw' %}
+  {{ exceptions.raise_compiler_error('ab_nyc_file_md5 requiere raw_schema=raw (tablas cargadas con COPY)') }}
+{% endif %}
+{{ config(materialized='ephemeral' if replay_md5 else 'view') }}
 
-with src as (select * from {{ source('raw_ext','ab_nyc_latest') }})
+with src as (
+  {% if replay_md5 %}
+  select * from {{ source('raw_ext','ab_nyc') }}
+  where load_date = '{{ var("ab_nyc_load_date") }}'::date
+    and file_md5  = '{{ replay_md5 }}'
+  {% else %}
+  select * from {{ source('raw_ext','ab_nyc_latest') }}
+  {% endif %}
+),
+
+typed as (
 select
   id::bigint                          as listing_id_nat,
   left(name, 300)                     as listing_name,
@@ -23,4 +41,13 @@ select
   '{{ snap_date }}'::date             as snapshot_date,
   '{{ snap_key }}'::int               as snapshot_date_key
 from src
-where id is not null
\ No newline at end of file
+where id is not null
+)
+
+select
+  typed.*,
+  -- Hash de los atributos que siguen los snapshots SCD2 (listing / host):
+  -- el snapshot compara una sola columna en lugar de N
+  {{ dbt_utils.generate_surrogate_key(scd_tracked_columns('listing')) }} as listing_row_hash,
+  {{ dbt_utils.generate_surrogate_key(scd_tracked_columns('host')) }}    as host_row_hash
+from typed
\ No newline at end of file
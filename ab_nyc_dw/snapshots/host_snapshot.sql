@@ -4,14 +4,25 @@
       target_schema='snapshots',
       unique_key='host_id_nat',
       strategy='check',
-      check_cols=['host_name','calculated_host_listings_count']
+      check_cols=['host_row_hash'],
+      pre_hook="{{ snapshot_hash_backfill('host_row_hash', scd_tracked_columns('host')) }}",
+      post_hook="create index if not exists host_snapshot_current_hash_idx
+                 on {{ this }} (host_id_nat, host_row_hash) where dbt_valid_to is null"
     )
   }}
 
-  select distinct
-    host_id_nat,
-    host_name,
-    calculated_host_listings_count
-  from {{ ref('stg_ab_nyc') }}
+  -- host_row_hash (staging) resume host_name y calculated_host_listings_count:
+  -- solo entran los hosts nuevos o con cambios (una fila por host).
+  select s.*
+  from (
+    select distinct on (s.host_id_nat)
+      s.host_id_nat,
+      s.host_name,
+      s.calculated_host_listings_count,
+      s.host_row_hash
+    from {{ ref('stg_ab_nyc') }} s
+    order by s.host_id_nat, s.host_row_hash
+  ) s
+  {{ snapshot_changed_only('s', 'host_id_nat', 'host_row_hash') }}
 
-{% endsnapshot %}
\ No newline at end of file
+{% endsnapshot %}
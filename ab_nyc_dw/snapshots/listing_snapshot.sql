@@ -4,19 +4,31 @@
       target_schema='snapshots',
       unique_key='listing_id_nat',
       strategy='check',
-      check_cols=['host_id_nat','listing_name','borough_name','neighbourhood_name','room_type','latitude','longitude']
+      check_cols=['listing_row_hash'],
+      pre_hook="{{ snapshot_hash_backfill('listing_row_hash', scd_tracked_columns('listing')) }}",
+      post_hook="create index if not exists listing_snapshot_current_hash_idx
+                 on {{ this }} (listing_id_nat, listing_row_hash) where dbt_valid_to is null"
     )
   }}
 
-  select distinct
-    listing_id_nat,         -- id natural del listing
-    listing_name,
-    host_id_nat,
-    borough_name,
-    neighbourhood_name,
-    room_type,
-    latitude,
-    longitude
-  from {{ ref('stg_ab_nyc') }}
+  -- listing_row_hash (staging) resume host_id_nat, listing_name, borough_name,
+  -- neighbourhood_name, room_type, latitude y longitude: el snapshot compara
+  -- solo esa columna y recibe únicamente los listings nuevos o con cambios.
+  select s.*
+  from (
+    select distinct on (s.listing_id_nat)
+      s.listing_id_nat,         -- id natural del listing
+      s.listing_name,
+      s.host_id_nat,
+      s.borough_name,
+      s.neighbourhood_name,
+      s.room_type,
+      s.latitude,
+      s.longitude,
+      s.listing_row_hash
+    from {{ ref('stg_ab_nyc') }} s
+    order by s.listing_id_nat, s.listing_row_hash
+  ) s
+  {{ snapshot_changed_only('s', 'listing_id_nat', 'listing_row_hash') }}
 
-{% endsnapshot %}
\ No newline at end of file
+{% endsnapshot %}
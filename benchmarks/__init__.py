@@ -0,0 +1 @@
+"""Benchmarks locales del pipeline (sin red ni Postgres)."""
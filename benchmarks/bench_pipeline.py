@@ -0,0 +1,331 @@
+"""
+Benchmark de regresión de los hot paths del pipeline (sin red ni Postgres).
+
+Casos (cada repetición corre en un directorio limpio; el setup no se mide):
+    md5sum                        md5 del CSV fuente
+    manifest.sync_cold            importar N registros de manifest al índice SQLite
+    is_duplicate.hit / .miss      búsquedas por md5 con el índice ya sincronizado
+    extract_csv.new_version       extract_csv.run sin historia (copia + md5 + registro)
+    extract_csv.unchanged         mismo contenido (md5 igual → referencia diaria)
+    extract_csv.fingerprint_hit   mismo archivo (stat igual → no se lee)
+    extract_csv.delta             versión siguiente (~1% de filas distintas) → delta
+    validate_ab_nyc               DQ sobre el DataFrame en memoria
+    validate_ab_nyc_file          DQ por chunks leyendo el CSV
+    banxico.cache_store_cold/warm historia Banxico → cache SQLite (nueva / sin cambios)
+    banxico.cache_rows            leer la historia completa del cache
+
+Entradas sintéticas (benchmarks/synthetic.py) con semilla fija: los CSV se
+generan una vez en data/bench/inputs/ y se reutilizan entre corridas (mismo
+md5 en todos los commits). El resultado (mediana y mínimo por caso, commit,
+versiones y flags de config) queda en data/status/bench/bench_<rows>_<ts>_<commit>.json
+y se compara contra el resultado previo con los mismos parámetros (o
+--baseline): si algún caso es más lento que el baseline por más de
+BENCH_MAX_REGRESSION_PCT (y por más de 5 ms), termina con exit 1.
+
+Ejecución:
+    python -m benchmarks.bench_pipeline --rows 1m [--repeat 3] [--cases extract_csv,md5sum]
+                                        [--baseline PATH] [--max-regression-pct 25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import parse_rows, synthetic_banxico, write_ab_nyc_csv, write_manifests
+
+INPUTS_DIR = os.path.join("data", "bench", "inputs")
+RESULTS_DIR = os.path.join("data", "status", "bench")
+
+SEED = 42
+CHANGED_PCT = 0.01
+BANXICO_SID = "SF43718"
+
+# Diferencias menores a esto se consideran ruido (casos de pocos ms)
+_NOISE_FLOOR_S = 0.005
+
+# Parámetros que deben coincidir para que un resultado sirva de baseline
+_PARAMS = ("rows", "manifest_entries", "banxico_days", "lookups")
+
+
+@dataclass
+class Case:
+    name: str
+    fn: Callable[[object], object]
+    setup: Optional[Callable[[], object]] = None
+    ops: int = 1
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        out = subprocess.run(["git", *args], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def _inputs(rows: int, inputs_dir: str) -> tuple[str, str]:
+    """CSV base y versión siguiente (se generan solo si no existen)."""
+    base = os.path.join(inputs_dir, f"ab_nyc_{rows}_s{SEED}.csv")
+    nxt = os.path.join(inputs_dir, f"ab_nyc_{rows}_s{SEED}_v2.csv")
+    for path, pct in ((base, 0.0), (nxt, CHANGED_PCT)):
+        if not os.path.exists(path):
+            t0 = time.perf_counter()
+            write_ab_nyc_csv(path, rows, seed=SEED, changed_pct=pct)
+            print(f"generado {path} ({os.path.getsize(path) / 1e6:.1f} MB) en {time.perf_counter() - t0:.1f}s")
+    return os.path.abspath(base), os.path.abspath(nxt)
+
+
+def _point(link: str, target: str) -> None:
+    """LOCAL_CSV_PATH → target (symlink; el stat sigue al archivo real)."""
+    os.makedirs(os.path.dirname(link), exist_ok=True)
+    tmp = f"{link}.tmp"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    os.symlink(target, tmp)
+    os.replace(tmp, link)
+
+
+def _next_second() -> None:
+    # El nombre del archivo RAW lleva el segundo UTC: dos versiones en el mismo segundo chocarían
+    time.sleep(1.0 - (time.time() % 1.0) + 0.01)
+
+
+def _cases(args: argparse.Namespace, workdir: str, base_csv: str, next_csv: str) -> List[Case]:
+    # Imports diferidos: config/logger se resuelven con el entorno del benchmark
+    from src.extract import extract_banxico, extract_csv
+    from src.utils import verify
+    from src.utils.quality import validate_ab_nyc, validate_ab_nyc_file
+
+    link = os.environ["LOCAL_CSV_PATH"]
+    manifests = os.path.join(workdir, "manifests")
+    md5s = write_manifests(manifests, args.manifest_entries, seed=SEED)
+    hits = [m for ms in md5s.values() for m in ms][: args.lookups]
+    rng = np.random.default_rng(SEED)
+    misses = [rng.bytes(16).hex() for _ in range(args.lookups)]
+    history = synthetic_banxico(args.banxico_days, seed=SEED)
+    covered = (history["fecha"].iloc[0].date(), history["fecha"].iloc[-1].date())
+    frame: dict = {}
+
+    def with_manifests(sync: bool) -> Callable[[], None]:
+        def setup() -> None:
+            shutil.copytree(os.path.join(manifests, "data"), "data")
+            if sync:
+                verify.sync_index()
+        return setup
+
+    def lookups(md5_list: List[str]) -> None:
+        for md5 in md5_list:
+            verify.is_duplicate("bench.csv", md5)
+
+    def extracted(then: Optional[str] = None) -> Callable[[], None]:
+        def setup() -> None:
+            _point(link, base_csv)
+            extract_csv.run(force_rehash=True)
+            if then:
+                _point(link, then)
+                _next_second()
+        return setup
+
+    def loaded_frame() -> pd.DataFrame:
+        if "df" not in frame:
+            frame["df"] = pd.read_csv(base_csv)
+        return frame["df"]
+
+    def stored() -> None:
+        extract_banxico._cache_store(BANXICO_SID, history, covered)
+
+    return [
+        Case("md5sum", lambda _: verify.md5sum(base_csv)),
+        Case("manifest.sync_cold", lambda _: verify.sync_index(), with_manifests(False), args.manifest_entries),
+        Case("is_duplicate.hit", lambda _: lookups(hits), with_manifests(True), len(hits)),
+        Case("is_duplicate.miss", lambda _: lookups(misses), with_manifests(True), len(misses)),
+        Case("extract_csv.new_version", lambda _: extract_csv.run(force_rehash=True),
+             lambda: _point(link, base_csv)),
+        Case("extract_csv.unchanged", lambda _: extract_csv.run(force_rehash=True), extracted()),
+        Case("extract_csv.fingerprint_hit", lambda _: extract_csv.run(force_rehash=False), extracted()),
+        Case("extract_csv.delta", lambda _: extract_csv.run(force_rehash=True), extracted(then=next_csv)),
+        Case("validate_ab_nyc", lambda df: validate_ab_nyc(df), loaded_frame),
+        Case("validate_ab_nyc_file", lambda _: validate_ab_nyc_file(base_csv)),
+        Case("banxico.cache_store_cold", lambda _: stored()),
+        Case("banxico.cache_store_warm", lambda _: stored(), stored),
+        Case("banxico.cache_rows",
+             lambda _: extract_banxico.cache_rows(BANXICO_SID, covered[0], covered[1]), stored),
+    ]
+
+
+def _run_case(case: Case, workdir: str, repeat: int) -> dict:
+    runs = []
+    for i in range(repeat):
+        case_dir = os.path.join(workdir, "cases", case.name, str(i))
+        os.makedirs(case_dir)
+        os.chdir(case_dir)
+        try:
+            state = case.setup() if case.setup else None
+            gc.collect()
+            t0 = time.perf_counter()
+            case.fn(state)
+            runs.append(time.perf_counter() - t0)
+        finally:
+            os.chdir(workdir)
+            shutil.rmtree(case_dir, ignore_errors=True)
+    median = statistics.median(runs)
+    return {
+        "median_s": round(median, 6),
+        "min_s": round(min(runs), 6),
+        "runs_s": [round(r, 6) for r in runs],
+        "ops": case.ops,
+        "ops_per_s": round(case.ops / median, 1) if median > 0 else None,
+    }
+
+
+def _find_baseline(results_dir: str, params: dict, exclude: str) -> Optional[str]:
+    """Resultado más reciente con los mismos parámetros."""
+    for path in sorted(glob.glob(os.path.join(results_dir, "bench_*.json")), reverse=True):
+        if os.path.abspath(path) == os.path.abspath(exclude):
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                prev = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        if all(prev.get("params", {}).get(k) == params[k] for k in _PARAMS):
+            return path
+    return None
+
+
+def compare(current: dict, baseline: dict, max_pct: float) -> List[dict]:
+    """Casos presentes en ambos; regression=True si superan el umbral (y el piso de ruido)."""
+    out = []
+    for name, cur in current["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if not base or not base.get("median_s"):
+            continue
+        ratio = cur["median_s"] / base["median_s"]
+        out.append({
+            "case": name,
+            "baseline_s": base["median_s"],
+            "current_s": cur["median_s"],
+            "change_pct": round((ratio - 1) * 100, 1),
+            "regression": ratio > 1 + max_pct / 100 and cur["median_s"] - base["median_s"] > _NOISE_FLOOR_S,
+        })
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de regresión del pipeline (sin red ni Postgres)")
+    parser.add_argument("--rows", type=parse_rows, default=100_000, help="Filas AB_NYC (100k, 1m, 10m).")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por caso (se compara la mediana).")
+    parser.add_argument("--manifest-entries", type=int, default=10_000)
+    parser.add_argument("--banxico-days", type=int, default=9_000, help="Días hábiles de historia Banxico.")
+    parser.add_argument("--lookups", type=int, default=500, help="Búsquedas por caso is_duplicate.")
+    parser.add_argument("--cases", default="", help="Prefijos de caso separados por coma (default: todos).")
+    parser.add_argument("--baseline", default=None, help="JSON de referencia (default: el previo con los mismos parámetros).")
+    parser.add_argument("--max-regression-pct", type=float, default=None,
+                        help="Umbral de regresión en %% (default BENCH_MAX_REGRESSION_PCT).")
+    parser.add_argument("--inputs-dir", default=INPUTS_DIR)
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    inputs_dir, results_dir = os.path.abspath(args.inputs_dir), os.path.abspath(args.results_dir)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    commit, dirty = _git("rev-parse", "--short", "HEAD"), bool(_git("status", "--porcelain", "--untracked-files=no"))
+    base_csv, next_csv = _inputs(args.rows, inputs_dir)
+
+    cwd, workdir = os.getcwd(), tempfile.mkdtemp(prefix="bench_")
+    # Antes de importar src.*: el .env no pisa variables ya definidas
+    os.environ.update({
+        "LOCAL_CSV_PATH": os.path.join(workdir, "source", "AB_NYC.csv"),
+        "LOCAL_CSV_SOURCE_NAME": "ab_nyc",
+        "RAW_DIR": os.path.join("data", "raw"),
+        "LOG_LEVEL": "ERROR",
+        "PROFILE": "",
+    })
+    # extract_csv.delta mide el delta aunque el default sea WRITE_DELTA=0
+    os.environ.setdefault("WRITE_DELTA", "1")
+    os.chdir(workdir)
+    try:
+        import src.utils.config as config
+
+        max_pct = args.max_regression_pct if args.max_regression_pct is not None else config.BENCH_MAX_REGRESSION_PCT
+        prefixes = [p.strip() for p in args.cases.split(",") if p.strip()]
+        cases = [c for c in _cases(args, workdir, base_csv, next_csv)
+                 if not prefixes or any(c.name.startswith(p) for p in prefixes)]
+
+        results = {}
+        for case in cases:
+            results[case.name] = _run_case(case, workdir, args.repeat)
+            r = results[case.name]
+            print(f"{case.name:<30} {r['median_s']:10.4f} s  (min {r['min_s']:.4f})")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    now = datetime.utcnow()
+    params = {"rows": args.rows, "manifest_entries": args.manifest_entries,
+              "banxico_days": args.banxico_days, "lookups": args.lookups}
+    record = {
+        "ts_utc": f"{now:%Y-%m-%dT%H:%M:%SZ}",
+        "commit": commit,
+        "dirty": dirty,
+        "params": {**params, "repeat": args.repeat, "seed": SEED, "changed_pct": CHANGED_PCT},
+        "env": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "WRITE_PARQUET": config.WRITE_PARQUET,
+            "WRITE_DELTA": config.WRITE_DELTA,
+            "DQ_CHUNK_ROWS": config.DQ_CHUNK_ROWS,
+            "DQ_UNIQUE_MODE": config.DQ_UNIQUE_MODE,
+            "DQ_WORKERS": config.DQ_WORKERS,
+        },
+        "cases": results,
+    }
+
+    os.makedirs(results_dir, exist_ok=True)
+    out_path = os.path.join(results_dir, f"bench_{args.rows}_{now:%Y%m%dT%H%M%SZ}_{commit or 'nogit'}.json")
+    baseline_path = baseline_path or _find_baseline(results_dir, params, out_path)
+    regressions: List[dict] = []
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        diff = compare(record, baseline, max_pct)
+        regressions = [d for d in diff if d["regression"]]
+        record["baseline"] = {"path": baseline_path, "commit": baseline.get("commit"),
+                              "max_regression_pct": max_pct, "comparison": diff}
+        print(f"\nvs {os.path.basename(baseline_path)} (commit {baseline.get('commit')}), umbral +{max_pct:g}%:")
+        for d in diff:
+            flag = "  REGRESIÓN" if d["regression"] else ""
+            print(f"{d['case']:<30} {d['baseline_s']:10.4f} → {d['current_s']:.4f} s  ({d['change_pct']:+.1f}%){flag}")
+    else:
+        print("\nsin baseline con los mismos parámetros: este resultado queda como referencia")
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    print(f"\nresultado → {out_path}")
+    if regressions:
+        print(f"{len(regressions)} caso(s) más lentos que +{max_pct:g}%: "
+              + ", ".join(d["case"] for d in regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
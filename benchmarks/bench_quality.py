@@ -0,0 +1,101 @@
+"""
+Micro-benchmark del motor DQ (src/utils/quality.py).
+
+Compara el plan compilado/vectorizado contra el motor anterior (copia completa
+del DataFrame + varias pasadas de pandas por regla) sobre un frame sintético
+con el esquema de AB_NYC. Ninguno de los dos escribe reporte a disco.
+Con --workers N también mide el plan repartido en N procesos (DQ_WORKERS).
+
+Ejecución:
+    python -m benchmarks.bench_quality --rows 10000000 [--workers 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_ab_nyc
+from src.utils.quality import DatasetSchema, schema_ab_nyc
+
+
+# ---- Motor anterior (referencia): copia + una pasada por regla ----
+def _legacy_coerce(s: pd.Series, dtype: str) -> pd.Series:
+    if dtype == "int":
+        return pd.to_numeric(s, errors="coerce").astype("Int64")
+    if dtype == "float":
+        return pd.to_numeric(s, errors="coerce")
+    if dtype == "date":
+        return pd.to_datetime(s, errors="coerce", utc=False).dt.date
+    return s.astype("string").str.strip()
+
+
+def legacy_validate(df: pd.DataFrame, schema: DatasetSchema) -> dict:
+    df = df.copy()
+    out: dict = {}
+    for r in schema.rules:
+        if r.name not in df.columns:
+            continue
+        before = int(df[r.name].isna().sum())
+        df[r.name] = _legacy_coerce(df[r.name], r.dtype)
+        s = df[r.name]
+        c = {"nulls": int(s.isna().sum()), "conv": int(s.isna().sum()) - before}
+        if r.unique:
+            c["dup"] = int(s.duplicated(keep=False).sum())
+        if r.dtype in ("int", "float"):
+            if r.min_value is not None:
+                c["min"] = int((s.dropna() < r.min_value).sum())
+            if r.max_value is not None:
+                c["max"] = int((s.dropna() > r.max_value).sum())
+        if r.allowed_values is not None:
+            c["allowed"] = int((~s.dropna().isin(r.allowed_values)).sum())
+        if r.dtype == "str":
+            if r.min_len is not None:
+                c["min_len"] = int((s.dropna().astype(str).str.len() < r.min_len).sum())
+            if r.max_len is not None:
+                c["max_len"] = int((s.dropna().astype(str).str.len() > r.max_len).sum())
+            if r.regex is not None:
+                c["regex"] = int((~s.dropna().astype(str).str.match(re.compile(r.regex))).sum())
+        out[r.name] = c
+    return out
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark del motor DQ")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"generando frame sintético AB_NYC: {args.rows:,} filas ...")
+    df = synthetic_ab_nyc(args.rows)
+    schema = schema_ab_nyc()
+    plan = schema.compile()
+
+    t_legacy = _time(lambda: legacy_validate(df, schema), args.repeat)
+    t_plan = _time(lambda: plan.run(df), args.repeat)
+
+    print(f"motor anterior : {t_legacy:8.2f} s")
+    print(f"plan compilado : {t_plan:8.2f} s")
+    print(f"speedup        : {t_legacy / t_plan:8.2f}x")
+
+    if args.workers > 1:
+        assert plan.counts(df, args.workers) == plan.counts(df)
+        t_par = _time(lambda: plan.run(df, args.workers), args.repeat)
+        print(f"plan x{args.workers} procs : {t_par:8.2f} s  ({t_plan / t_par:.2f}x vs 1 proc)")
+
+
+if __name__ == "__main__":
+    main()
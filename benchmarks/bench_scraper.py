@@ -0,0 +1,114 @@
+"""
+Micro-benchmark de la extracción de tablas HTML del scraper
+(src/extract/web_scraping_nyc.py).
+
+Compara el método anterior (árbol BeautifulSoup completo con html.parser y
+find_all repetidos por tabla) contra cada backend disponible de
+extract_wikitable (bs4 + SoupStrainer, lxml, selectolax) sobre los fixtures
+HTML guardados en benchmarks/fixtures/. Con --pad N el fixture se infla con N
+secciones de relleno (párrafos, listas y tablas que no son wikitable) para
+acercarse al tamaño de una página real de Wikipedia. Sin red ni escritura a disco.
+
+Ejecución:
+    python -m benchmarks.bench_scraper [--pad 200] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import time
+from typing import List, Tuple
+
+from bs4 import BeautifulSoup
+
+from src.extract.web_scraping_nyc import _BACKENDS, _table_matches, extract_wikitable
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+_FILLER = """
+<h3>Section {i}</h3>
+<p>Lorem ipsum <a href="/wiki/Page_{i}">dolor</a> sit amet, consectetur adipiscing elit.<sup class="reference"><a href="#c{i}">[{i}]</a></sup>
+Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.</p>
+<ul><li><a href="/wiki/A_{i}">Item A</a></li><li><a href="/wiki/B_{i}">Item B</a></li><li>Item C</li></ul>
+<table class="infobox"><tbody><tr><th>Key</th><td>Value {i}</td></tr><tr><th>Other</th><td>{i}</td></tr></tbody></table>
+<div class="navbox"><table><tbody><tr><th>Nav</th><td>One · Two · Three · {i}</td></tr></tbody></table></div>
+"""
+
+
+def load_fixture(path: str, pad: int) -> str:
+    """Fixture + `pad` secciones de relleno antes del cierre de <body>."""
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    filler = "".join(_FILLER.format(i=i) for i in range(pad))
+    return html.replace("</main>", filler + "</main>", 1)
+
+
+# ---- Método anterior (referencia): árbol completo + find_all por tabla ----
+def legacy_extract(html: str) -> Tuple[List[str], List[List[str]]]:
+    soup = BeautifulSoup(html, "html.parser")
+    for t in soup.select("table.wikitable"):
+        header_rows = []
+        for i, tr in enumerate(t.find_all("tr")):
+            ths = tr.find_all("th")
+            tds = tr.find_all("td")
+            if ths and not tds:
+                header_rows.append((i, [th.get_text(strip=True) for th in ths]))
+        if not header_rows or not _table_matches(header_rows):
+            continue
+        header_idx, headers_leaf = header_rows[-1]
+        data_rows = []
+        for tr in t.find_all("tr")[header_idx + 1:]:
+            if not tr.find_all("td"):
+                continue
+            texts = [c.get_text(strip=True) for c in tr.find_all(["td", "th"])][: len(headers_leaf)]
+            if texts:
+                data_rows.append(texts)
+        return headers_leaf, data_rows
+    raise RuntimeError("tabla no encontrada")
+
+
+def _available_backends() -> List[str]:
+    out = []
+    for name in _BACKENDS:
+        try:
+            extract_wikitable("<table class='wikitable'><tr><th>Borough</th><th>Population</th></tr>"
+                              "<tr><td>x</td><td>1</td></tr></table>", backend=name)
+            out.append(name)
+        except ImportError:
+            print(f"(backend {name} no instalado: se omite)")
+    return out
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de extracción de tablas HTML")
+    parser.add_argument("--pad", type=int, default=200, help="secciones de relleno por página")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = _available_backends()
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))):
+        html = load_fixture(path, args.pad)
+        print(f"\n{os.path.basename(path)}: {len(html) / 1024:,.0f} KiB")
+
+        expected = legacy_extract(html)
+        t_legacy = _time(lambda: legacy_extract(html), args.repeat)
+        print(f"  {'anterior (html.parser)':<24}: {t_legacy * 1000:8.1f} ms")
+        for name in backends:
+            assert extract_wikitable(html, backend=name) == expected, f"{name}: resultado distinto"
+            t = _time(lambda: extract_wikitable(html, backend=name), args.repeat)
+            print(f"  {name:<24}: {t * 1000:8.1f} ms  ({t_legacy / t:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Datos sintéticos reproducibles para los benchmarks (sin red ni Postgres).
+
+- AB_NYC: frame / CSV con las columnas y tipos del CSV real. El CSV se
+  escribe por chunks (10M filas sin tenerlas en memoria); cada chunk usa
+  seed + k, así que el mismo (rows, seed) produce el mismo archivo (mismo md5).
+  Con changed_pct se genera una "versión siguiente": la misma base con un %
+  de filas actualizadas, borradas e insertadas (para medir el delta).
+- Banxico: historia diaria (días hábiles) con el formato de la API
+  (fecha datetime64, valor float64), paseo aleatorio con reversión a ~18.5.
+- Manifests: data/status/verify/<source>/manifest_raw.jsonl con N registros
+  (copias + referencias diarias) con el formato de src/utils/verify.py.
+
+Ejecución (solo generar un CSV):
+    python -m benchmarks.synthetic --rows 1m --out data/bench/inputs/AB_NYC_1m.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+BOROUGHS = ["Manhattan", "Brooklyn", "Queens", "Bronx", "Staten Island"]
+ROOM_TYPES = ["Entire home/apt", "Private room", "Shared room"]
+NEIGHBOURHOODS = ["Harlem", "Williamsburg", "Astoria", "Bedford-Stuyvesant", "Upper West Side",
+                  "Bushwick", "Hell's Kitchen", "Flushing", "Mott Haven", "St. George"]
+
+FIRST_ID = 2539
+CSV_CHUNK_ROWS = 500_000
+
+_SIZES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_rows(value: str) -> int:
+    """'100k' / '1m' / '10m' / '250000' → int (argparse type)."""
+    v = value.strip().lower().replace("_", "")
+    if v and v[-1] in _SIZES:
+        return int(float(v[:-1]) * _SIZES[v[-1]])
+    return int(v)
+
+
+def _names() -> np.ndarray:
+    # Con comas y comillas (como el CSV real): ejercitan el quoting del parser
+    out = []
+    for i in range(1000):
+        if i % 7 == 0:
+            out.append(f"Sunny, quiet room #{i}")
+        elif i % 11 == 0:
+            out.append(f'"Loft" near the park #{i}')
+        else:
+            out.append(f"Cozy room #{i}")
+    return np.array(out, dtype=object)
+
+
+def synthetic_ab_nyc(rows: int, seed: int = 42, start_id: int = FIRST_ID) -> pd.DataFrame:
+    """Frame con las columnas/tipos del CSV AB_NYC (valores plausibles)."""
+    rng = np.random.default_rng(seed)
+    names = _names()
+    hosts = np.array(["Ana", "John", "Maria", None, "Li"], dtype=object)
+    reviews = rng.integers(0, 300, rows)
+    last_review = pd.to_datetime("2019-07-08") - pd.to_timedelta(rng.integers(0, 2000, rows), unit="D")
+    return pd.DataFrame({
+        "id": np.arange(start_id, start_id + rows, dtype="int64"),
+        "name": names[rng.integers(0, len(names), rows)],
+        "host_id": rng.integers(2438, 274_000_000, rows),
+        "host_name": hosts[rng.integers(0, len(hosts), rows)],
+        "neighbourhood_group": np.array(BOROUGHS, dtype=object)[rng.integers(0, 5, rows)],
+        "neighbourhood": np.array(NEIGHBOURHOODS, dtype=object)[rng.integers(0, len(NEIGHBOURHOODS), rows)],
+        "latitude": rng.uniform(40.49, 40.92, rows).round(5),
+        "longitude": rng.uniform(-74.25, -73.71, rows).round(5),
+        "room_type": np.array(ROOM_TYPES, dtype=object)[rng.integers(0, 3, rows)],
+        "price": rng.integers(10, 1000, rows),
+        "minimum_nights": rng.integers(1, 30, rows),
+        "number_of_reviews": reviews,
+        "last_review": np.where(reviews > 0, last_review.strftime("%Y-%m-%d"), None),
+        "reviews_per_month": np.where(reviews > 0, rng.uniform(0.01, 10, rows).round(2), np.nan),
+        "calculated_host_listings_count": rng.integers(1, 300, rows),
+        "availability_365": rng.integers(0, 366, rows),
+    })
+
+
+def _mutate(df: pd.DataFrame, changed_pct: float, seed: int) -> pd.DataFrame:
+    """Versión siguiente de un chunk: changed_pct de updates, la mitad en deletes."""
+    rng = np.random.default_rng(seed)
+    upd = rng.random(len(df)) < changed_pct
+    df.loc[upd, "price"] = df.loc[upd, "price"] + 1
+    keep = rng.random(len(df)) >= changed_pct / 2
+    return df[keep]
+
+
+def write_ab_nyc_csv(path: str, rows: int, seed: int = 42, changed_pct: float = 0.0,
+                     chunk_rows: int = CSV_CHUNK_ROWS) -> str:
+    """
+    Escribe el CSV AB_NYC sintético por chunks. changed_pct > 0 → versión
+    siguiente de la misma base: updates/deletes por chunk e inserts
+    (changed_pct/2 de filas nuevas) al final. Escritura atómica (tmp + rename).
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        for k, start in enumerate(range(0, rows, chunk_rows)):
+            n = min(chunk_rows, rows - start)
+            df = synthetic_ab_nyc(n, seed=seed + k, start_id=FIRST_ID + start)
+            if changed_pct > 0:
+                df = _mutate(df, changed_pct, seed=seed + 10_000 + k)
+            df.to_csv(f, index=False, header=(k == 0))
+        if changed_pct > 0:
+            extra = max(1, int(rows * changed_pct / 2))
+            synthetic_ab_nyc(extra, seed=seed + 20_000, start_id=FIRST_ID + rows).to_csv(
+                f, index=False, header=False)
+    os.replace(tmp, path)
+    return path
+
+
+def synthetic_banxico(days: int, start: date = date(1991, 11, 12), seed: int = 42) -> pd.DataFrame:
+    """Historia diaria tipo FIX (días hábiles desde `start`) con el formato de la API."""
+    rng = np.random.default_rng(seed)
+    fechas = pd.bdate_range(start=start, periods=days)
+    # Reversión a la media (tipo Ornstein-Uhlenbeck) para no salir de rango en historias largas
+    valor = np.empty(days)
+    v = 18.5
+    for i, eps in enumerate(rng.normal(0, 0.06, days)):
+        v += 0.01 * (18.5 - v) + eps
+        valor[i] = v
+    return pd.DataFrame({
+        "fecha": pd.to_datetime(fechas),
+        "valor": valor.round(4).astype("float64"),
+    })
+
+
+def write_manifests(root: str, entries: int, sources: Sequence[str] = ("ab_nyc", "banxico", "nyc_boroughs"),
+                    reference_every: int = 3, seed: int = 42) -> Dict[str, List[str]]:
+    """
+    Escribe `entries` registros repartidos entre `sources` en
+    <root>/data/status/verify/<source>/manifest_raw.jsonl (sin índice SQLite).
+    Una de cada `reference_every` líneas es una referencia diaria a la copia
+    previa. Devuelve {source: [md5 de las copias]} para búsquedas con acierto.
+    """
+    rng = np.random.default_rng(seed)
+    t0 = datetime(2015, 1, 1)
+    md5s: Dict[str, List[str]] = {s: [] for s in sources}
+    files = {}
+    try:
+        for s in sources:
+            out_dir = os.path.join(root, "data", "status", "verify", s)
+            os.makedirs(out_dir, exist_ok=True)
+            files[s] = open(os.path.join(out_dir, "manifest_raw.jsonl"), "w", encoding="utf-8")
+        for i in range(entries):
+            s = sources[i % len(sources)]
+            ts = t0 + timedelta(hours=i)
+            rec = {"ts_utc": f"{ts:%Y-%m-%dT%H:%M:%SZ}", "source": s}
+            if md5s[s] and (i // len(sources)) % reference_every == 0:
+                rec.update(path=f"data/raw/files/{s}/{ts:%Y/%m/%d}/{s}.csv", md5=md5s[s][-1], reference=True)
+            else:
+                md5 = hashlib.md5(rng.bytes(16)).hexdigest()
+                md5s[s].append(md5)
+                rec.update(path=f"data/raw/files/{s}/{ts:%Y/%m/%d}/{s}_{ts:%Y%m%dT%H%M%SZ}.csv", md5=md5)
+            files[s].write(json.dumps(rec) + "\n")
+    finally:
+        for f in files.values():
+            f.close()
+    return md5s
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genera un CSV AB_NYC sintético")
+    parser.add_argument("--rows", type=parse_rows, default=100_000, help="Filas (p.ej. 100k, 1m, 10m).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--changed-pct", type=float, default=0.0,
+                        help="Versión siguiente: fracción de filas modificadas (p.ej. 0.01).")
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+    path = write_ab_nyc_csv(args.out, args.rows, seed=args.seed, changed_pct=args.changed_pct)
+    print(f"{args.rows:,} filas → {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
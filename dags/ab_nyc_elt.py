@@ -6,50 +6,94 @@ from airflow.providers.common.sql.operators.sql import SQLCheckOperator
 
 DEFAULT_ARGS = {"retries": 1, "retry_delay": timedelta(minutes=3), "depends_on_past": False}
 
+# Fuentes de src.main (--source): una tarea de extracción por fuente
+SOURCES = ["ab_nyc", "banxico", "nyc_boroughs"]
+
 with DAG(
     dag_id="ab_nyc_elt",
     start_date=datetime(2025, 9, 1),
     schedule=None,          
     catchup=False,
+    max_active_runs=1,      # dbt y el estado de data/status/dbt no admiten corridas simultáneas
     default_args=DEFAULT_ARGS,
     tags=["ab_nyc", "local"],
 ) as dag:
 
-    # 1) Extrae datos RAW con tu paquete Python
-    extract_raw = BashOperator(
-        task_id="extract_raw",
+    # 1) Extrae datos RAW con tu paquete Python: una tarea por fuente, en paralelo
+    extract_raw = [
+        BashOperator(
+            task_id=f"extract_{source}",
+            bash_command=(
+                "set -euo pipefail; "
+                "cd /opt/airflow/repo; "
+                "if [ -f .env ]; then set -a; . ./.env; set +a; fi; "
+                "export PYTHONPATH=/opt/airflow/repo:${PYTHONPATH:-}; "
+                f"echo 'RUN: python -m src.main --date {{{{ ds }}}} --source {source}'; "
+                f"python -m src.main --date {{{{ ds }}}} --source {source}"
+            ),
+            env={"PYTHONPATH": "/opt/airflow/repo"},
+        )
+        for source in SOURCES
+    ]
+
+    # 2) Actualiza latest.csv dentro de ./data (versión vigente según el manifest)
+    update_symlinks = BashOperator(
+        task_id="update_symlinks",
         bash_command=(
             "set -euo pipefail; "
             "cd /opt/airflow/repo; "
             "if [ -f .env ]; then set -a; . ./.env; set +a; fi; "
             "export PYTHONPATH=/opt/airflow/repo:${PYTHONPATH:-}; "
-            "echo 'RUN: python -m src.main --date {{ ds }}'; "
-            "python -m src.main --date {{ ds }}"
+            "python -m src.load.latest_pointer"
         ),
         env={"PYTHONPATH": "/opt/airflow/repo"},
     )
 
-    # 2) Actualiza latest.csv dentro de ./data
-    
-    update_symlinks = BashOperator(
-        task_id="update_symlinks",
-        bash_command="set -euo pipefail; /usr/bin/env bash /opt/airflow/repo/scripts/update_latest_symlinks.sh; ",
+    # 2b) Carga los RAW nuevos a las tablas raw.* (COPY) + ANALYZE
+    load_raw = BashOperator(
+        task_id="load_raw",
+        bash_command=(
+            "set -euo pipefail; "
+            "cd /opt/airflow/repo; "
+            "if [ -f .env ]; then set -a; . ./.env; set +a; fi; "
+            "export PYTHONPATH=/opt/airflow/repo:${PYTHONPATH:-}; "
+            "python -m src.load.pg_copy"
+        ),
+        env={"PYTHONPATH": "/opt/airflow/repo"},
+    )
+
+    # 3a) Qué construir: solo lo que depende de las fuentes cuyo md5 cambió.
+    #     Última línea = argumentos de dbt build (XCom); exit 99 = sin cambios → skip
+    plan_dbt = BashOperator(
+        task_id="plan_dbt",
+        bash_command=(
+            "set -euo pipefail; "
+            "cd /opt/airflow/repo; "
+            "if [ -f .env ]; then set -a; . ./.env; set +a; fi; "
+            "export PYTHONPATH=/opt/airflow/repo:${PYTHONPATH:-}; "
+            "python -m src.dbt_plan"
+        ),
+        env={"PYTHONPATH": "/opt/airflow/repo"},
     )
 
-    # 3) Construcción con dbt
+    # 3b) Construcción con dbt (deps solo si cambiaron los paquetes) y registro del build
     dbt_build = BashOperator(
         task_id="dbt_build",
         bash_command=(
             "set -euo pipefail; "
             "mkdir -p /tmp/dbt_logs; "
             "export DBT_LOG_PATH=/tmp/dbt_logs; "
+            "bash /opt/airflow/repo/scripts/dbt_deps_cached.sh /opt/airflow/repo/ab_nyc_dw && "
             "cd /opt/airflow/repo/ab_nyc_dw && "
-            "dbt deps && "
-            "dbt build --profiles-dir /opt/airflow/repo/ab_nyc_dw"
+            "dbt build --profiles-dir /opt/airflow/repo/ab_nyc_dw "
+            "{{ ti.xcom_pull(task_ids='plan_dbt') }} && "
+            "cd /opt/airflow/repo && "
+            "python -m src.dbt_plan --commit"
         ),
         env={
             "DBT_PROFILES_DIR": "/opt/airflow/repo/ab_nyc_dw",
             "DBT_LOG_PATH": "/tmp/dbt_logs",
+            "PYTHONPATH": "/opt/airflow/repo",
         },
     )
 
@@ -61,13 +105,13 @@ with DAG(
             SELECT COUNT(*) >= 1
             FROM public_silver.fct_listing_snapshot
             WHERE snapshot_date_key = (
-              SELECT MAX(snapshot_date_key)
-              FROM public_silver.fct_listing_snapshot
+              SELECT snapshot_date_key
+              FROM public_silver.fct_listing_snapshot_latest_key
             );
         """,
     )
 
-    extract_raw >> update_symlinks >> dbt_build >> gold_has_rows
+    extract_raw >> update_symlinks >> load_raw >> plan_dbt >> dbt_build >> gold_has_rows
 
 
 
@@ -0,0 +1,22 @@
+#!/usr/bin/env bash
+# scripts/dbt_deps_cached.sh
+# `dbt deps` solo si faltan los paquetes o cambió packages.yml / package-lock.yml.
+# El hash de lo instalado queda en dbt_packages/.deps_sha256.
+# Uso: bash scripts/dbt_deps_cached.sh [directorio del proyecto dbt] (default ab_nyc_dw)
+
+set -euo pipefail
+
+cd "${1:-$(dirname "$0")/../ab_nyc_dw}"
+STAMP="dbt_packages/.deps_sha256"
+deps_hash () { { cat packages.yml; cat package-lock.yml 2>/dev/null || true; } | sha256sum | cut -d' ' -f1; }
+WANT="$(deps_hash)"
+
+if [ -f "$STAMP" ] && [ "$(cat "$STAMP")" = "$WANT" ]; then
+  echo "[dbt_deps] paquetes al día (${WANT:0:12}); se omite dbt deps"
+  exit 0
+fi
+
+dbt deps
+# dbt deps puede (re)escribir package-lock.yml: el hash se toma después
+deps_hash > "$STAMP"
+echo "[dbt_deps] instalados ($(cut -c1-12 "$STAMP"))"
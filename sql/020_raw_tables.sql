@@ -0,0 +1,116 @@
+-- sql/020_raw_tables.sql
+-- Tablas RAW reales (schema `raw`) que llena el loader Python (src/load/pg_copy.py)
+-- con COPY FROM STDIN. Alternativa a las foreign tables de 010 (file_fdw):
+-- - Los datos se parsean UNA vez al cargar (no en cada consulta de dbt).
+-- - Tienen estadísticas (ANALYZE tras cada carga) e índices.
+-- - Particionadas por load_date (fecha de la carpeta RAW YYYY/MM/DD): una
+--   partición por día, creada por el loader.
+-- - Las vistas raw.*_latest exponen las MISMAS columnas que raw_ext.*_latest,
+--   filtradas al archivo vigente de cada fuente (raw.latest_file).
+-- Idempotente: el loader lo re-aplica en cada corrida.
+
+CREATE SCHEMA IF NOT EXISTS raw;
+
+-- Bitácora de archivos cargados (un archivo = un md5 por fuente)
+CREATE TABLE IF NOT EXISTS raw.load_log (
+  source      text        NOT NULL,
+  file_md5    text        NOT NULL,
+  path        text        NOT NULL,
+  raw_table   text        NOT NULL,
+  load_date   date        NOT NULL,
+  rows        bigint,
+  loaded_at   timestamptz NOT NULL DEFAULT now(),
+  PRIMARY KEY (source, file_md5)
+);
+
+-- Archivo vigente por dataset (lo que antes apuntaba latest.csv)
+CREATE TABLE IF NOT EXISTS raw.latest_file (
+  dataset     text        PRIMARY KEY,
+  source      text        NOT NULL,
+  file_md5    text        NOT NULL,
+  load_date   date        NOT NULL,
+  updated_at  timestamptz NOT NULL DEFAULT now()
+);
+
+-- =========================
+-- AB_NYC
+-- =========================
+CREATE TABLE IF NOT EXISTS raw.ab_nyc (
+  id                             bigint,
+  name                           text,
+  host_id                        bigint,
+  host_name                      text,
+  neighbourhood_group            text,
+  neighbourhood                  text,
+  latitude                       double precision,
+  longitude                      double precision,
+  room_type                      text,
+  price                          numeric,
+  minimum_nights                 int,
+  number_of_reviews              int,
+  last_review                    date,
+  reviews_per_month              numeric,
+  calculated_host_listings_count int,
+  availability_365               int,
+  load_date                      date NOT NULL,
+  source                         text NOT NULL,
+  file_md5                       text NOT NULL
+) PARTITION BY RANGE (load_date);
+
+CREATE INDEX IF NOT EXISTS ab_nyc_file_id_idx ON raw.ab_nyc (file_md5, id);
+
+-- =========================
+-- BANXICO (todas las series; `source` distingue banxico / banxico_<serie>)
+-- =========================
+CREATE TABLE IF NOT EXISTS raw.banxico (
+  date       date,
+  usd_to_mxn numeric,
+  load_date  date NOT NULL,
+  source     text NOT NULL,
+  file_md5   text NOT NULL
+) PARTITION BY RANGE (load_date);
+
+CREATE INDEX IF NOT EXISTS banxico_file_date_idx ON raw.banxico (file_md5, date);
+
+-- =========================
+-- NYC BOROUGHS
+-- =========================
+CREATE TABLE IF NOT EXISTS raw.nyc_boroughs (
+  borough       text,
+  population    numeric,
+  land_area_km2 numeric,
+  density       numeric,
+  load_date     date NOT NULL,
+  source        text NOT NULL,
+  file_md5      text NOT NULL
+) PARTITION BY RANGE (load_date);
+
+CREATE INDEX IF NOT EXISTS nyc_boroughs_file_idx ON raw.nyc_boroughs (file_md5);
+
+-- =========================
+-- Vistas *_latest (mismo contrato que raw_ext.*_latest)
+-- Los filtros son subconsultas escalares → poda de particiones en ejecución.
+-- =========================
+CREATE OR REPLACE VIEW raw.ab_nyc_latest AS
+SELECT
+  id, name, host_id, host_name, neighbourhood_group, neighbourhood,
+  latitude, longitude, room_type, price, minimum_nights, number_of_reviews,
+  last_review, reviews_per_month, calculated_host_listings_count, availability_365
+FROM raw.ab_nyc
+WHERE load_date = (SELECT load_date FROM raw.latest_file WHERE dataset = 'ab_nyc')
+  AND source    = (SELECT source    FROM raw.latest_file WHERE dataset = 'ab_nyc')
+  AND file_md5  = (SELECT file_md5  FROM raw.latest_file WHERE dataset = 'ab_nyc');
+
+CREATE OR REPLACE VIEW raw.banxico_latest AS
+SELECT date, usd_to_mxn
+FROM raw.banxico
+WHERE load_date = (SELECT load_date FROM raw.latest_file WHERE dataset = 'banxico')
+  AND source    = (SELECT source    FROM raw.latest_file WHERE dataset = 'banxico')
+  AND file_md5  = (SELECT file_md5  FROM raw.latest_file WHERE dataset = 'banxico');
+
+CREATE OR REPLACE VIEW raw.nyc_boroughs_latest AS
+SELECT borough, population, land_area_km2, density
+FROM raw.nyc_boroughs
+WHERE load_date = (SELECT load_date FROM raw.latest_file WHERE dataset = 'nyc_boroughs')
+  AND source    = (SELECT source    FROM raw.latest_file WHERE dataset = 'nyc_boroughs')
+  AND file_md5  = (SELECT file_md5  FROM raw.latest_file WHERE dataset = 'nyc_boroughs');
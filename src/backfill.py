@@ -0,0 +1,260 @@
+"""
+Archivo: src/backfill.py
+Descripción:
+    Replay / backfill de snapshots históricos de AB_NYC: reconstruye las
+    particiones diarias de fct_listing_snapshot para un rango de fechas a
+    partir de las versiones RAW que ya están en el manifest.
+
+    Fases:
+      1) plan     por cada fecha, la versión AB_NYC vigente ese día según el
+                  manifest (último registro —copia o referencia diaria— con
+                  ts_utc <= fecha). Fechas sin versión previa → se omiten.
+      2) load     carga a raw.ab_nyc las versiones que falten (src.load.pg_copy).
+      3) keys     registra llaves (models/silver/keys) una vez por versión, en
+                  serie: los registros numeran desde max(llave) y no admiten
+                  corridas concurrentes.
+      4) facts    fct_listing_snapshot por fecha, en paralelo (BACKFILL_WORKERS
+                  procesos dbt, cada uno con su target/ y logs). Cada corrida
+                  pasa snapshot_date / snapshot_date_key y la versión
+                  (ab_nyc_file_md5, ab_nyc_load_date): stg_ab_nyc se compila
+                  ephemeral y solo se reemplaza la partición de esa fecha.
+                  La primera fecha corre sola (crea la tabla si falta).
+      5) finalize fct_listing_snapshot_latest_key+ (corte vigente + GOLD), una vez.
+
+    Los snapshots SCD2 (dbt snapshot) NO se reconstruyen: su historia depende
+    del orden de las corridas.
+    Cada corrida deja un resumen en data/status/backfill/runs/.
+
+Ejecución:
+    python -m src.backfill --start 2025-09-01 --end 2025-09-30 [--workers 4]
+                           [--dry-run] [--skip-load]
+"""
+
+from __future__ import annotations
+
+# Carga .env por side-effect (load_dotenv vive en config.py)
+import src.utils.config as config
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from src.load.pg_copy import load_date_for, run as run_load
+from src.utils.logger import get_logger
+from src.utils.verify import _norm_path, list_records
+
+logger = get_logger(__name__)
+
+KEYS_SELECTOR = "path:models/silver/keys"
+FACT_SELECTOR = "fct_listing_snapshot"
+FINALIZE_SELECTOR = "fct_listing_snapshot_latest_key+"
+
+# Líneas finales de la salida de dbt que se guardan en el resumen si falla
+_TAIL_LINES = 20
+
+
+class BackfillError(RuntimeError):
+    """Al menos una fecha (o fase) del backfill falló."""
+
+
+def _daterange(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def plan(start: date, end: date, source: Optional[str] = None) -> tuple[list, list]:
+    """
+    Versión AB_NYC vigente en cada fecha del rango.
+    Devuelve (entradas, fechas_omitidas); cada entrada:
+      {date, snapshot_date_key, path, md5, load_date}
+    """
+    source = source or config.LOCAL_CSV_SOURCE_NAME
+    records = list_records(source, include_references=True)  # orden (ts_utc, id)
+    entries, skipped = [], []
+    i, current = 0, None
+    for d in _daterange(start, end):
+        day = d.isoformat()
+        while i < len(records) and records[i].get("ts_utc", "")[:10] <= day:
+            current = records[i]
+            i += 1
+        if current is None:
+            skipped.append(day)
+            continue
+        entries.append({
+            "date": day,
+            "snapshot_date_key": int(d.strftime("%Y%m%d")),
+            "path": _norm_path(current["path"]),
+            "md5": current["md5"],
+            "load_date": load_date_for(current).isoformat(),
+        })
+    return entries, skipped
+
+
+def _vars_for(entry: dict) -> dict:
+    return {
+        "snapshot_date": entry["date"],
+        "snapshot_date_key": entry["snapshot_date_key"],
+        "ab_nyc_file_md5": entry["md5"],
+        "ab_nyc_load_date": entry["load_date"],
+    }
+
+
+def _dbt(args: List[str], dbt_vars: Optional[dict], workdir: str) -> dict:
+    """
+    Corre un comando dbt en el proyecto con target/ y logs propios (varios
+    procesos dbt en paralelo no pueden compartirlos). Devuelve rc, tiempo y,
+    si falla, las últimas líneas de la salida.
+    """
+    project = config.DBT_PROJECT_DIR
+    cmd = [config.DBT_BIN, *args,
+           "--profiles-dir", os.environ.get("DBT_PROFILES_DIR") or project,
+           "--target-path", os.path.join(workdir, "target"),
+           "--log-path", os.path.join(workdir, "logs")]
+    if dbt_vars:
+        cmd += ["--vars", json.dumps(dbt_vars)]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=project, capture_output=True, text=True)
+    out = {"rc": proc.returncode, "elapsed_s": round(time.perf_counter() - t0, 3)}
+    if proc.returncode != 0:
+        out["tail"] = (proc.stdout + proc.stderr).strip().splitlines()[-_TAIL_LINES:]
+    return out
+
+
+def _run_keys(entries: list, workdir: str) -> list:
+    """Fase keys: una corrida por versión distinta, en serie."""
+    results, seen = [], set()
+    for e in entries:
+        if e["md5"] in seen:
+            continue
+        seen.add(e["md5"])
+        res = _dbt(["run", "--select", KEYS_SELECTOR], _vars_for(e), os.path.join(workdir, "keys"))
+        res.update(md5=e["md5"], date=e["date"])
+        logger.info(f"[backfill] keys {e['md5']} ({e['date']}) rc={res['rc']} t={res['elapsed_s']}s")
+        results.append(res)
+        if res["rc"] != 0:
+            break
+    return results
+
+
+def _run_fact(entry: dict, workdir: str) -> dict:
+    res = _dbt(["run", "--select", FACT_SELECTOR], _vars_for(entry),
+               os.path.join(workdir, f"fact_{entry['snapshot_date_key']}"))
+    res.update(date=entry["date"], md5=entry["md5"])
+    logger.info(f"[backfill] fact {entry['date']} rc={res['rc']} t={res['elapsed_s']}s")
+    return res
+
+
+def _run_facts(entries: list, workdir: str, workers: int) -> list:
+    """Fase facts: la primera fecha sola (crea la tabla si falta), el resto en paralelo."""
+    if not entries:
+        return []
+    results = [_run_fact(entries[0], workdir)]
+    if results[0]["rc"] != 0:
+        return results
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill") as pool:
+        results += list(pool.map(lambda e: _run_fact(e, workdir), entries[1:]))
+    return results
+
+
+def _write_summary(payload: dict) -> str:
+    """Guarda en: data/status/backfill/runs/run_<timestamp>.json"""
+    now = datetime.utcnow()
+    out_dir = os.path.join("data", "status", "backfill", "runs")
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"run_{now:%Y%m%dT%H%M%SZ}.json")
+    payload = {"ts_utc": f"{now:%Y-%m-%dT%H:%M:%SZ}", **payload}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+    return path
+
+
+def run(
+    start: date,
+    end: date,
+    workers: Optional[int] = None,
+    dry_run: bool = False,
+    skip_load: bool = False,
+) -> dict:
+    """Ejecuta las fases del backfill para [start, end]. Lanza BackfillError si algo falla."""
+    if end < start:
+        raise ValueError(f"Rango vacío: {start} > {end}")
+    workers = max(1, workers or config.BACKFILL_WORKERS)
+    t0 = time.perf_counter()
+
+    entries, skipped = plan(start, end)
+    versions = len({e["md5"] for e in entries})
+    logger.info(f"[backfill] {start}..{end}: {len(entries)} fechas, {versions} versiones RAW, "
+                f"{len(skipped)} sin versión | workers={workers}")
+    for d in skipped:
+        logger.warning(f"[backfill] {d}: sin versión AB_NYC en el manifest; se omite")
+
+    summary = {"start": start.isoformat(), "end": end.isoformat(), "workers": workers,
+               "dry_run": dry_run, "skipped_dates": skipped, "plan": entries, "phases": {}}
+    if dry_run or not entries:
+        summary["wall_s"] = round(time.perf_counter() - t0, 3)
+        logger.info(f"[backfill] summary={_write_summary(summary)}")
+        return summary
+
+    phases = summary["phases"]
+    workdir = tempfile.mkdtemp(prefix="backfill_")
+    failed = None
+    try:
+        if not skip_load:
+            tp = time.perf_counter()
+            run_load(sources=[config.LOCAL_CSV_SOURCE_NAME])
+            phases["load"] = {"elapsed_s": round(time.perf_counter() - tp, 3)}
+
+        tp = time.perf_counter()
+        keys = _run_keys(entries, workdir)
+        phases["keys"] = {"elapsed_s": round(time.perf_counter() - tp, 3), "runs": keys}
+        if any(r["rc"] != 0 for r in keys):
+            failed = "keys"
+        else:
+            tp = time.perf_counter()
+            facts = _run_facts(entries, workdir, workers)
+            phases["facts"] = {"elapsed_s": round(time.perf_counter() - tp, 3), "runs": facts}
+            bad = [r["date"] for r in facts if r["rc"] != 0]
+            if bad or len(facts) < len(entries):
+                failed = f"facts ({', '.join(bad)})"
+
+            # El corte vigente y GOLD se refrescan aunque alguna fecha haya fallado
+            fin = _dbt(["run", "--select", FINALIZE_SELECTOR], None, os.path.join(workdir, "finalize"))
+            phases["finalize"] = fin
+            if fin["rc"] != 0 and not failed:
+                failed = "finalize"
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    summary["wall_s"] = round(time.perf_counter() - t0, 3)
+    fact_s = sum(r["elapsed_s"] for r in phases.get("facts", {}).get("runs", []))
+    summary["facts_sequential_s"] = round(fact_s, 3)
+    path = _write_summary(summary)
+    logger.info(f"[backfill] wall={summary['wall_s']}s | facts secuencial≈{fact_s:.1f}s "
+                f"en {phases.get('facts', {}).get('elapsed_s')}s | summary={path}")
+    if failed:
+        raise BackfillError(f"Backfill fallido en {failed}; ver {path}")
+    return summary
+
+
+def _parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay/backfill de snapshots AB_NYC (RAW → dbt)")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="Primera fecha (YYYY-MM-DD).")
+    parser.add_argument("--end", type=date.fromisoformat, default=None,
+                        help="Última fecha (YYYY-MM-DD, incluida). Default: --start.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Fechas en paralelo (default BACKFILL_WORKERS).")
+    parser.add_argument("--dry-run", action="store_true", help="Solo el plan (fecha → versión RAW).")
+    parser.add_argument("--skip-load", action="store_true", help="No cargar RAW (ya está en raw.ab_nyc).")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    run(args.start, args.end or args.start, workers=args.workers,
+        dry_run=args.dry_run, skip_load=args.skip_load)
@@ -0,0 +1,171 @@
+"""
+Archivo: src/dbt_plan.py
+Descripción:
+    Build selectivo de dbt según qué fuentes RAW cambiaron desde el último
+    build exitoso.
+
+    - Versión de cada fuente = md5 del registro vigente en el manifest (el
+      mismo que latest.csv / raw.latest_file). El último build exitoso guarda
+      esos md5 en data/status/dbt/last_build.json, junto con una huella del
+      proyecto dbt (models/, macros/, snapshots/, dbt_project.yml, packages).
+    - plan:
+        sin estado previo o proyecto dbt modificado → build completo
+        ninguna fuente cambió                       → nada que construir
+        si no → --select source:raw_ext.<fuente>_latest+ de las que cambiaron
+      Si AB_NYC no cambió se excluye fct_listing_snapshot: un día con los
+      mismos listings no escribe una partición nueva (un cambio de Banxico o
+      de boroughs solo refresca sus modelos y los que leen el hecho vigente).
+    - commit: tras `dbt build` exitoso, el plan pasa a ser el estado. Si dbt
+      falla, la corrida siguiente vuelve a planear contra el estado anterior.
+
+Ejecución (DAG: tareas plan_dbt y dbt_build):
+    python -m src.dbt_plan            # imprime los argumentos de `dbt build`
+                                      # (última línea); exit 99 = nada que hacer
+    python -m src.dbt_plan --commit   # registra el plan como último build
+"""
+
+from __future__ import annotations
+
+# Carga .env por side-effect (load_dotenv vive en config.py)
+import src.utils.config as config
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Optional
+
+from src.load.latest_pointer import POINTER_DATASETS
+from src.load.pg_copy import datasets
+from src.utils.logger import get_logger
+from src.utils.verify import find_last_record
+
+logger = get_logger(__name__)
+
+DBT_STATUS_DIR = os.path.join("data", "status", "dbt")
+STATE_PATH = os.path.join(DBT_STATUS_DIR, "last_build.json")
+PLAN_PATH = os.path.join(DBT_STATUS_DIR, "plan.json")
+
+# Hecho que solo se reconstruye si cambian los listings
+FACT_MODEL = "fct_listing_snapshot"
+
+# Exit code con el que BashOperator marca la tarea como skipped
+SKIP_EXIT_CODE = 99
+
+# Lo que cambia el resultado del build además de los datos
+_PROJECT_DIRS = ("models", "macros", "snapshots", "tests", "analyses")
+_PROJECT_FILES = ("dbt_project.yml", "packages.yml", "package-lock.yml")
+
+
+def source_selector(dataset: str) -> str:
+    return f"source:raw_ext.{dataset}_latest+"
+
+
+def project_fingerprint(project_dir: Optional[str] = None) -> str:
+    """md5 de rutas + contenido de los archivos del proyecto dbt (sin target/ ni dbt_packages/)."""
+    project_dir = project_dir or config.DBT_PROJECT_DIR
+    paths = [f for f in _PROJECT_FILES if os.path.isfile(os.path.join(project_dir, f))]
+    for d in _PROJECT_DIRS:
+        for root, _, files in os.walk(os.path.join(project_dir, d)):
+            paths += [os.path.relpath(os.path.join(root, f), project_dir) for f in files]
+    h = hashlib.md5()
+    for rel in sorted(p.replace("\\", "/") for p in paths):
+        h.update(rel.encode("utf-8"))
+        with open(os.path.join(project_dir, rel), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def current_versions() -> dict:
+    """{dataset: md5 vigente | None} de las fuentes que lee dbt."""
+    out = {}
+    for dataset, source, _ in datasets():
+        if dataset in POINTER_DATASETS:
+            rec = find_last_record(source)
+            out[dataset] = rec["md5"] if rec else None
+    return out
+
+
+def _read_json(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: str, payload: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def plan() -> dict:
+    """
+    Compara versiones y proyecto contra el último build y guarda el plan.
+    plan["args"]: None = nada que construir, "" = build completo,
+    o los --select/--exclude del build parcial.
+    """
+    state = _read_json(STATE_PATH) or {}
+    versions = current_versions()
+    project = project_fingerprint()
+    built = state.get("sources", {})
+    changed = [d for d, md5 in versions.items() if md5 != built.get(d)]
+
+    if not state or state.get("project") != project:
+        reason, args = ("sin build previo" if not state else "proyecto dbt modificado"), ""
+    elif not changed:
+        reason, args = "sin cambios en RAW", None
+    else:
+        reason = "cambiaron: " + ", ".join(changed)
+        args = "--select " + " ".join(source_selector(d) for d in changed)
+        if "ab_nyc" not in changed:
+            args += f" --exclude {FACT_MODEL}"
+
+    out = {
+        "ts_utc": f"{datetime.utcnow():%Y-%m-%dT%H:%M:%SZ}",
+        "sources": versions,
+        "project": project,
+        "changed": changed,
+        "reason": reason,
+        "args": args,
+    }
+    _write_json(PLAN_PATH, out)
+    logger.info(f"[dbt_plan] {reason} → "
+                + ("nada que construir" if args is None else f"dbt build {args or '(completo)'}"))
+    return out
+
+
+def commit() -> dict:
+    """Registra el plan vigente como último build exitoso."""
+    p = _read_json(PLAN_PATH)
+    if p is None:
+        raise FileNotFoundError(f"No hay plan en {PLAN_PATH}: correr primero `python -m src.dbt_plan`")
+    state = {"ts_utc": f"{datetime.utcnow():%Y-%m-%dT%H:%M:%SZ}",
+             "sources": p["sources"], "project": p["project"], "args": p["args"]}
+    _write_json(STATE_PATH, state)
+    os.remove(PLAN_PATH)
+    logger.info(f"[dbt_plan] build registrado | state={STATE_PATH}")
+    return state
+
+
+def _parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build selectivo de dbt según las fuentes RAW que cambiaron")
+    parser.add_argument("--commit", action="store_true",
+                        help="Registrar el plan como último build exitoso (después de dbt build).")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.commit:
+        commit()
+    else:
+        p = plan()
+        if p["args"] is None:
+            sys.exit(SKIP_EXIT_CODE)
+        # Última línea de stdout = XCom de la tarea plan_dbt
+        print(p["args"], flush=True)
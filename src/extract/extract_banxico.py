@@ -6,36 +6,79 @@ Propósito
 Extractor del tipo de cambio desde la API SIE de Banxico.
 
 Flujo:
-  1) Construye la URL (path) para una serie SIE (p.ej. FIX: SF43718).
+  1) Consulta el cache local de la serie (SQLite) para saber qué fechas ya
+     se conocen y calcula la ventana faltante hasta la fecha de corrida
+     (`as_of`, p.ej. el --date que pasa Airflow a src.main).
+  2) Construye la URL (path) para una o varias series SIE (p.ej. FIX: SF43718;
+     varias van separadas por coma en un solo request, hasta
+     BANXICO_SERIES_PER_REQUEST por request).
      - Si se especifica rango: /datos/YYYY-MM-DD/YYYY-MM-DD
      - Si no hay fechas:       /datos/oportuno (último dato disponible)
-  2) Llama la API con requests, pidiendo JSON (se envía "format=json" y "token" en params).
-  3) Normaliza la respuesta a un DataFrame con columnas:
+     Un backfill histórico se parte en ventanas de BANXICO_WINDOW_DAYS que se
+     piden en paralelo (BANXICO_MAX_WORKERS) bajo un rate limit.
+  3) Llama la API con requests, pidiendo JSON (se envía "format=json" y "token" en params).
+  4) Normaliza la respuesta a un DataFrame con columnas:
        - fecha: datetime64[ns]
        - valor: float
-  4) Guarda un CSV en RAW con la convención:
-       raw/files/banxico/YYYY/MM/DD/banxico_<serie>_<timestamp>.csv
-  5) Registra logs en consola y en archivo (via utils/logger.py)
+  5) Guarda en el cache y, SOLO si hay fechas nuevas o valores corregidos,
+     escribe un CSV por serie en RAW con esas filas:
+       raw/files/banxico/YYYY/MM/DD/banxico_<serie>_<timestamp>.csv          (serie principal)
+       raw/files/banxico_<serie>/YYYY/MM/DD/banxico_<serie>_<timestamp>.csv  (series adicionales)
+     Si no cambió nada, no hay escritura: se devuelve el último CSV publicado.
+  6) Registra logs en consola y en archivo (via utils/logger.py)
+
+Cache:
+    data/status/banxico/series_cache.sqlite
+      - rates(series_id, fecha, valor)
+      - coverage(series_id, checked_from, checked_through): rango de fechas ya
+        consultado (incluye días sin dato: fines de semana, feriados). Solo se
+        marca como cubierto hasta ayer (UTC): el dato del día puede no estar
+        publicado todavía y se vuelve a pedir en la siguiente corrida.
 
 Uso (desde el orquestador main):
-    from src.extract.extract_banxico import run
-    out_path, df = run()  # usa valores de .env
+    from src.extract.extract_banxico import run, run_many
+    out_path, df = run()                      # serie principal de .env, as_of = hoy
+    out_path, df = run(as_of=date(2025, 9, 1))
+    results = run_many(["SF43718", "SF46410"])   # {serie: (out_path, df)}
+    results = run_many()                          # todas las de BANXICO_SERIES_ID
 """
 
 from __future__ import annotations
 
 import os
-from datetime import datetime, date
-from typing import Optional, Tuple
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 import requests
 import pandas as pd
 
 from src.utils.logger import get_logger
+from src.utils.metrics import file_size, span
+from src.utils.profiling import profile_stage
 from src.utils.paths import raw_files_dir
+from src.utils.config import (
+    BANXICO_BACKFILL_START,
+    BANXICO_LOOKBACK_DAYS,
+    BANXICO_WINDOW_DAYS,
+    BANXICO_MAX_WORKERS,
+    BANXICO_MIN_INTERVAL_MS,
+    BANXICO_SERIES_PER_REQUEST,
+    BANXICO_SOURCE_NAME,
+)
+from src.utils.verify import _norm_path, find_last_record
+from src.utils.columnar import write_parquet_copy
+from src.utils.quality import schema_banxico_raw
 
 logger = get_logger(__name__)
 
+# Cache local de series (una base para todas las series)
+CACHE_PATH = os.path.join("data", "status", "banxico", "series_cache.sqlite")
+
 
 # Excepción específica del módulo
 class BanxicoError(Exception):
@@ -47,7 +90,7 @@ class BanxicoError(Exception):
 # URL builder (solo path, sin querystring)
 
 def build_url(
-    series_id: str,
+    series_id: Union[str, Sequence[str]],
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
 ) -> str:
@@ -56,13 +99,14 @@ def build_url(
 
     - Con rango de fechas: /series/<serie>/datos/YYYY-MM-DD/YYYY-MM-DD
     - Sin fechas:          /series/<serie>/datos/oportuno
+    - Varias series:       /series/<s1>,<s2>,.../datos/... (un solo request)
 
     Nota: el token y el formato se envían aparte con `params` al hacer requests.get().
 
     Parámetros
     ----------
-    series_id : str
-        Id de la serie SIE (p. ej., 'SF43718' para FIX USD→MXN).
+    series_id : str | list[str]
+        Id de la serie SIE (p. ej., 'SF43718' para FIX USD→MXN) o lista de ids.
     date_from, date_to : date | None
         Rango de fechas. Deben venir ambas o ninguna.
 
@@ -72,6 +116,8 @@ def build_url(
         URL (path completo) listo para consumir con requests junto con `params`.
     """
     base = "https://www.banxico.org.mx/SieAPIRest/service/v1/series"
+    if not isinstance(series_id, str):
+        series_id = ",".join(series_id)
 
     # Evita URLs inválidas si llega solo una de las dos fechas
     if (date_from and not date_to) or (date_to and not date_from):
@@ -85,41 +131,210 @@ def build_url(
 
 
 
-# Extractor principal (run)
+# Cache local (SQLite)
 
-def run(
-    series_id: Optional[str] = None,
-    date_from: Optional[date] = None,
-    date_to: Optional[date] = None,
-) -> Tuple[str, pd.DataFrame]:
+@contextmanager
+def _cache_conn() -> Iterator[sqlite3.Connection]:
+    """Conexión al cache (una por llamada; WAL para lectores/escritores concurrentes)."""
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=30, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rates (
+                series_id TEXT NOT NULL,
+                fecha     TEXT NOT NULL,
+                valor     REAL,
+                PRIMARY KEY (series_id, fecha)
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS coverage (
+                series_id       TEXT PRIMARY KEY,
+                checked_from    TEXT NOT NULL,
+                checked_through TEXT NOT NULL,
+                updated_utc     TEXT NOT NULL
+            )
+            """
+        )
+        yield conn
+    finally:
+        conn.close()
+
+
+def cache_coverage(series_id: str) -> Optional[Tuple[date, date]]:
+    """Rango de fechas ya consultado para la serie (o None si nunca se pidió)."""
+    with _cache_conn() as conn:
+        row = conn.execute(
+            "SELECT checked_from, checked_through FROM coverage WHERE series_id = ?", (series_id,)
+        ).fetchone()
+    if not row:
+        return None
+    return date.fromisoformat(row[0]), date.fromisoformat(row[1])
+
+
+def _cache_store(series_id: str, df: pd.DataFrame,
+                 covered: Optional[Tuple[date, date]]) -> pd.DataFrame:
     """
-    Llama la API SIE de Banxico, normaliza y persiste en RAW.
-
-    Parámetros
-    ----------
-    series_id : str | None
-        Serie a consultar. Si no se pasa, se usa BANXICO_SERIES_ID de .env (default SF43718).
-    date_from, date_to : date | None
-        Opcional: rango de fechas. Si no se especifica, usa "oportuno".
-
-    Retorna
-    -------
-    (out_path, df) : (str, pandas.DataFrame)
-        - out_path : ruta del CSV guardado en RAW
-        - df       : DataFrame con ['fecha', 'valor'], ordenado por fecha ascendente
+    Guarda las filas en el cache y extiende la cobertura.
+    Devuelve solo las filas nuevas o con valor distinto al cacheado.
     """
-    logger.info("=== EXTRACT API BANXICO ===")
-
-    # 1) Token (limpio) y serie desde .env (o parámetro)
+    rows = [
+        (series_id, f"{f:%Y-%m-%d}", None if pd.isna(v) else float(v))
+        for f, v in zip(df["fecha"], df["valor"]) if not pd.isna(f)
+    ]
+    changed = []
+    with _cache_conn() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for sid, f, v in rows:
+            prev = conn.execute(
+                "SELECT valor FROM rates WHERE series_id = ? AND fecha = ?", (sid, f)
+            ).fetchone()
+            if prev is None or prev[0] != v:
+                changed.append(f)
+                conn.execute("INSERT OR REPLACE INTO rates VALUES (?, ?, ?)", (sid, f, v))
+        if covered is not None:
+            cov = conn.execute(
+                "SELECT checked_from, checked_through FROM coverage WHERE series_id = ?", (series_id,)
+            ).fetchone()
+            lo, hi = f"{covered[0]:%Y-%m-%d}", f"{covered[1]:%Y-%m-%d}"
+            if cov:
+                lo, hi = min(lo, cov[0]), max(hi, cov[1])
+            conn.execute(
+                "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)",
+                (series_id, lo, hi, datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")),
+            )
+        conn.execute("COMMIT")
+    keep = pd.to_datetime(df["fecha"]).dt.strftime("%Y-%m-%d").isin(set(changed))
+    return df[keep].reset_index(drop=True)
+
+
+def cache_rows(series_id: str, date_from: date, date_to: date) -> pd.DataFrame:
+    """Filas cacheadas de la serie en [date_from, date_to] (mismo formato que la API)."""
+    with _cache_conn() as conn:
+        df = pd.read_sql_query(
+            "SELECT fecha, valor FROM rates WHERE series_id = ? AND fecha BETWEEN ? AND ? ORDER BY fecha",
+            conn, params=(series_id, f"{date_from:%Y-%m-%d}", f"{date_to:%Y-%m-%d}"),
+        )
+    df["fecha"] = pd.to_datetime(df["fecha"], format="%Y-%m-%d")
+    df["valor"] = df["valor"].astype("float64")
+    return df
+
+
+def cache_as_of(series_id: str, as_of: date) -> pd.DataFrame:
+    """Último dato cacheado con fecha <= as_of (equivalente a 'oportuno' para esa fecha)."""
+    with _cache_conn() as conn:
+        row = conn.execute(
+            "SELECT fecha FROM rates WHERE series_id = ? AND fecha <= ? ORDER BY fecha DESC LIMIT 1",
+            (series_id, f"{as_of:%Y-%m-%d}"),
+        ).fetchone()
+    if not row:
+        return cache_rows(series_id, as_of, as_of)  # vacío, con columnas
+    d = date.fromisoformat(row[0])
+    return cache_rows(series_id, d, d)
+
+
+
+# Ventanas faltantes + descarga concurrente con rate limit
+
+def missing_windows(
+    coverage: Optional[Tuple[date, date]],
+    start: date,
+    end: date,
+    window_days: int,
+) -> List[Tuple[date, date]]:
+    """
+    Ventanas [a, b] dentro de [start, end] que no están en `coverage`,
+    partidas en tramos de a lo sumo `window_days` días.
+    """
+    gaps: List[Tuple[date, date]] = []
+    if coverage is None:
+        gaps.append((start, end))
+    else:
+        lo, hi = coverage
+        if start < lo:
+            gaps.append((start, min(end, lo - timedelta(days=1))))
+        if end > hi:
+            gaps.append((max(start, hi + timedelta(days=1)), end))
+    out: List[Tuple[date, date]] = []
+    step = timedelta(days=max(1, window_days))
+    for a, b in gaps:
+        while a <= b:
+            out.append((a, min(b, a + step - timedelta(days=1))))
+            a += step
+    return out
+
+
+class _RateLimiter:
+    """Espacia los requests al menos `min_interval` segundos (compartido entre hilos)."""
+
+    def __init__(self, min_interval: float):
+        self._min = min_interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self._min
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_limiter = _RateLimiter(BANXICO_MIN_INTERVAL_MS / 1000.0)
+
+
+def _get_token() -> str:
     raw_token = os.getenv("BANXICO_TOKEN", "")
     token = raw_token.strip().strip("\"'")  # quita espacios/comillas que rompen la URL
     if not token:
         raise BanxicoError("Falta BANXICO_TOKEN en .env")
+    return token
+
 
-    sid = series_id or os.getenv("BANXICO_SERIES_ID", "SF43718")
+def parse_series_ids(series_id: Union[str, Sequence[str], None]) -> List[str]:
+    """'SF43718, SF46410' | ['SF43718', ...] | None (.env) → lista sin duplicados."""
+    if series_id is None:
+        series_id = os.getenv("BANXICO_SERIES_ID", "SF43718")
+    items = series_id.split(",") if isinstance(series_id, str) else list(series_id)
+    out: List[str] = []
+    for sid in (x.strip() for x in items):
+        if sid and sid not in out:
+            out.append(sid)
+    if not out:
+        raise BanxicoError("No hay series Banxico para consultar (BANXICO_SERIES_ID vacío)")
+    return out
 
-    # 2) Construcción de URL (solo path). Query se envía en params
-    url = build_url(sid, date_from=date_from, date_to=date_to)
+
+def series_source(series_id: str, primary: bool) -> str:
+    """
+    Nombre lógico (carpeta RAW / manifest / DQ) de una serie.
+    La serie principal usa BANXICO_SOURCE_NAME (default "banxico", la que lee
+    raw_ext.banxico_latest); las adicionales van a "banxico_<serie>".
+    """
+    if primary:
+        return BANXICO_SOURCE_NAME
+    return f"banxico_{series_id.lower()}"
+
+
+def _fetch(
+    series_ids: List[str],
+    token: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Un request a la API SIE (una o varias series separadas por coma) →
+    {serie: DataFrame ['fecha', 'valor'] ordenado por fecha}.
+    Con rango de fechas, una ventana sin datos (fin de semana, feriado)
+    devuelve un DataFrame vacío en lugar de error.
+    """
+    # Construcción de URL (solo path). Query se envía en params
+    url = build_url(series_ids, date_from=date_from, date_to=date_to)
     params  = {"token": token, "mediaType": "json"}
     headers = {"Accept": "application/json"}
 
@@ -131,7 +346,8 @@ def run(
     except Exception:
         pass
 
-    # 3) Llamada HTTP con manejo de error
+    # Llamada HTTP con manejo de error (respetando el rate limit)
+    _limiter.wait()
     try:
         resp = requests.get(url, params=params, headers=headers, timeout=20)
     except requests.RequestException as e:
@@ -141,33 +357,217 @@ def run(
         snippet = (resp.text or "")[:300]
         raise BanxicoError(f"HTTP {resp.status_code} {resp.reason}. Respuesta: {snippet!r}")
 
-    # 4) Parseo y normalización a DataFrame
+    # Parseo y normalización a DataFrame (una entrada por serie)
+    out: Dict[str, pd.DataFrame] = {}
     try:
         payload = resp.json()
-        # Estructura SIE: {"bmx":{"series":[{"idSerie":"...","datos":[{"fecha":"dd/mm/aaaa","dato":"xx.xx"}, ...]}]}}
-        datos = payload["bmx"]["series"][0]["datos"]
-        df = pd.DataFrame(datos)
+        # Estructura SIE: {"bmx":{"series":[{"idSerie":"...","datos":[{"fecha":"dd/mm/aaaa","dato":"xx.xx"}, ...]}, ...]}}
+        for serie in payload["bmx"]["series"]:
+            datos = serie.get("datos", []) if date_from else serie["datos"]
+            out[serie["idSerie"]] = pd.DataFrame(datos, columns=["fecha", "dato"])
     except Exception as e:
         logger.error("Respuesta inesperada al parsear JSON de Banxico", exc_info=True)
         raise BanxicoError(f"Formato inesperado en la respuesta: {e}") from e
 
-    if df.empty:
-        raise BanxicoError("La respuesta de Banxico vino vacía")
+    for sid in series_ids:
+        df = out.get(sid)
+        if df is None or (df.empty and not date_from):
+            raise BanxicoError(f"La respuesta de Banxico vino vacía para la serie {sid}")
+        # Tipado/limpieza
+        df["fecha"] = pd.to_datetime(df["fecha"], format="%d/%m/%Y", errors="coerce")
+        df["valor"] = pd.to_numeric(df["dato"].astype("string").str.replace(",", ""), errors="coerce")
+        out[sid] = df.drop(columns=["dato"]).sort_values("fecha").reset_index(drop=True)
+    return {sid: out[sid] for sid in series_ids}
+
+
+def _fetch_windows(
+    series_ids: List[str],
+    token: str,
+    windows: List[Tuple[date, date]],
+) -> Dict[str, pd.DataFrame]:
+    """
+    Pide las ventanas para un grupo de series: cada request lleva hasta
+    BANXICO_SERIES_PER_REQUEST ids separados por coma; ventanas y grupos de
+    ids se piden en paralelo (BANXICO_MAX_WORKERS) y se concatenan por serie.
+    """
+    step = max(1, BANXICO_SERIES_PER_REQUEST)
+    id_chunks = [series_ids[i:i + step] for i in range(0, len(series_ids), step)]
+    tasks = [(ids, w) for w in windows for ids in id_chunks]
+    if len(windows) > 1:
+        logger.info(f"Banxico {','.join(series_ids)}: backfill de {len(windows)} ventanas "
+                    f"({windows[0][0]} → {windows[-1][1]}) en {len(tasks)} request(s)")
+    workers = max(1, min(BANXICO_MAX_WORKERS, len(tasks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="banxico") as pool:
+        parts = list(pool.map(lambda t: _fetch(t[0], token, *t[1]), tasks))
+
+    out: Dict[str, pd.DataFrame] = {}
+    for sid in series_ids:
+        frames = [p[sid] for p in parts if sid in p]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["fecha", "valor"])
+        out[sid] = df.drop_duplicates("fecha", keep="last").sort_values("fecha").reset_index(drop=True)
+    return out
+
+
+def _publish(
+    sid: str,
+    source: str,
+    new_rows: pd.DataFrame,
+    fallback: pd.DataFrame,
+) -> Tuple[str, pd.DataFrame]:
+    """
+    Escribe en RAW (raw/files/<source>/...) las filas nuevas de una serie;
+    `source` es también el nombre en el manifest.
+    Sin filas nuevas no se escribe nada y se devuelve el último CSV publicado
+    junto con `fallback` (el dato vigente, para la DQ). Sin filas nuevas ni
+    dato vigente → BanxicoError (no se publica un CSV vacío).
+    """
+    last = find_last_record(source, include_references=False)
+    last_path = _norm_path(last["path"]) if last else None  # registros viejos traen '\\'
+    if new_rows.empty and last_path and os.path.exists(last_path):
+        logger.info(f"Banxico {sid}: sin datos nuevos. Reutilizando path: {last_path}")
+        return last_path, fallback
 
-    # Tipado/limpieza
-    df["fecha"] = pd.to_datetime(df["fecha"], format="%d/%m/%Y", errors="coerce")
-    df["valor"] = pd.to_numeric(df["dato"].str.replace(",", ""), errors="coerce")
-    df = df.drop(columns=["dato"]).sort_values("fecha").reset_index(drop=True)
+    df = new_rows if not new_rows.empty else fallback
+    if df.empty:
+        raise BanxicoError(f"Banxico {sid}: sin datos nuevos ni en cache para publicar en RAW ({source})")
 
-    # 5) Persistencia en RAW
-    out_dir = raw_files_dir(source="banxico", dt=datetime.utcnow())
+    # Persistencia en RAW
+    out_dir = raw_files_dir(source=source, dt=datetime.utcnow())
     os.makedirs(out_dir, exist_ok=True)
 
     out_name = f"banxico_{sid}_{datetime.utcnow():%Y%m%dT%H%M%SZ}.csv"
     out_path = os.path.join(out_dir, out_name)
-    df.to_csv(out_path, index=False, encoding="utf-8")
+    with span("banxico.publish", source) as sp:
+        df.to_csv(out_path, index=False, encoding="utf-8", date_format="%Y-%m-%d")
+        write_parquet_copy(out_path, schema_banxico_raw(source))  # copia columnar tipada (si hay pyarrow)
+        sp.rows, sp.bytes_written = len(df), file_size(out_path)
 
     logger.info(f"Banxico {sid}: {len(df)} filas → {out_path}")
-    logger.info("=== FIN EXTRACT API BANXICO ===")
+    return out_path, df
+
+
+
+# Extractor principal (run)
+
+def run(
+    series_id: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    as_of: Optional[date] = None,
+) -> Tuple[str, pd.DataFrame]:
+    """
+    Una serie (la principal, source BANXICO_SOURCE_NAME): ver run_many.
+    series_id: un id; si no se pasa, la primera de BANXICO_SERIES_ID.
+    Retorna (out_path, df).
+    """
+    sids = parse_series_ids(series_id)
+    if series_id is not None and len(sids) > 1:
+        raise BanxicoError(f"run() recibe una sola serie ({series_id!r}); para varias usar run_many()")
+    return run_many(sids[:1], date_from=date_from, date_to=date_to, as_of=as_of)[sids[0]]
+
+
+@profile_stage("banxico.run")
+def run_many(
+    series_ids: Union[str, Sequence[str], None] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    as_of: Optional[date] = None,
+    gate: Optional[Callable[[], Optional[str]]] = None,
+) -> Optional[Dict[str, Tuple[str, pd.DataFrame]]]:
+    """
+    Trae de la API SIE solo las fechas que el cache no conoce, normaliza y
+    persiste en RAW las filas nuevas (un archivo por serie).
+
+    Parámetros
+    ----------
+    series_ids : str | list[str] | None
+        Serie(s) a consultar: ids separados por coma o una lista.
+        Si no se pasa, se usa BANXICO_SERIES_ID de .env (default SF43718).
+        La primera es la principal (source BANXICO_SOURCE_NAME); las demás se publican
+        como "banxico_<serie>".
+    date_from, date_to : date | None
+        Opcional: rango explícito (se piden solo los tramos no cacheados).
+    as_of : date | None
+        Fecha de corrida (default: hoy UTC). Sin rango explícito se asegura
+        el cache desde BANXICO_BACKFILL_START (o as_of - BANXICO_LOOKBACK_DAYS)
+        hasta as_of.
+    gate : callable | None
+        Política estricta de main: se consulta después de los requests y
+        antes de tocar cache o RAW; si devuelve un motivo, no se guarda nada
+        (la próxima corrida vuelve a pedir esas fechas) y se retorna None.
+
+    Retorna
+    -------
+    {serie: (out_path, df)}                     (en el orden pedido)
+        - out_path : ruta del CSV guardado en RAW; si no hubo cambios, el
+                     último CSV ya publicado (no se escribe nada nuevo)
+        - df       : DataFrame con ['fecha', 'valor'], ordenado por fecha ascendente
+                     (filas nuevas; sin cambios, el último dato <= as_of o el rango pedido)
+    """
+    logger.info("=== EXTRACT API BANXICO ===")
+
+    # Evita rangos inválidos si llega solo una de las dos fechas
+    if (date_from and not date_to) or (date_to and not date_from):
+        raise BanxicoError("Debes proporcionar ambas fechas o ninguna.")
 
-    return out_path, df
\ No newline at end of file
+    # 1) Token (limpio) y series desde .env (o parámetro)
+    token = _get_token()
+    sids = parse_series_ids(series_ids)
+
+    # 2) Ventana necesaria vs cache (por serie)
+    today = datetime.utcnow().date()
+    as_of = min(as_of or today, today)
+    if date_from and date_to:
+        start, end = date_from, min(date_to, today)
+    else:
+        start = (date.fromisoformat(BANXICO_BACKFILL_START) if BANXICO_BACKFILL_START
+                 else as_of - timedelta(days=BANXICO_LOOKBACK_DAYS))
+        end = as_of
+    coverage = {sid: cache_coverage(sid) for sid in sids}
+    windows = {sid: missing_windows(coverage[sid], start, end, BANXICO_WINDOW_DAYS) for sid in sids}
+
+    # 3) Solo lo faltante: las series con las mismas ventanas comparten requests
+    groups: Dict[Tuple[Tuple[date, date], ...], List[str]] = {}
+    for sid in sids:
+        if windows[sid]:
+            groups.setdefault(tuple(windows[sid]), []).append(sid)
+
+    fetched_rows: Dict[str, Tuple[pd.DataFrame, Optional[Tuple[date, date]]]] = {}
+    for wins, group in groups.items():
+        with span("banxico.fetch", ",".join(group)) as sp:
+            fetched = _fetch_windows(group, token, list(wins))
+            sp.rows = sum(len(fetched[sid]) for sid in group)
+        # Cobertura: hasta ayer (el dato de hoy puede no estar publicado aún)
+        settled_to = min(wins[-1][1], today - timedelta(days=1))
+        for sid in group:
+            covered = (wins[0][0], settled_to) if settled_to >= wins[0][0] else None
+            cov = coverage[sid]
+            if cov and covered and not (covered[0] <= cov[1] + timedelta(days=1)
+                                        and covered[1] >= cov[0] - timedelta(days=1)):
+                covered = None  # no contigua con la cobertura previa: no se marca
+            fetched_rows[sid] = (fetched[sid], covered)
+            logger.info(f"Banxico {sid}: {len(wins)} ventana(s) | {len(fetched[sid])} filas")
+
+    # 4) Corte estricto: lo pedido se descarta sin pasar por cache ni RAW
+    reason = gate() if gate is not None else None
+    if reason:
+        logger.warning(f"Banxico: no se actualiza cache ni RAW ({reason})")
+        return None
+
+    new_rows: Dict[str, pd.DataFrame] = {}
+    for sid, (df, covered) in fetched_rows.items():
+        new_rows[sid] = _cache_store(sid, df, covered)
+        logger.info(f"Banxico {sid}: {len(new_rows[sid])} filas nuevas/cambiadas")
+
+    # 5) Publicación por serie (sin cambios → no se escribe RAW)
+    results: Dict[str, Tuple[str, pd.DataFrame]] = {}
+    for i, sid in enumerate(sids):
+        if sid not in new_rows:
+            logger.info(f"Banxico {sid}: cache cubre {start} → {end}; sin llamadas a la API")
+        fallback = cache_rows(sid, start, end) if date_from else cache_as_of(sid, as_of)
+        rows = new_rows.get(sid, fallback.iloc[0:0])
+        source = series_source(sid, primary=(i == 0))
+        results[sid] = _publish(sid, source, rows, fallback)
+
+    logger.info("=== FIN EXTRACT API BANXICO ===")
+    return results
@@ -6,80 +6,355 @@ Propósito:
 Convención:
     raw/files/<fuente>/YYYY/MM/DD/<fuente>_<timestamp>.csv
 
+Lectura en una sola pasada:
+    El archivo fuente se lee UNA vez. Cada bloque leído alimenta a la vez:
+      - el hash MD5,
+      - una copia temporal dentro de RAW (.part),
+      - el parser de pandas (omitido si DQ_CHUNK_ROWS > 0: la DQ lee el
+        archivo RAW por chunks y no hace falta el DataFrame completo).
+    Al terminar, con el MD5 ya calculado, la copia temporal se confirma con un
+    rename atómico (si el contenido es nuevo) o se descarta (si ya existía).
+    Si el fuente pesa lo mismo que la última versión registrada (lo típico
+    cuando solo cambió su mtime y no acierta el fingerprint), la lectura NO
+    escribe copia: solo si el MD5 resulta nuevo se copia después (copyfile,
+    desde el page cache). Así un día sin cambios no escribe el archivo entero.
+    En ese caso el delta tampoco se recorre en la lectura: se hace sobre la
+    copia solo si el MD5 es nuevo.
+
+Fingerprint (stat):
+    Antes de leer, se compara (path, size, mtime_ns, inode) del fuente con el
+    fingerprint guardado junto al manifest. Si coincide, no se parsea ni se
+    hashea: se reutiliza el path RAW y el conteo de filas de la corrida previa.
+    FORCE_REHASH=1 (o run(force_rehash=True)) desactiva este atajo.
+
+Copia columnar:
+    Cada versión nueva publicada en RAW se acompaña de <mismo_nombre>.parquet
+    (utils.columnar, tipos según schema_ab_nyc) si pyarrow está instalado.
+
+Delta (opcional, WRITE_DELTA=1; default 0: nada consume aún sus archivos):
+    cada versión nueva se compara por `id` (hash por fila) contra la versión
+    RAW registrada previamente (utils.delta). El recorrido de la versión nueva
+    va en la MISMA lectura: la tee pasa los bloques por un pipe a un hilo que
+    los parsea como texto contra el resumen cacheado de la base. Los archivos
+    insert/update/delete quedan en raw/delta/... y sus conteos en el campo
+    "delta" del registro del manifest. Si el delta falla, se registra la
+    versión sin él (nunca rompe la extracción).
+
 Requisitos:
-    - .env: LOCAL_CSV_PATH, LOCAL_CSV_SOURCE_NAME, RAW_DIR, LOG_LEVEL
+    - .env: LOCAL_CSV_PATH, LOCAL_CSV_SOURCE_NAME, RAW_DIR, LOG_LEVEL, FORCE_REHASH,
+            DQ_CHUNK_ROWS, WRITE_DELTA
     - utils.logger.get_logger
     - utils.paths.raw_files_dir
-    - utils.verify: md5sum, find_last_record_by_md5, register_file, register_reference
+    - utils.verify: find_last_record_by_md5, find_last_record, register_file,
+                    register_reference, file_fingerprint, fingerprint_hit, save_fingerprint
 """
 
+import contextlib
+import hashlib
+import io
 import os
 import shutil
+import tempfile
+import threading
 from datetime import datetime
+from typing import Optional
 import pandas as pd
 
 from src.utils.logger import get_logger
-from src.utils.config import LOCAL_CSV_PATH, LOCAL_CSV_SOURCE_NAME
+from src.utils.config import (
+    LOCAL_CSV_PATH, LOCAL_CSV_SOURCE_NAME, RAW_DIR, FORCE_REHASH, DQ_CHUNK_ROWS, WRITE_DELTA,
+)
 from src.utils.paths import raw_files_dir
+from src.utils.columnar import write_parquet_copy
+from src.utils.delta import row_summary, scan_version, write_delta
+from src.utils.metrics import file_size, span
+from src.utils.profiling import profile_stage
+from src.utils.quality import schema_ab_nyc
 from src.utils.verify import (
-    md5sum,
     find_last_record_by_md5,
+    find_last_record,
     register_file,
     register_reference,
+    file_fingerprint,
+    fingerprint_hit,
+    save_fingerprint,
 )
 
 logger = get_logger(__name__)
 
+# Tamaño del buffer de lectura del fuente (1 MiB, igual que md5sum)
+_READ_CHUNK = 1024 * 1024
+
+
+class _HashingTee(io.RawIOBase):
+    """
+    Stream de solo lectura sobre el archivo fuente: cada bloque leído se
+    agrega al hash y se escribe en cada sink (la copia temporal en RAW y, con
+    delta, el pipe del hilo que recorre la versión).
+    """
+
+    def __init__(self, src, *sinks):
+        self._src = src
+        self._sinks = sinks
+        self.md5 = hashlib.md5()
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
 
-def _copy_to_raw(src_path: str, ts_utc: datetime) -> str:
+    def readinto(self, b) -> int:
+        n = self._src.readinto(b)
+        if n:
+            view = memoryview(b)[:n]
+            self.md5.update(view)
+            for sink in self._sinks:
+                sink.write(view)
+            self.bytes_read += n
+        return n or 0
+
+    def drain(self) -> None:
+        """Consume lo que el parser no haya leído (hash y copia deben ser completos)."""
+        buf = bytearray(_READ_CHUNK)
+        while self.readinto(buf):
+            pass
+
+
+def _raw_path_for(ts_utc: datetime) -> str:
     """
-    Copia el archivo a RAW con convención de fecha + timestamp UTC.
-    Devuelve la ruta final escrita.
+    Ruta final en RAW con convención de fecha + timestamp UTC
+    (crea la carpeta del día).
     """
     out_dir = raw_files_dir(LOCAL_CSV_SOURCE_NAME, ts_utc)  # raw/files/<fuente>/YYYY/MM/DD/
     os.makedirs(out_dir, exist_ok=True)
-    out_path = os.path.join(
+    return os.path.join(
         out_dir,
         f"{LOCAL_CSV_SOURCE_NAME}_{ts_utc.strftime('%Y%m%dT%H%M%SZ')}.csv"
     )
-    shutil.copy2(src_path, out_path)
-    return out_path
 
 
-def run() -> tuple[str, pd.DataFrame]:
+class _DeltaScan(threading.Thread):
+    """
+    Recorre la versión que se está leyendo (scan_version) desde un pipe que
+    alimenta la tee, contra el resumen de la base. Un error no frena la
+    lectura: el hilo sigue vaciando el pipe y el delta queda en None.
+    """
+
+    def __init__(self, base_ids, base_hashes):
+        super().__init__(name="csv-delta", daemon=True)
+        r, w = os.pipe()
+        self._reader = os.fdopen(r, "rb")
+        self.writer = os.fdopen(w, "wb")
+        self._base = (base_ids, base_hashes)
+        self.scan: Optional[dict] = None
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        with self._reader:
+            try:
+                self.scan = scan_version(self._reader, *self._base)
+            except BaseException as e:
+                self.error = e
+            while self._reader.read(_READ_CHUNK):
+                pass
+
+    def finish(self) -> Optional[dict]:
+        """Cierra el pipe (EOF para el parser) y espera el resultado."""
+        self.writer.close()
+        self.join()
+        if self.error is not None:
+            logger.error(f"[delta] no se pudo recorrer la versión nueva: {self.error}")
+        return self.scan
+
+
+def _tmp_path() -> str:
+    """
+    Copia temporal en raw/files/<fuente>/ (mismo filesystem que el destino,
+    para que el rename final sea atómico); no termina en .csv, así que nunca
+    se confunde con una versión publicada.
+    """
+    tmp_dir = os.path.join(RAW_DIR, "files", LOCAL_CSV_SOURCE_NAME)
+    os.makedirs(tmp_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{LOCAL_CSV_SOURCE_NAME}_", suffix=".part", dir=tmp_dir)
+    os.close(fd)
+    return tmp_path
+
+
+def _ingest(
+    src_path: str, parse: bool = True, base: Optional[tuple] = None, copy: bool = True,
+) -> tuple[str, Optional[str], Optional[pd.DataFrame], Optional[dict]]:
+    """
+    Lee el fuente en una sola pasada: hash + copia temporal (tmp_path es None
+    con copy=False) + DataFrame (df es None con parse=False) + recorrido del
+    delta contra base ((ids, hashes) de la versión previa; scan es None sin base).
+    Devuelve (md5, tmp_path, df, scan).
+    """
+    tmp_path = _tmp_path() if copy else None
+    scanner = _DeltaScan(*base) if base is not None else None
+    scan = None
+    try:
+        if scanner is not None:
+            scanner.start()
+        with span("csv.ingest", LOCAL_CSV_SOURCE_NAME) as sp, contextlib.ExitStack() as stack:
+            src = stack.enter_context(open(src_path, "rb", buffering=0))
+            sinks = [stack.enter_context(open(tmp_path, "wb"))] if tmp_path else []
+            if scanner is not None:
+                sinks.append(scanner.writer)
+            tee = _HashingTee(src, *sinks)
+            stream = io.BufferedReader(tee, buffer_size=_READ_CHUNK)
+            df = pd.read_csv(stream) if parse else None
+            tee.drain()
+            sp.rows = len(df) if df is not None else None
+            sp.bytes_read = tee.bytes_read
+            sp.bytes_written = tee.bytes_read if tmp_path else 0
+    except BaseException:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if scanner is not None:
+            scan = scanner.finish()
+    logger.info(
+        f"[CSV] lectura única: {tee.bytes_read} bytes | hash" + (" + copia" if tmp_path else "")
+        + (" + parseo" if parse else "") + (" + delta" if scanner is not None else "")
+    )
+    return tee.md5.hexdigest(), tmp_path, df, scan
+
+
+def _same_size_as(prev: Optional[dict]) -> bool:
+    """True si el fuente pesa lo mismo que la versión previa (probable contenido igual)."""
+    if not prev or not os.path.exists(prev["path"]):
+        return False
+    return os.path.getsize(LOCAL_CSV_PATH) == os.path.getsize(prev["path"])
+
+
+def _delta_base(prev: Optional[dict]) -> Optional[tuple]:
+    """(ids, hashes) de la versión previa para el delta (None si no aplica o falla)."""
+    if WRITE_DELTA != 1 or not prev:
+        return None
+    if not os.path.exists(prev["path"]):
+        logger.warning(f"[delta] versión previa ausente: {prev['path']}; sin delta")
+        return None
+    try:
+        ids, hashes, _ = row_summary(prev["path"], LOCAL_CSV_SOURCE_NAME, prev["md5"])
+    except Exception as e:
+        logger.error(f"[delta] no se pudo resumir la versión previa {prev['path']}: {e}")
+        return None
+    return ids, hashes
+
+
+def _delta_vs_previous(
+    out_path: str, md5: str, prev: Optional[dict], scan: Optional[dict], rescan: bool = False,
+) -> Optional[dict]:
+    """
+    Delta de la versión nueva contra la previa (None si no aplica o falla).
+    Sin scan de la lectura y con rescan, recorre out_path (una pasada).
+    """
+    base = _delta_base(prev) if scan is None and rescan else None
+    if scan is None and base is None:
+        return None
+    try:
+        with span("csv.delta", LOCAL_CSV_SOURCE_NAME) as sp:
+            if scan is None:
+                scan = scan_version(out_path, *base)
+            delta = write_delta(scan, out_path, md5, prev["path"], prev["md5"], LOCAL_CSV_SOURCE_NAME)
+            sp.rows = delta["rows"]
+            sp.bytes_written = sum(file_size(f) or 0 for f in delta["files"].values())
+    except Exception as e:
+        logger.error(f"[delta] no se pudo calcular contra {prev['path']}: {e}")
+        return None
+    logger.info(
+        f"[delta] +{delta['inserted']} ~{delta['updated']} -{delta['deleted']} "
+        f"={delta['unchanged']} | {delta['elapsed_s']}s | dir={delta['dir']}"
+    )
+    return delta
+
+
+@profile_stage("csv.run")
+def run(
+    force_rehash: Optional[bool] = None, parse: Optional[bool] = None
+) -> tuple[str, Optional[pd.DataFrame], Optional[dict]]:
     """
     Ejecuta el flujo "CSV → RAW" sin duplicar si el contenido no cambió.
-    Devuelve (out_path, df) para DQ posteriores.
+    Devuelve (out_path, df, delta) para DQ posteriores; delta son los conteos
+    insert/update/delete contra la versión previa (None si no hubo versión
+    nueva, no había previa o WRITE_DELTA=0).
+    Si el fingerprint (stat) coincide con la corrida previa, df es None: el
+    conteo de filas y el reporte DQ previos están en load_fingerprint(source).
+    Con parse=False (default si DQ_CHUNK_ROWS > 0) tampoco se arma el
+    DataFrame: df es None y la DQ se hace por chunks sobre out_path.
     """
     logger.info("=== EXTRACT CSV LOCAL (no dup if same MD5) ===")
+    if force_rehash is None:
+        force_rehash = FORCE_REHASH == 1
+    if parse is None:
+        parse = DQ_CHUNK_ROWS <= 0
 
     # 1) Validar existencia del archivo fuente
     if not os.path.exists(LOCAL_CSV_PATH):
         raise FileNotFoundError(f"No encuentro el CSV original: {LOCAL_CSV_PATH}")
 
-    # 2) Leer CSV fuente (sin transformar) — para DQ posteriores
-    df = pd.read_csv(LOCAL_CSV_PATH)
+    # 2) Fingerprint por stat: si el fuente no cambió, no se lee ni se hashea
+    fp = file_fingerprint(LOCAL_CSV_PATH)
+    hit = None if force_rehash else fingerprint_hit(LOCAL_CSV_SOURCE_NAME, LOCAL_CSV_PATH)
+    if hit:
+        out_path = hit["raw_path"]
+        register_reference(source=LOCAL_CSV_SOURCE_NAME, path=out_path, md5=hit["md5"])
+        logger.info(f"[CSV] Sin cambios (fingerprint igual). Reutilizando path: {out_path}")
+        logger.info(f"[CSV] Filas (corrida previa): {hit.get('rows')}")
+        return out_path, None, None
+
+    # 3) Una sola lectura del fuente: MD5 + copia temporal + DataFrame (para DQ)
+    #    + recorrido del delta contra la versión previa (WRITE_DELTA=1)
+    #    Mismo tamaño que la versión previa → probablemente sin cambios: sin copia ni delta
+    prev = find_last_record(LOCAL_CSV_SOURCE_NAME, include_references=False)
+    likely_new = not _same_size_as(prev)
+    current_md5, tmp_path, df, scan = _ingest(
+        LOCAL_CSV_PATH, parse=parse, base=_delta_base(prev) if likely_new else None, copy=likely_new,
+    )
+    rows = int(len(df)) if df is not None else None
 
-    # 3) Calcular MD5 del fuente y decidir si copiamos o referenciamos
-    current_md5 = md5sum(LOCAL_CSV_PATH)
+    # 4) Con el MD5 decidimos si confirmamos la copia o referenciamos
     last = find_last_record_by_md5(current_md5)
 
     logger.info(f"[DBG] md5_fuente={current_md5} | last_rec_path={last['path'] if last else 'None'}")
 
+    delta = None
     if last:
-        # Sin cambios → NO copiar; registrar referencia diaria y devolver path previo
+        # Sin cambios → descartar copia; registrar referencia diaria y devolver path previo
+        if tmp_path:
+            os.remove(tmp_path)
         out_path = last["path"]
         register_reference(source=LOCAL_CSV_SOURCE_NAME, path=out_path, md5=current_md5)
         logger.info(f"[CSV] Sin cambios (MD5 igual). Reutilizando path: {out_path}")
-        logger.info(f"[CSV] Filas (del CSV fuente): {len(df)}")
-        return out_path, df
-
-    # 4) Con cambios → copiar a RAW y registrar archivo en manifest
-    now_utc = datetime.utcnow()
-    out_path = _copy_to_raw(LOCAL_CSV_PATH, now_utc)
-    register_file(path=out_path, source=LOCAL_CSV_SOURCE_NAME, md5=current_md5)
-    logger.info(f"[CSV] Copiado a RAW → {out_path} | filas={len(df)}")
-    return out_path, df
+        logger.info(f"[CSV] Filas (del CSV fuente): {rows}")
+    else:
+        # 5) Con cambios → confirmar la copia en RAW (rename atómico) y registrar en manifest
+        now_utc = datetime.utcnow()
+        out_path = _raw_path_for(now_utc)
+        if tmp_path is None:
+            # Mismo tamaño pero contenido nuevo: la copia se hace ahora (la lectura no la escribió)
+            with span("csv.copy", LOCAL_CSV_SOURCE_NAME) as sp:
+                tmp_path = _tmp_path()
+                shutil.copyfile(LOCAL_CSV_PATH, tmp_path)
+                sp.bytes_written = file_size(tmp_path)
+        shutil.copystat(LOCAL_CSV_PATH, tmp_path)  # conserva metadatos como hacía copy2
+        os.replace(tmp_path, out_path)
+        # Sin recorrido en la lectura (mismo tamaño): el delta se recorre sobre la copia
+        delta = _delta_vs_previous(out_path, current_md5, prev, scan, rescan=not likely_new)
+        register_file(
+            path=out_path, source=LOCAL_CSV_SOURCE_NAME, md5=current_md5,
+            extra={"delta": delta} if delta else None,
+        )
+        write_parquet_copy(out_path, schema_ab_nyc())  # copia columnar tipada (si hay pyarrow)
+        logger.info(f"[CSV] Copiado a RAW → {out_path} | filas={rows}")
+
+    # 6) Fingerprint para la próxima corrida (el reporte DQ y, sin parseo, las filas los completa main)
+    save_fingerprint(
+        LOCAL_CSV_SOURCE_NAME,
+        key=fp, md5=current_md5, raw_path=out_path, rows=rows,
+        dq_ok=None, dq_report=None,
+    )
+    return out_path, df, delta
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 from __future__ import annotations
-import os, re
+import hashlib, os, re
 from datetime import datetime
-from typing import Optional, Tuple, List
+from typing import Callable, Optional, Tuple, List
 
 import requests
 import pandas as pd
@@ -9,7 +9,19 @@ from bs4 import BeautifulSoup
 
 import src.utils.config as config
 from src.utils.logger import get_logger
+from src.utils.metrics import file_size, span
+from src.utils.profiling import profile_stage
+from src.utils.http_cache import (
+    load_entry,
+    save_entry,
+    conditional_headers,
+    load_parsed,
+    save_parsed,
+)
 from src.utils.paths import raw_files_dir
+from src.utils.columnar import write_parquet_copy
+from src.utils.quality import schema_nyc_boroughs
+from src.utils.verify import _norm_path, find_last_record_by_md5
 
 logger = get_logger(__name__)
 
@@ -38,16 +50,90 @@ def _clean_borough(name: str) -> str:
     """Normaliza 'The Bronx' -> 'Bronx'."""
     return (name or "").strip().replace("The Bronx", "Bronx")
 
+# ---------------------- Backends de parseo ---------------------- #
+# Cada backend parsea SOLO las tablas `table.wikitable` y devuelve, por tabla,
+# sus filas como listas de (tag, texto) con tag en {"th", "td"}. El texto
+# equivale a BeautifulSoup.get_text(strip=True). Preferencia en "auto":
+# selectolax > lxml > bs4 (con SoupStrainer, solo <table>).
+Row = List[Tuple[str, str]]
+
+def _tables_selectolax(html: str) -> List[List[Row]]:
+    try:  # dependencia opcional; desde selectolax 1.0 el backend es lexbor
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+    tables = []
+    for t in HTMLParser(html).css("table.wikitable"):
+        tables.append([
+            [(c.tag, c.text(deep=True, separator="", strip=True)) for c in tr.css("th, td")]
+            for tr in t.css("tr")
+        ])
+    return tables
+
+def _tables_lxml(html: str) -> List[List[Row]]:
+    import lxml.html  # dependencia opcional
+    root = lxml.html.fromstring(html)
+    xp = "//table[contains(concat(' ', normalize-space(@class), ' '), ' wikitable ')]"
+    tables = []
+    for t in root.xpath(xp):
+        tables.append([
+            [(c.tag, "".join(x.strip() for x in c.itertext())) for c in tr.iter("th", "td")]
+            for tr in t.iter("tr")
+        ])
+    return tables
+
+def _tables_bs4(html: str) -> List[List[Row]]:
+    from bs4 import SoupStrainer
+    try:
+        import lxml  # noqa: F401  (parser más rápido para bs4 si está instalado)
+        features = "lxml"
+    except ImportError:
+        features = "html.parser"
+    # El filtro por clase va después: al parsear, el atributo class aún no está
+    # separado por espacios ("wikitable sortable") y class_= no lo reconoce.
+    only_tables = SoupStrainer("table")
+    soup = BeautifulSoup(html, features, parse_only=only_tables)
+    tables = []
+    for t in soup.find_all("table", class_="wikitable"):
+        tables.append([
+            [(c.name, c.get_text(strip=True)) for c in tr.find_all(["th", "td"])]
+            for tr in t.find_all("tr")
+        ])
+    return tables
+
+_BACKENDS = {
+    "selectolax": _tables_selectolax,
+    "lxml": _tables_lxml,
+    "bs4": _tables_bs4,
+}
+
+def resolve_backend(name: str | None = None) -> str:
+    """Backend efectivo: el pedido (o SCRAPER_HTML_BACKEND); "auto" = el más rápido instalado."""
+    name = (name or config.SCRAPER_HTML_BACKEND or "auto").lower()
+    if name != "auto":
+        if name not in _BACKENDS:
+            raise ValueError(f"Backend HTML desconocido: {name!r} (auto|selectolax|lxml|bs4)")
+        return name
+    for candidate, module in (("selectolax", "selectolax.lexbor"), ("selectolax", "selectolax.parser"),
+                              ("lxml", "lxml.html")):
+        try:
+            __import__(module)
+            return candidate
+        except ImportError:
+            continue
+    return "bs4"
+
 # ---------------------- Detección de headers ---------------------- #
-def _collect_header_rows(table: BeautifulSoup) -> List[Tuple[int, list[str]]]:
-    """Todas las filas que son solo <th> (encabezados puros)."""
-    rows: List[Tuple[int, list[str]]] = []
-    for i, tr in enumerate(table.find_all("tr")):
-        ths = tr.find_all("th")
-        tds = tr.find_all("td")
-        if ths and not tds:  # fila de encabezado puro
-            rows.append((i, [th.get_text(strip=True) for th in ths]))
-    return rows
+def _split_table(rows: List[Row]) -> Tuple[List[Tuple[int, list[str]]], List[Row]]:
+    """
+    Una sola pasada por la tabla: separa filas de encabezado puro (solo <th>)
+    y guarda todas las filas para recortar las de datos después.
+    """
+    header_rows: List[Tuple[int, list[str]]] = []
+    for i, row in enumerate(rows):
+        if row and all(tag == "th" for tag, _ in row):  # fila de encabezado puro
+            header_rows.append((i, [text for _, text in row]))
+    return header_rows, rows
 
 def _table_matches(header_rows: List[Tuple[int, list[str]]]) -> bool:
     """
@@ -58,58 +144,44 @@ def _table_matches(header_rows: List[Tuple[int, list[str]]]) -> bool:
     all_text = " ".join(" ".join(h).lower() for _, h in header_rows)
     return ("borough" in all_text) and (("population" in all_text) or ("census" in all_text))
 
-def _find_table_by_leaf_headers(soup: BeautifulSoup) -> Tuple[BeautifulSoup, int, list[str]]:
+def extract_wikitable(
+    html: str,
+    match=_table_matches,
+    backend: str | None = None,
+) -> Tuple[list[str], list[list[str]]]:
     """
-    Entre todas las 'wikitable', elige la que cumpla _table_matches().
-    Usa la ÚLTIMA fila de <th> como encabezados 'hoja' (alinean con los <td>).
-    Devuelve (tabla, idx_fila_header, headers_leaf).
+    Entre todas las 'wikitable', elige la primera que cumpla `match(header_rows)`.
+    Usa la ÚLTIMA fila de <th> como encabezados 'hoja' (alinean con los <td>)
+    y devuelve (headers_leaf, filas_de_datos) con las celdas ya como texto.
+    Reutilizable para otras páginas (p.ej. tablas por vecindario) con otro `match`.
     """
-    for t in soup.select("table.wikitable"):
-        header_rows = _collect_header_rows(t)
-        if not header_rows:
+    for rows in _BACKENDS[resolve_backend(backend)](html):
+        header_rows, rows = _split_table(rows)
+        if not header_rows or not match(header_rows):
             continue
-        if _table_matches(header_rows):
-            idx_leaf, headers_leaf = header_rows[-1]
-            return t, idx_leaf, headers_leaf
+        header_idx, headers_leaf = header_rows[-1]
+        data_rows = [
+            [text for _, text in row][: len(headers_leaf)]
+            for row in rows[header_idx + 1 :]
+            if any(tag == "td" for tag, _ in row)  # salta filas que no son de datos
+        ]
+        return headers_leaf, [r for r in data_rows if r]
     raise RuntimeError("No encontré una 'wikitable' con Borough y Population/Census en los encabezados.")
 
-# ---------------------- Runner ---------------------- #
-def run_scraper_nyc_boroughs(
-    source_name: str | None = None,
-    url: str | None = None
-) -> Tuple[str, pd.DataFrame]:
+# ---------------------- Parser ---------------------- #
+def parse_boroughs_html(
+    html: str,
+    source_name: str = "nyc_boroughs",
+    backend: str | None = None,
+) -> pd.DataFrame:
     """
-    Descarga Wikipedia (boroughs NYC), detecta la tabla correcta (headers multinivel),
-    extrae/limpia y guarda CSV en RAW. Devuelve (ruta_salida, DataFrame).
+    Detecta la tabla correcta (headers multinivel) en el HTML, extrae y limpia.
+    Devuelve DataFrame [borough, population, land_area_km2, density_km2].
     """
-    source_name = source_name or config.SCRAPER_NYC_SOURCE_NAME
-    url         = url         or config.SCRAPER_NYC_URL
-
-    logger.info(f"[{source_name}] GET {url}")
-    resp = requests.get(
-        url,
-        headers={"User-Agent": config.HTTP_USER_AGENT},
-        timeout=config.HTTP_TIMEOUT,
-    )
-    resp.raise_for_status()
-
-    soup = BeautifulSoup(resp.text, "html.parser")
-
     # Ubica tabla y toma SOLO la última fila de encabezados (<th>)
-    table, header_idx, headers_leaf = _find_table_by_leaf_headers(soup)
+    headers_leaf, data_rows = extract_wikitable(html, backend=backend)
     logger.info(f"[{source_name}] Encabezados (leaf): {headers_leaf}")
 
-    # Recorre filas de datos a partir de la fila siguiente al header
-    data_rows: list[list[str]] = []
-    trs = table.find_all("tr")
-    for tr in trs[header_idx + 1 :]:
-        if not tr.find_all("td"):
-            continue  # salta filas que no son de datos
-        cells = tr.find_all(["td", "th"])
-        texts = [c.get_text(strip=True) for c in cells][: len(headers_leaf)]
-        if texts:
-            data_rows.append(texts)
-
     if not data_rows:
         raise RuntimeError("No se encontraron filas de datos bajo el encabezado detectado.")
 
@@ -152,15 +224,107 @@ def run_scraper_nyc_boroughs(
     found = set(df["borough"].tolist())
     if found != EXPECTED_BOROUGHS:
         logger.warning(f"[{source_name}] Boroughs encontrados={sorted(found)}; esperado={sorted(EXPECTED_BOROUGHS)}")
+    return df
 
-    # Guardado en RAW
+# ---------------------- Runner ---------------------- #
+def _table_bytes(df: pd.DataFrame) -> bytes:
+    """Contenido exacto del CSV RAW (mismo md5 que registra main._post_write)."""
+    return df.to_csv(index=False, lineterminator="\n").encode("utf-8")
+
+def _write_raw(source_name: str, df: pd.DataFrame, data: bytes) -> str:
+    """Guardado en RAW: data/raw/files/<fuente>/YYYY/MM/DD/<fuente>_<ts>.csv"""
     now = datetime.utcnow()
     out_dir = raw_files_dir(source_name, now)  # data/raw/files/<fuente>/YYYY/MM/DD
     os.makedirs(out_dir, exist_ok=True)
     filename = f"{source_name}_{now.strftime('%Y%m%dT%H%M%SZ')}.csv"
     out_path = os.path.join(out_dir, filename)
 
-    df.to_csv(out_path, index=False, encoding="utf-8", lineterminator="\n")
+    with span("scraper.write", source_name) as sp:
+        with open(out_path, "wb") as f:
+            f.write(data)
+        write_parquet_copy(out_path, schema_nyc_boroughs())  # copia columnar tipada (si hay pyarrow)
+        sp.rows, sp.bytes_written = len(df), file_size(out_path)
     logger.info(f"[{source_name}] Guardado en: {out_path} (rows={len(df)})")
+    return out_path
+
+@profile_stage("scraper.run")
+def run_scraper_nyc_boroughs(
+    source_name: str | None = None,
+    url: str | None = None,
+    gate: Callable[[], Optional[str]] | None = None,
+) -> Optional[Tuple[str, pd.DataFrame]]:
+    """
+    Descarga Wikipedia (boroughs NYC), detecta la tabla correcta (headers multinivel),
+    extrae/limpia y guarda CSV en RAW. Devuelve (ruta_salida, DataFrame).
+
+    GET condicional (utils.http_cache): se envían If-None-Match / If-Modified-Since
+    de la respuesta anterior. Con 304, o con un body idéntico (mismo MD5), no se
+    parsea ni se escribe RAW: se devuelve el path publicado antes y la tabla
+    cacheada. Un body ya visto (por MD5) reutiliza su tabla parseada, y una
+    tabla ya publicada (mismo MD5 del CSV en el manifest) reutiliza su path.
+
+    `gate` (política estricta de main) se consulta antes de escribir una
+    versión nueva en RAW: si devuelve un motivo no se escribe ni se actualiza
+    el cache HTTP, y se retorna None.
+    """
+    source_name = source_name or config.SCRAPER_NYC_SOURCE_NAME
+    url         = url         or config.SCRAPER_NYC_URL
+
+    entry = load_entry(url)
+    headers = {"User-Agent": config.HTTP_USER_AGENT, **conditional_headers(entry)}
+
+    logger.info(f"[{source_name}] GET {url}")
+    with span("scraper.fetch", source_name) as sp:
+        resp = requests.get(url, headers=headers, timeout=config.HTTP_TIMEOUT)
+        sp.bytes_read = len(resp.content)
+
+    # 304 / body sin cambios → respuesta anterior (sin parseo ni escritura)
+    prev_path = _norm_path(entry.get("raw_path")) if entry else None
+    prev_df = load_parsed(entry.get("body_md5")) if entry else None
+    if resp.status_code == 304 and prev_df is not None and prev_path and os.path.exists(prev_path):
+        logger.info(f"[{source_name}] 304 Not Modified. Reutilizando path: {prev_path}")
+        return prev_path, prev_df
+    if resp.status_code == 304:
+        # Cache incompleto (tabla o archivo RAW borrados): se pide sin condicionales
+        logger.warning(f"[{source_name}] 304 sin cache local utilizable; se repite GET completo")
+        resp = requests.get(url, headers={"User-Agent": config.HTTP_USER_AGENT}, timeout=config.HTTP_TIMEOUT)
+    resp.raise_for_status()
+
+    body_md5 = hashlib.md5(resp.content).hexdigest()
+    validators = {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "body_md5": body_md5,
+    }
+    if entry and entry.get("body_md5") == body_md5 and prev_df is not None \
+            and prev_path and os.path.exists(prev_path):
+        save_entry(url, **validators)
+        logger.info(f"[{source_name}] Body sin cambios (md5={body_md5}). Reutilizando path: {prev_path}")
+        return prev_path, prev_df
+
+    df = load_parsed(body_md5)
+    if df is None:
+        df = parse_boroughs_html(resp.text, source_name)
+        save_parsed(body_md5, df)
+    else:
+        logger.info(f"[{source_name}] Tabla ya parseada para md5={body_md5} (cache)")
+
+    # Body distinto pero la misma tabla (p.ej. cambió otra parte de la página):
+    # se reutiliza la versión RAW publicada en vez de escribir un duplicado
+    # que _post_write borraría (y dejaría al cache apuntando a un archivo ausente)
+    data = _table_bytes(df)
+    last = find_last_record_by_md5(hashlib.md5(data).hexdigest(), source=source_name)
+    last_path = _norm_path(last["path"]) if last else None  # registros viejos traen '\\'
+    if last_path and os.path.exists(last_path):
+        save_entry(url, raw_path=last_path, **validators)
+        logger.info(f"[{source_name}] Tabla sin cambios. Reutilizando path: {last_path}")
+        return last_path, df
+
+    reason = gate() if gate is not None else None
+    if reason:
+        logger.warning(f"[{source_name}] Tabla nueva sin escribir en RAW ({reason})")
+        return None
 
-    return out_path, df
\ No newline at end of file
+    out_path = _write_raw(source_name, df, data)
+    save_entry(url, raw_path=out_path, **validators)
+    return out_path, df
@@ -0,0 +1,113 @@
+# src/load/latest_pointer.py
+"""
+Punteros latest.csv: data/raw/files/<source>/latest.csv → versión vigente.
+
+- La versión vigente sale del índice del manifest (find_last_record: último
+  registro, incluidas las referencias diarias; lo mismo que raw.latest_file),
+  no de recorrer RAW ni ordenar por mtime: el costo no crece con el histórico.
+- El symlink es RELATIVO (YYYY/MM/DD/<archivo>.csv): resuelve igual en el
+  contenedor de Postgres (./data → /data, foreign tables raw_ext) y en Airflow
+  (./data → /opt/airflow/repo/data).
+- Cambio atómico: symlink temporal + os.replace (rename). Un lector (file_fdw)
+  ve el puntero anterior o el nuevo, nunca uno ausente o a medias.
+- Corre en el mismo proceso (sin `docker compose exec`); si el puntero ya
+  apunta a la versión vigente no se toca.
+
+Ejecución (después de la extracción):
+    python -m src.load.latest_pointer [--source ab_nyc ...]
+"""
+
+from __future__ import annotations
+import argparse, os, time
+from typing import List, Optional
+
+import src.utils.config as config
+from src.load.pg_copy import datasets
+from src.utils.logger import get_logger
+from src.utils.verify import _norm_path, find_last_record
+
+logger = get_logger(__name__)
+
+POINTER_NAME = "latest.csv"
+
+# Datasets con foreign table sobre latest.csv (sql/010_raw_ext_foreign_tables.sql)
+POINTER_DATASETS = ("ab_nyc", "banxico", "nyc_boroughs")
+
+
+class PointerError(RuntimeError):
+    """Al menos una fuente quedó sin puntero latest.csv válido."""
+
+
+def pointer_path(source: str) -> str:
+    """data/raw/files/<source>/latest.csv"""
+    return os.path.join(config.RAW_DIR, "files", source, POINTER_NAME)
+
+
+def update_pointer(source: str) -> dict:
+    """
+    Apunta latest.csv de `source` a su versión vigente según el manifest.
+    Devuelve {source, target, md5, changed}; lanza PointerError si no hay
+    versión o el archivo no existe.
+    """
+    rec = find_last_record(source)
+    if rec is None:
+        raise PointerError(f"{source}: sin registros en el manifest")
+    path = _norm_path(rec["path"])
+    if not os.path.isfile(path):
+        raise PointerError(f"{source}: el archivo vigente del manifest no existe: {path}")
+
+    link = pointer_path(source)
+    link_dir = os.path.dirname(link)
+    target = os.path.relpath(os.path.abspath(path), os.path.abspath(link_dir))
+    res = {"source": source, "target": target, "md5": rec["md5"], "changed": False}
+    if os.path.islink(link) and os.readlink(link) == target:
+        return res
+
+    tmp = os.path.join(link_dir, f".{POINTER_NAME}.{os.getpid()}.tmp")
+    try:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        os.symlink(target, tmp)
+        os.replace(tmp, link)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        raise
+    res["changed"] = True
+    return res
+
+
+def run(sources: Optional[List[str]] = None) -> list:
+    """Actualiza los punteros de las fuentes con foreign table (o solo `sources`)."""
+    t0 = time.perf_counter()
+    results: list = []
+    failed: List[str] = []
+    for dataset, source, _ in datasets():
+        if dataset not in POINTER_DATASETS or (sources and source not in sources):
+            continue
+        try:
+            res = update_pointer(source)
+        except (PointerError, OSError) as e:
+            # Una fuente sin versión no bloquea a las demás
+            logger.error(f"[latest] {e}")
+            failed.append(source)
+            continue
+        results.append(res)
+        state = "actualizado" if res["changed"] else "sin cambios"
+        logger.info(f"[latest] {source}: {POINTER_NAME} -> {res['target']} ({state})")
+    logger.info(f"[latest] {len(results)} punteros | t={time.perf_counter() - t0:.3f}s")
+    if failed:
+        raise PointerError(f"Sin puntero {POINTER_NAME} para: {', '.join(failed)}")
+    return results
+
+
+def _parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Actualiza los symlinks latest.csv desde el manifest")
+    parser.add_argument("--source", action="append", default=None,
+                        help="Limitar a una fuente del manifest (repetible).")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    run(sources=args.source)
@@ -0,0 +1,306 @@
+# src/load/pg_copy.py
+"""
+Load: archivos RAW → tablas Postgres del schema `raw` (sql/020_raw_tables.sql).
+
+- Por fuente recorre su manifest (versiones copiadas a RAW, en orden) y carga
+  con COPY FROM STDIN cada archivo cuyo md5 todavía no está en raw.load_log.
+  Archivo ya cargado = no se vuelve a leer.
+- Cada archivo se carga en UNA transacción: registro en raw.load_log (la PK
+  source+md5 evita cargas dobles si corren dos loaders), partición diaria
+  por load_date (fecha de la carpeta RAW YYYY/MM/DD), COPY a una tabla temporal
+  tipada e INSERT…SELECT a la partición con las columnas de carga.
+- Después actualiza raw.latest_file con el archivo vigente de cada fuente
+  (último registro del manifest, incluidas las referencias diarias: lo mismo
+  que apunta latest.csv) y corre ANALYZE sobre las particiones tocadas.
+- dbt lee las vistas raw.*_latest (var `raw_schema`, default "raw"); las
+  foreign tables de raw_ext (file_fdw) siguen disponibles como fallback.
+
+Ejecución (después de la extracción):
+    python -m src.load.pg_copy [--latest-only] [--source ab_nyc ...]
+"""
+
+from __future__ import annotations
+import argparse, csv, json, os, re, time
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import psycopg2
+from psycopg2 import sql
+
+import src.utils.config as config
+from src.extract.extract_banxico import parse_series_ids, series_source
+from src.utils.logger import get_logger
+from src.utils.verify import _norm_path, find_last_record, list_records
+
+logger = get_logger(__name__)
+
+DDL_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "sql", "020_raw_tables.sql")
+
+# Columnas de datos por tabla RAW, en el orden del CSV (COPY las asigna por posición)
+RAW_COLUMNS: Dict[str, List[str]] = {
+    "ab_nyc": [
+        "id", "name", "host_id", "host_name", "neighbourhood_group", "neighbourhood",
+        "latitude", "longitude", "room_type", "price", "minimum_nights",
+        "number_of_reviews", "last_review", "reviews_per_month",
+        "calculated_host_listings_count", "availability_365",
+    ],
+    "banxico": ["date", "usd_to_mxn"],
+    "nyc_boroughs": ["borough", "population", "land_area_km2", "density"],
+}
+
+
+class LoadError(RuntimeError):
+    """Al menos una fuente no se pudo cargar."""
+
+
+_DATE_DIR = re.compile(r"[\\/](\d{4})[\\/](\d{2})[\\/](\d{2})[\\/]")
+
+
+def datasets() -> List[Tuple[str, str, str]]:
+    """
+    (dataset, source del manifest, tabla raw) por fuente configurada.
+    `dataset` es la clave en raw.latest_file: ab_nyc / banxico / nyc_boroughs
+    alimentan las vistas *_latest; las series Banxico secundarias usan su source.
+    """
+    out = [("ab_nyc", config.LOCAL_CSV_SOURCE_NAME, "ab_nyc")]
+    for i, sid in enumerate(parse_series_ids(config.BANXICO_SERIES_ID)):
+        source = series_source(sid, primary=(i == 0))
+        out.append(("banxico" if i == 0 else source, source, "banxico"))
+    out.append(("nyc_boroughs", config.SCRAPER_NYC_SOURCE_NAME, "nyc_boroughs"))
+    return out
+
+
+def _dsn() -> str:
+    if config.RAW_LOAD_DSN:
+        return config.RAW_LOAD_DSN
+    parts = {
+        "host": config.env("POSTGRES_HOST", "postgres"),
+        "port": "5432",
+        "dbname": config.env("POSTGRES_DB", "ab_nyc_dw"),
+        "user": config.env("POSTGRES_USER", ""),
+        "password": config.env("POSTGRES_PASSWORD", ""),
+    }
+    return " ".join(f"{k}={v}" for k, v in parts.items() if v)
+
+
+def connect():
+    """Conexión al DW (psycopg2)."""
+    return psycopg2.connect(_dsn())
+
+
+def ensure_schema(conn) -> None:
+    """Aplica sql/020_raw_tables.sql (idempotente)."""
+    with open(DDL_PATH, "r", encoding="utf-8") as f:
+        ddl = f.read()
+    with conn, conn.cursor() as cur:
+        cur.execute(ddl)
+
+
+def load_date_for(rec: dict) -> date:
+    """Fecha de la carpeta RAW (…/YYYY/MM/DD/archivo.csv); si no, la del registro."""
+    m = _DATE_DIR.search(rec["path"])
+    if m:
+        return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    return date.fromisoformat(rec["ts_utc"][:10])
+
+
+def _loaded_md5s(conn, source: str) -> set:
+    with conn, conn.cursor() as cur:
+        cur.execute("SELECT file_md5 FROM raw.load_log WHERE source = %s", (source,))
+        return {r[0] for r in cur.fetchall()}
+
+
+def _ensure_partition(cur, table: str, load_date: date) -> str:
+    """Crea (si falta) la partición diaria raw.<table>_YYYYMMDD y devuelve su nombre."""
+    part = f"{table}_{load_date:%Y%m%d}"
+    cur.execute(
+        sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)").format(
+            sql.Identifier("raw", part), sql.Identifier("raw", table)
+        ),
+        (load_date, date.fromordinal(load_date.toordinal() + 1)),
+    )
+    return part
+
+
+def load_file(conn, table: str, source: str, rec: dict) -> Optional[Tuple[str, int]]:
+    """
+    Carga un archivo RAW en raw.<table> (una transacción).
+    Devuelve (partición, filas), o None si otro proceso ya lo registró.
+    """
+    cols = RAW_COLUMNS[table]
+    col_list = sql.SQL(", ").join(map(sql.Identifier, cols))
+    path = _norm_path(rec["path"])
+    load_date = load_date_for(rec)
+
+    with conn, conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO raw.load_log (source, file_md5, path, raw_table, load_date) "
+            "VALUES (%s, %s, %s, %s, %s) ON CONFLICT DO NOTHING RETURNING 1",
+            (source, rec["md5"], path, table, load_date),
+        )
+        if cur.fetchone() is None:
+            return None
+
+        part = _ensure_partition(cur, table, load_date)
+        cur.execute(
+            sql.SQL("CREATE TEMP TABLE _stage ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA").format(
+                col_list, sql.Identifier("raw", table)
+            )
+        )
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            # Columnas opcionales al final (p.ej. density en boroughs): si el
+            # CSV trae menos, se copian las primeras N y el resto queda NULL
+            n = len(next(csv.reader(f), []))
+            f.seek(0)
+            cur.copy_expert(
+                sql.SQL("COPY _stage ({}) FROM STDIN WITH (FORMAT csv, HEADER true, NULL '')")
+                .format(sql.SQL(", ").join(map(sql.Identifier, cols[:n] or cols))).as_string(cur),
+                f,
+            )
+        cur.execute(
+            sql.SQL("INSERT INTO {} ({}, load_date, source, file_md5) SELECT {}, %s, %s, %s FROM _stage").format(
+                sql.Identifier("raw", part), col_list, col_list
+            ),
+            (load_date, source, rec["md5"]),
+        )
+        rows = cur.rowcount
+        cur.execute(
+            "UPDATE raw.load_log SET rows = %s WHERE source = %s AND file_md5 = %s",
+            (rows, source, rec["md5"]),
+        )
+    return part, rows
+
+
+def _set_latest(conn, dataset: str, source: str, md5: str) -> Optional[date]:
+    """Apunta raw.latest_file[dataset] al archivo (ya cargado) con ese md5."""
+    with conn, conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO raw.latest_file (dataset, source, file_md5, load_date) "
+            "SELECT %s, source, file_md5, load_date FROM raw.load_log "
+            "WHERE source = %s AND file_md5 = %s "
+            "ON CONFLICT (dataset) DO UPDATE SET source = EXCLUDED.source, "
+            "file_md5 = EXCLUDED.file_md5, load_date = EXCLUDED.load_date, updated_at = now() "
+            "RETURNING load_date",
+            (dataset, source, md5),
+        )
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def _analyze(conn, parts: List[str]) -> None:
+    old = conn.autocommit
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            for part in parts:
+                cur.execute(sql.SQL("ANALYZE {}").format(sql.Identifier("raw", part)))
+    finally:
+        conn.autocommit = old
+
+
+def load_source(conn, dataset: str, source: str, table: str, latest_only: bool = False) -> dict:
+    """Carga los archivos nuevos de una fuente y actualiza su archivo vigente."""
+    t0 = time.perf_counter()
+    res = {"dataset": dataset, "source": source, "table": f"raw.{table}",
+           "loaded": [], "skipped": 0, "rows": 0, "latest_md5": None}
+
+    records = list_records(source)
+    if latest_only:
+        records = records[-1:]
+    done = _loaded_md5s(conn, source)
+    touched: List[str] = []
+
+    for rec in records:
+        if rec["md5"] in done:
+            res["skipped"] += 1
+            continue
+        # Registros viejos del manifest traen '\\' (rutas de Windows)
+        rec = dict(rec, path=_norm_path(rec["path"]))
+        if not os.path.exists(rec["path"]):
+            logger.warning(f"[load] {source}: archivo del manifest no existe, se omite: {rec['path']}")
+            continue
+        out = load_file(conn, table, source, rec)
+        done.add(rec["md5"])
+        if out is None:
+            logger.info(f"[load] {source}: {rec['md5']} ya registrado por otro proceso")
+            res["skipped"] += 1
+            continue
+        part, rows = out
+        touched.append(part)
+        res["loaded"].append({"path": rec["path"], "md5": rec["md5"], "partition": f"raw.{part}", "rows": rows})
+        res["rows"] += rows
+        logger.info(f"[load] {source}: {rows} filas → raw.{part} ({rec['path']})")
+
+    if touched:
+        _analyze(conn, sorted(set(touched)))
+
+    current = find_last_record(source)
+    if current and current["md5"] in done:
+        res["latest_md5"] = current["md5"]
+        res["latest_load_date"] = _set_latest(conn, dataset, source, current["md5"])
+    elif current:
+        logger.warning(f"[load] {source}: el archivo vigente ({current['path']}) no está cargado; "
+                       f"raw.latest_file[{dataset}] sin cambios")
+    res["elapsed_s"] = round(time.perf_counter() - t0, 3)
+    return res
+
+
+def _write_load_summary(results: list, wall_s: float) -> str:
+    """
+    Resumen de la carga (archivos/filas por fuente).
+    Guarda en: data/status/load/runs/run_<timestamp>.json
+    """
+    now = datetime.utcnow()
+    out_dir = os.path.join("data", "status", "load", "runs")
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"run_{now:%Y%m%dT%H%M%SZ}.json")
+    payload = {"ts_utc": f"{now:%Y-%m-%dT%H:%M:%SZ}", "wall_s": round(wall_s, 3), "sources": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+    for r in results:
+        logger.info(f"[load] {r['source']:<14} nuevos={len(r['loaded'])} omitidos={r['skipped']} "
+                    f"filas={r['rows']} t={r['elapsed_s']}s")
+    logger.info(f"[load] wall={payload['wall_s']}s | summary={path}")
+    return path
+
+
+def run(latest_only: bool = False, sources: Optional[List[str]] = None) -> list:
+    """Aplica el DDL y carga todas las fuentes configuradas (o solo `sources`)."""
+    t0 = time.perf_counter()
+    results: list = []
+    failed: List[str] = []
+    conn = connect()
+    try:
+        ensure_schema(conn)
+        for dataset, source, table in datasets():
+            if sources and source not in sources:
+                continue
+            try:
+                results.append(load_source(conn, dataset, source, table, latest_only))
+            except psycopg2.Error as e:
+                # Una fuente con error no bloquea a las demás (ya hizo rollback)
+                logger.error(f"[load] {source}: carga fallida: {e}")
+                results.append({"dataset": dataset, "source": source, "table": f"raw.{table}",
+                                "loaded": [], "skipped": 0, "rows": 0, "elapsed_s": 0.0,
+                                "error": str(e).strip()})
+                failed.append(source)
+    finally:
+        conn.close()
+    _write_load_summary(results, time.perf_counter() - t0)
+    if failed:
+        raise LoadError(f"Carga fallida para: {', '.join(failed)}")
+    return results
+
+
+def _parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Carga RAW → tablas Postgres (COPY)")
+    parser.add_argument("--latest-only", action="store_true",
+                        help="Cargar solo la última versión de cada fuente (sin histórico).")
+    parser.add_argument("--source", action="append", default=None,
+                        help="Limitar a una fuente del manifest (repetible).")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    run(latest_only=args.latest_only, sources=args.source)
@@ -6,32 +6,68 @@ Descripción:
       El extractor decide: si el MD5 ya existe → NO copia y registra referencia;
       si es nuevo → copia y registra archivo.
     - Mantenemos _post_write() para Banxico (sí genera archivo diario).
+    - Las fuentes (CSV, Banxico, scraper) corren en paralelo en un pool de
+      hilos (EXTRACT_WORKERS); cada corrida deja un resumen con estatus por
+      fuente y tiempos en data/status/extract/runs/ (para AB_NYC, además, los
+      conteos del delta contra la versión previa).
+    - STRICT_MODE / DQ_STRICT conservan el corte en orden CSV → Banxico →
+      scraper: una fuente solo publica en RAW si las anteriores no abortaron
+      la corrida (_StrictGate); las pendientes se cancelan.
+    - Cada stage es además un span de utils.metrics (pared, CPU, filas,
+      bytes): un registro JSONL por corrida + archivo Prometheus (.prom).
 
 Ejecución:
-    python -m src.main
+    python -m src.main [--date YYYY-MM-DD] [--source ab_nyc|banxico|nyc_boroughs ...]
+    (--date = fecha lógica de la corrida; Airflow pasa {{ ds }};
+     --source = solo esas fuentes: el DAG corre una tarea por fuente)
 """
 
 from __future__ import annotations
 
 # Carga .env por side-effect (load_dotenv vive en config.py)
 import src.utils.config as config  
+import src.utils.metrics as metrics
 
+import argparse
 import os
 import json
 import sys
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Callable, Optional
+
 
 from src.utils.logger import get_logger
 from src.extract.extract_csv import run as run_csv
-from src.extract.extract_banxico import run as run_banxico, BanxicoError
+from src.extract.extract_banxico import (
+    run_many as run_banxico_many,
+    BanxicoError,
+    parse_series_ids,
+    series_source,
+)
 from src.extract.web_scraping_nyc import run_scraper_nyc_boroughs
 
 # Helpers de verificación / manifest
-from src.utils.verify import file_exists_and_size, md5sum, is_duplicate, register_file
+from src.utils.verify import (
+    file_exists_and_size,
+    md5sum,
+    is_duplicate,
+    register_file,
+    register_reference,
+    find_last_record_by_path,
+    load_fingerprint,
+    save_fingerprint,
+)
+
+from src.utils.columnar import remove_parquet_copy
 
 # === IMPORTS quality ===
 from src.utils.quality import (
     validate_ab_nyc,
+    validate_ab_nyc_file,
     validate_banxico_raw,
     validate_nyc_boroughs,
 )
@@ -67,24 +103,35 @@ def _write_status(stage: str, error: str) -> str:
 def _post_write(out_path: str, source: str, min_bytes: int = 10) -> None:
     """
     Post-escritura:
+      0) si el path ya está publicado en el manifest (el extractor no escribió
+         nada nuevo) → solo registra la referencia diaria; nunca borra
       1) existencia y tamaño mínimo
       2) hash MD5 del contenido
       3) si hash ya existe en manifest → duplicado → borra archivo NUEVO
       4) si no, registra en manifest para futuras corridas
     """
+    # 0) path ya publicado → referencia (sin re-hashear ni borrar)
+    prev = find_last_record_by_path(out_path, source=source)
+    if prev:
+        register_reference(source=source, path=prev["path"], md5=prev["md5"])
+        return
+
     # 1) existencia / tamaño
     if not file_exists_and_size(out_path, min_bytes=min_bytes):
         logger.error(f"[verify] size_or_exist_fail source={source} path={out_path} min={min_bytes}")
         return
 
     # 2) hash
-    h = md5sum(out_path)
+    with metrics.span("post_write.md5", source) as sp:
+        h = md5sum(out_path)
+        sp.bytes_read = metrics.file_size(out_path)
 
     # 3) duplicado por contenido (global por md5)
     if is_duplicate(out_path, h):
         logger.warning(f"[verify] duplicate_detected source={source} path={out_path} md5={h}")
         try:
             os.remove(out_path)
+            remove_parquet_copy(out_path)
             logger.warning(f"[dedupe] removed source={source} path={out_path} md5={h}")
         except Exception as e:
             logger.error(f"[dedupe] remove_failed source={source} path={out_path} err={e}")
@@ -95,79 +142,379 @@ def _post_write(out_path: str, source: str, min_bytes: int = 10) -> None:
     logger.info(f"[verify] registered source={source} path={out_path} md5={h}")
 
 
-def main() -> None:
+# ================= Pipelines por fuente =================
+# Cada fuente corre su propio pipeline (extract → _post_write → DQ) y devuelve
+# un dict de resultado. Son independientes entre sí (archivos distintos; el
+# manifest/índice admite escrituras concurrentes), así que main() los ejecuta
+# en paralelo. Lo único que se ordena es la publicación: `gate()` espera el
+# veredicto estricto de las fuentes anteriores y devuelve el motivo para NO
+# publicar (None = publicar), como cuando corrían en serie y sys.exit cortaba.
+# Banxico y el scraper reciben el mismo gate y lo consultan antes de escribir
+# RAW (y el cache de Banxico): un aborto no deja archivos sin registrar.
+
+def _new_result(source: str, stage: str) -> dict:
+    return {
+        "source": source,
+        "stage": stage,        # carpeta de _write_status (p.ej. "banxico", "scraper_nyc")
+        "status": "ok",        # ok | failed (soft) | skipped | error (excepción no controlada)
+        "path": None,
+        "rows": None,
+        "dq_ok": None,
+        "dq_report": None,
+        "error": None,
+        "timings": {},
+    }
+
+
+def _blocked(res: dict, gate: Optional[Callable[[], Optional[str]]]) -> bool:
+    """True si una fuente anterior abortó la corrida: el resultado queda "skipped"."""
+    reason = gate() if gate is not None else None
+    if reason:
+        logger.warning(f"[strict] {res['source']}: no se publica en RAW ({reason})")
+        res.update(status="skipped", error=reason)
+    return bool(reason)
+
+
+@contextmanager
+def _timed(result: dict, step: str, source: Optional[str] = None):
     """
-    Orquesta la ejecución de los extractores hacia RAW + validaciones DQ.
+    Acumula en result["timings"] la duración (s) de un step y lo registra
+    como span de métricas (source default: la del resultado). Devuelve el
+    Span para anotar filas/bytes.
     """
-    dq_strict = int(getattr(config, "DQ_STRICT", 0))  # 0 = solo reporta, 1 = aborta si falla DQ
+    t0 = time.perf_counter()
+    try:
+        with metrics.span(step, source or result["source"]) as sp:
+            yield sp
+    finally:
+        key = f"{step}_s"
+        result["timings"][key] = round(result["timings"].get(key, 0.0) + time.perf_counter() - t0, 3)
 
-    # 1) CSV local (AB_NYC)
+
+def _pipeline_csv(run_date: Optional[date] = None, gate=None) -> dict:
+    """
+    CSV local (AB_NYC). Sus errores NO son soft-fail: se propagan.
+    Es la primera en el orden de las políticas: su publicación no espera a nadie.
+    """
+    csv_source = config.LOCAL_CSV_SOURCE_NAME
+    res = _new_result(csv_source, stage="csv")
     logger.info("=== PIPELINE: CSV → RAW ===")
-    csv_out, csv_df = run_csv()
-    logger.info(f"CSV OK | filas={len(csv_df)} | path={csv_out}")
+    with _timed(res, "extract"):
+        csv_out, csv_df, csv_delta = run_csv()
     # IMPORTANTE : NO usamos _post_write() para AB_NYC.
     # El extractor ya decidió copiar o registrar referencia en el manifest.
 
     # --- DQ CSV (AB_NYC)
-    ok_csv, rep_csv_path, _ = validate_ab_nyc(csv_df)
-    logger.info(f"[DQ] ab_nyc {'OK' if ok_csv else 'FAIL'} | report={rep_csv_path}")
-    if not ok_csv and dq_strict == 1:
-        logger.error("[DQ] estricto activado: abortando por DQ en ab_nyc (CSV).")
-        sys.exit(1)
-
+    # Fingerprint igual (csv_df None) → se reutiliza el reporte DQ de la corrida previa.
+    with _timed(res, "dq") as sp:
+        fp = load_fingerprint(csv_source) if csv_df is None else None
+        if fp and fp.get("dq_report") and os.path.exists(fp["dq_report"]):
+            ok_csv, rep_csv_path, csv_rows = bool(fp["dq_ok"]), fp["dq_report"], fp.get("rows")
+            logger.info(f"CSV OK (fingerprint) | filas={csv_rows} | path={csv_out}")
+            logger.info(f"[DQ] ab_nyc {'OK' if ok_csv else 'FAIL'} (reutilizado) | report={rep_csv_path}")
+        else:
+            if csv_df is None:
+                # Sin DataFrame (fingerprint sin reporte previo, o DQ_CHUNK_ROWS > 0):
+                # se valida la versión RAW vigente leyéndola por chunks.
+                ok_csv, rep_csv_path, rep_csv = validate_ab_nyc_file(csv_out)
+                csv_rows = rep_csv["row_count"]
+            else:
+                ok_csv, rep_csv_path, _ = validate_ab_nyc(csv_df)
+                csv_rows = len(csv_df)
+            logger.info(f"CSV OK | filas={csv_rows} | path={csv_out}")
+            logger.info(f"[DQ] ab_nyc {'OK' if ok_csv else 'FAIL'} | report={rep_csv_path}")
+            if load_fingerprint(csv_source):
+                save_fingerprint(csv_source, rows=int(csv_rows), dq_ok=ok_csv, dq_report=rep_csv_path)
+        sp.rows = csv_rows
+
+    res.update(path=csv_out, rows=csv_rows, dq_ok=ok_csv, dq_report=rep_csv_path)
+    if csv_delta:
+        # Conteos del delta contra la versión previa (las rutas quedan en el manifest)
+        res["delta"] = {k: csv_delta[k] for k in
+                        ("inserted", "updated", "deleted", "unchanged", "duplicate_ids", "dir")}
     logger.info("=== FIN CSV → RAW ===")
+    return res
 
-    # 2) API Banxico
+
+def _pipeline_banxico(run_date: Optional[date] = None, gate=None) -> dict:
+    """
+    API Banxico. BanxicoError → resultado "failed" (soft-fail lo resuelve main).
+    Con varias series (BANXICO_SERIES_ID="A,B,..."), cada una tiene su propio
+    _post_write y DQ; el resultado principal es el de la primera y el detalle
+    por serie queda en res["series"].
+    """
+    banxico_source = config.BANXICO_SOURCE_NAME
+    res = _new_result(banxico_source, stage="banxico")
     logger.info("=== PIPELINE: BANXICO → RAW ===")
     try:
-        bnx_out, bnx_df = run_banxico()
-        logger.info(f"Banxico OK | filas={len(bnx_df)} | path={bnx_out}")
-        banxico_source = getattr(config, "BANXICO_SOURCE_NAME", "banxico")
-        _post_write(bnx_out, source=banxico_source, min_bytes=5)
-
-        # --- DQ BANXICO
-        ok_bnx, rep_bnx_path, _ = validate_banxico_raw(bnx_df)
-        logger.info(f"[DQ] banxico {'OK' if ok_bnx else 'FAIL'} | report={rep_bnx_path}")
-        if not ok_bnx and dq_strict == 1:
-            logger.error("[DQ] estricto activado: abortando por DQ en Banxico.")
-            sys.exit(1)
+        sids = parse_series_ids(config.BANXICO_SERIES_ID)
+        with _timed(res, "extract"):
+            bnx_results = run_banxico_many(sids, as_of=run_date, gate=gate)
+        if _blocked(res, gate):  # bloqueado: run_banxico_many devolvió None sin tocar cache/RAW
+            return res
+
+        res["series"] = {}
+        for i, (sid, (bnx_out, bnx_df)) in enumerate(bnx_results.items()):
+            source = banxico_source if i == 0 else series_source(sid, primary=False)
+            logger.info(f"Banxico {sid} OK | filas={len(bnx_df)} | path={bnx_out}")
+            with _timed(res, "post_write", source):
+                _post_write(bnx_out, source=source, min_bytes=5)
+
+            # --- DQ BANXICO (por serie)
+            with _timed(res, "dq", source) as sp:
+                ok_bnx, rep_bnx_path, _ = validate_banxico_raw(bnx_df, source=source)
+                sp.rows = len(bnx_df)
+            logger.info(f"[DQ] {source} {'OK' if ok_bnx else 'FAIL'} | report={rep_bnx_path}")
+            res["series"][sid] = {
+                "source": source, "path": bnx_out, "rows": len(bnx_df),
+                "dq_ok": ok_bnx, "dq_report": rep_bnx_path,
+            }
+
+        first = next(iter(res["series"].values()))
+        res.update(
+            path=first["path"], rows=first["rows"], dq_report=first["dq_report"],
+            dq_ok=all(v["dq_ok"] for v in res["series"].values()),
+        )
 
     except BanxicoError as e:
         logger.error(f"BANXICO ERROR: {e}")
-        if getattr(config, "STRICT_MODE", 0) == 1:
-            sys.exit(1)
-        else:
-            status_path = _write_status(stage="banxico", error=str(e))
-            logger.warning(f"Banxico marcado FAILED (soft). Status: {status_path}")
+        res.update(status="failed", error=str(e))
     logger.info("=== FIN BANXICO → RAW ===")
+    return res
 
-    # 3) Scraper Wikipedia (NYC boroughs)
-    if getattr(config, "RUN_SCRAPER_NYC", "0") == "1":
-        logger.info("=== PIPELINE: SCRAPER NYC (Wikipedia) → RAW ===")
-        try:
-            nyc_out, nyc_df = run_scraper_nyc_boroughs()  # usa config internamente
-            logger.info(
-                f"Scraper NYC OK | filas={len(nyc_df)} | cols={list(nyc_df.columns)} | path={nyc_out}"
-            )
-            _post_write(nyc_out, source=getattr(config, "SCRAPER_NYC_SOURCE_NAME", "nyc_boroughs"), min_bytes=10)
 
-            # --- DQ NYC BOROUGHS
+def _pipeline_scraper_nyc(run_date: Optional[date] = None, gate=None) -> dict:
+    """Scraper Wikipedia (NYC boroughs). Cualquier error → resultado "failed"."""
+    nyc_source = getattr(config, "SCRAPER_NYC_SOURCE_NAME", "nyc_boroughs")
+    res = _new_result(nyc_source, stage="scraper_nyc")
+    if getattr(config, "RUN_SCRAPER_NYC", "0") != "1":
+        logger.info("SCRAPER NYC desactivado (RUN_SCRAPER_NYC != '1').")
+        res["status"] = "skipped"
+        return res
+
+    logger.info("=== PIPELINE: SCRAPER NYC (Wikipedia) → RAW ===")
+    try:
+        with _timed(res, "extract"):
+            nyc = run_scraper_nyc_boroughs(gate=gate)  # usa config internamente
+        if _blocked(res, gate):  # bloqueado: el scraper devolvió None sin escribir RAW
+            return res
+        nyc_out, nyc_df = nyc
+        logger.info(
+            f"Scraper NYC OK | filas={len(nyc_df)} | cols={list(nyc_df.columns)} | path={nyc_out}"
+        )
+        with _timed(res, "post_write"):
+            _post_write(nyc_out, source=nyc_source, min_bytes=10)
+
+        # --- DQ NYC BOROUGHS
+        with _timed(res, "dq") as sp:
             ok_nyc, rep_nyc_path, _ = validate_nyc_boroughs(nyc_df)
-            logger.info(f"[DQ] nyc_boroughs {'OK' if ok_nyc else 'FAIL'} | report={rep_nyc_path}")
-            if not ok_nyc and dq_strict == 1:
-                logger.error("[DQ] estricto activado: abortando por DQ en NYC boroughs.")
-                sys.exit(1)
+            sp.rows = len(nyc_df)
+        logger.info(f"[DQ] nyc_boroughs {'OK' if ok_nyc else 'FAIL'} | report={rep_nyc_path}")
+        res.update(path=nyc_out, rows=len(nyc_df), dq_ok=ok_nyc, dq_report=rep_nyc_path)
 
-        except Exception as e:
-            logger.error(f"SCRAPER_NYC ERROR: {e}")
-            if getattr(config, "STRICT_MODE", 0) == 1:
-                sys.exit(1)
-            else:
-                status_path = _write_status(stage="scraper_nyc", error=str(e))
-                logger.warning(f"Scraper NYC marcado FAILED (soft). Status: {status_path}")
-        logger.info("=== FIN SCRAPER NYC → RAW ===")
+    except Exception as e:
+        logger.error(f"SCRAPER_NYC ERROR: {e}")
+        res.update(status="failed", error=str(e))
+    logger.info("=== FIN SCRAPER NYC → RAW ===")
+    return res
+
+
+# (source por defecto, stage, pipeline) en el orden en que se aplican las políticas de salida
+_PIPELINES = [
+    ("ab_nyc", "csv", _pipeline_csv),
+    ("banxico", "banxico", _pipeline_banxico),
+    ("nyc_boroughs", "scraper_nyc", _pipeline_scraper_nyc),
+]
+
+
+def _capture(fn, *args) -> tuple:
+    """(resultado, None) o (None, excepción): mismo manejo en serie y en el pool."""
+    try:
+        return fn(*args), None
+    except Exception as e:
+        return None, e
+
+
+class _StrictGate:
+    """
+    Veredicto de STRICT_MODE / DQ_STRICT por posición en el orden de
+    _PIPELINES. wait(i) bloquea hasta que las fuentes 0..i-1 terminaron (o una
+    ya abortó) y devuelve el motivo del primer aborto anterior, o None.
+    Un error no controlado aborta siempre (se re-lanza al final).
+    """
+
+    def __init__(self, n: int, strict_mode: bool, dq_strict: int) -> None:
+        self._strict_mode, self._dq_strict = strict_mode, dq_strict
+        self._done = [False] * n
+        self._reasons: list = [None] * n
+        self._cond = threading.Condition()
+
+    def _reason(self, source: str, res: Optional[dict], exc: Optional[BaseException]) -> Optional[str]:
+        if exc is not None:
+            return f"error en {source}: {type(exc).__name__}"
+        if res is None:
+            return None
+        if res["status"] == "failed" and self._strict_mode:
+            return f"STRICT_MODE: {res['source']} falló"
+        if res["dq_ok"] is False and self._dq_strict == 1:
+            return f"DQ_STRICT: DQ de {res['source']} falló"
+        return None
+
+    def finish(self, i: int, source: str, res: Optional[dict], exc: Optional[BaseException]) -> None:
+        with self._cond:
+            self._reasons[i] = self._reason(source, res, exc)
+            self._done[i] = True
+            self._cond.notify_all()
+
+    def aborted(self) -> Optional[str]:
+        with self._cond:
+            return next((r for r in self._reasons if r), None)
+
+    def wait(self, i: int) -> Optional[str]:
+        with self._cond:
+            self._cond.wait_for(lambda: all(self._done[:i]) or any(self._reasons[:i]))
+            return next((r for r in self._reasons[:i] if r), None)
+
+
+def _run_pipeline(fn, run_date: Optional[date], source: str, gate=None) -> dict:
+    t0 = time.perf_counter()
+    with metrics.span("total", source) as sp:
+        res = fn(run_date, gate)
+        sp.source, sp.rows = res["source"], res.get("rows")
+    res["timings"]["total_s"] = round(time.perf_counter() - t0, 3)
+    return res
+
+
+def _run_gated(gate: _StrictGate, i: int, fn, run_date: Optional[date], source: str) -> tuple:
+    """Pipeline i con su publicación condicionada a las anteriores; registra su veredicto."""
+    res, exc = None, None
+    try:
+        res, exc = _capture(_run_pipeline, fn, run_date, source, lambda: gate.wait(i))
+    finally:
+        gate.finish(i, source, res, exc)
+    return res, exc
+
+
+def _write_run_summary(results: list, wall_s: float, workers: int, tag: str = "") -> str:
+    """
+    Resumen de la corrida (estatus por fuente + tiempos).
+    Guarda en: data/status/extract/runs/run_<timestamp>[_<tag>].json
+    (tag = fuentes de la corrida con --source: procesos en paralelo no pisan su resumen)
+    "sequential_s" es la suma de los pipelines (lo que tardaría en serie);
+    "saved_s" lo que ahorró correrlos en paralelo.
+    """
+    now = datetime.utcnow()
+    out_dir = os.path.join("data", "status", "extract", "runs")
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"run_{now:%Y%m%dT%H%M%SZ}{'_' + tag if tag else ''}.json")
+
+    sequential_s = sum(r["timings"].get("total_s", 0.0) for r in results)
+    payload = {
+        "ts_utc": f"{now:%Y-%m-%dT%H:%M:%SZ}",
+        "workers": workers,
+        "wall_s": round(wall_s, 3),
+        "sequential_s": round(sequential_s, 3),
+        "saved_s": round(sequential_s - wall_s, 3),
+        "speedup": round(sequential_s / wall_s, 2) if wall_s > 0 else None,
+        "sources": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+
+    for r in results:
+        steps = " ".join(f"{k}={v}" for k, v in r["timings"].items())
+        logger.info(f"[run] {r['source']:<14} {r['status']:<8} {steps}")
+    logger.info(
+        f"[run] wall={payload['wall_s']}s | secuencial≈{payload['sequential_s']}s | "
+        f"ahorro={payload['saved_s']}s (x{payload['speedup']}) | summary={path}"
+    )
+    return path
+
+
+def _parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extracción hacia la capa RAW + DQ")
+    parser.add_argument(
+        "--date", type=date.fromisoformat, default=None,
+        help="Fecha lógica de la corrida (YYYY-MM-DD). Define la ventana de Banxico.",
+    )
+    parser.add_argument(
+        "--source", action="append", default=None, choices=[name for name, _, _ in _PIPELINES],
+        help="Extraer solo esta fuente (repetible). Default: todas.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> None:
+    """
+    Orquesta la ejecución de los extractores hacia RAW + validaciones DQ.
+    Las fuentes corren en paralelo (EXTRACT_WORKERS hilos: son mayormente
+    I/O de red/disco). STRICT_MODE / DQ_STRICT cortan en el orden CSV →
+    Banxico → scraper, igual que en serie: tras una falla estricta las fuentes
+    siguientes no publican en RAW (las que ya extraían quedan "skipped" antes
+    de _post_write; las pendientes se cancelan) y la salida es sys.exit(1).
+    """
+    args = _parse_args(argv)
+    if args.date:
+        logger.info(f"Fecha de corrida (--date): {args.date}")
+    dq_strict = int(getattr(config, "DQ_STRICT", 0))  # 0 = solo reporta, 1 = aborta si falla DQ
+    strict_mode = getattr(config, "STRICT_MODE", 0) == 1
+    workers = max(1, int(getattr(config, "EXTRACT_WORKERS", 1)))
+    pipelines = [p for p in _PIPELINES if not args.source or p[0] in args.source]
+
+    metrics.reset()
+    t0 = time.perf_counter()
+    gate = _StrictGate(len(pipelines), strict_mode, dq_strict)
+    if workers == 1 or len(pipelines) == 1:
+        # En el hilo principal: la DQ puede repartirse en procesos (DQ_WORKERS).
+        # Tras una falla estricta no se corre el resto (como antes del pool).
+        outcomes = []
+        for i, (source, _, fn) in enumerate(pipelines):
+            outcomes.append((None, None) if gate.aborted() else _run_gated(gate, i, fn, args.date, source))
     else:
-        logger.info("SCRAPER NYC desactivado (RUN_SCRAPER_NYC != '1').")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as pool:
+            futures = [pool.submit(_run_gated, gate, i, fn, args.date, source)
+                       for i, (source, _, fn) in enumerate(pipelines)]
+            for fut in as_completed(futures):
+                if gate.aborted():
+                    for f in futures:
+                        f.cancel()
+        outcomes = [(None, None) if fut.cancelled() else fut.result() for fut in futures]
+
+    results, errors = [], {}
+    for (source, stage, _), (res, exc) in zip(pipelines, outcomes):
+        if res is None and exc is None:
+            # No llegó a correr: una fuente anterior abortó la corrida
+            res = _new_result(source, stage)
+            res.update(status="skipped", error=gate.aborted())
+        elif exc is not None:
+            # Error no controlado (p.ej. CSV fuente ausente): se re-lanza al final
+            errors[len(results)] = exc
+            res = _new_result(source, stage)
+            res.update(status="error", error=f"{type(exc).__name__}: {exc}")
+        results.append(res)
+    wall_s = time.perf_counter() - t0
+    tag = "_".join(name for name, _, _ in pipelines) if args.source else ""
+    _write_run_summary(results, wall_s, workers, tag=tag)
+    try:
+        metrics.write_run(
+            scope=tag or "all", wall_s=wall_s, workers=workers,
+            sources=[{k: r.get(k) for k in ("source", "status", "dq_ok", "rows")} for r in results],
+        )
+    except OSError as e:
+        # Las métricas son opcionales: nunca rompen la extracción
+        logger.error(f"[metrics] no se pudo escribir el registro de la corrida: {e}")
+
+    for i, res in enumerate(results):
+        if i in errors:
+            raise errors[i]
+        if res["status"] == "failed":
+            if strict_mode:
+                sys.exit(1)
+            status_path = _write_status(stage=res["stage"], error=res["error"])
+            logger.warning(f"{res['source']} marcado FAILED (soft). Status: {status_path}")
+        if res["dq_ok"] is False and dq_strict == 1:
+            logger.error(f"[DQ] estricto activado: abortando por DQ en {res['source']}.")
+            sys.exit(1)
 
     logger.info("=== PIPELINE RAW: end ===")
 
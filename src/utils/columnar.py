@@ -0,0 +1,179 @@
+# src/utils/columnar.py
+"""
+Copias columnares (Parquet) de los archivos RAW.
+
+- Junto a cada CSV publicado en RAW se escribe <mismo_nombre>.parquet en la
+  misma carpeta (raw/files/<fuente>/YYYY/MM/DD/), con tipos tomados de las
+  reglas del DatasetSchema de quality.py (int → int64, float → float64,
+  date → date32, str → string) y compresión zstd.
+- La conversión es en streaming (pyarrow.csv por bloques → ParquetWriter):
+  no carga el CSV completo en memoria.
+- Si el tipado directo falla, se reescribe con pandas coercionando a nulo;
+  si así se pierde algún valor (CSV "sucio") la copia queda marcada
+  lossless=0 en su metadata:
+  sirve para análisis, pero la DQ sigue leyendo el CSV (donde ese error se
+  reporta como type_coercion_failed).
+- pyarrow es opcional: sin él no se escribe nada y read_columnar() lee el CSV.
+"""
+
+from __future__ import annotations
+import os
+from typing import Iterator, Optional, Sequence
+
+import pandas as pd
+
+import src.utils.config as config
+from src.utils.logger import get_logger
+from src.utils.quality import DatasetSchema
+
+try:  # dependencia opcional
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+
+logger = get_logger(__name__)
+
+_ARROW_TYPES = {
+    "int": "int64",
+    "float": "float64",
+    "date": "date32",
+    "str": "string",
+}
+
+# Marca en la metadata del Parquet: 1 = mismos valores que el CSV (apto para DQ)
+_LOSSLESS_KEY = b"lossless"
+
+
+def available() -> bool:
+    """True si pyarrow está instalado y WRITE_PARQUET=1."""
+    return pa is not None and config.WRITE_PARQUET == 1
+
+
+def parquet_path_for(csv_path: str) -> str:
+    """raw/.../<nombre>.csv → raw/.../<nombre>.parquet"""
+    root, _ = os.path.splitext(csv_path)
+    return root + ".parquet"
+
+
+def arrow_types(schema: DatasetSchema) -> dict:
+    """{columna: tipo arrow} a partir de las reglas del esquema."""
+    return {r.name: pa.type_for_alias(_ARROW_TYPES[r.dtype]) for r in schema.rules}
+
+
+def _write_streaming(csv_path: str, tmp: str, types: dict) -> None:
+    convert = pacsv.ConvertOptions(column_types=types, strings_can_be_null=True)
+    reader = pacsv.open_csv(csv_path, convert_options=convert)
+    meta = {_LOSSLESS_KEY: b"1"}
+    with pq.ParquetWriter(tmp, reader.schema.with_metadata(meta), compression="zstd") as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+
+
+def _write_coerced(csv_path: str, tmp: str, schema: DatasetSchema) -> bool:
+    """
+    Fallback: pandas + coerción a nulo de lo que no tipa. Devuelve True si
+    no se perdió ningún valor (p.ej. enteros escritos como '5.0').
+    """
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=True)
+    lossless = True
+    for r in schema.rules:
+        if r.name not in df.columns:
+            continue
+        s = df[r.name]
+        if r.dtype in ("int", "float"):
+            num = pd.to_numeric(s, errors="coerce")
+            if r.dtype == "int":
+                num = num.where(num % 1 == 0)  # no enteros → nulo
+            lossless &= int(num.isna().sum()) == int(s.isna().sum())
+            df[r.name] = num.astype("Int64") if r.dtype == "int" else num
+        elif r.dtype == "date":
+            d = pd.to_datetime(s, errors="coerce")
+            lossless &= int(d.isna().sum()) == int(s.isna().sum())
+            df[r.name] = d.dt.date
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    types = arrow_types(schema)
+    table = table.cast(pa.schema([
+        pa.field(f.name, types.get(f.name, f.type)) for f in table.schema
+    ]))
+    meta = {_LOSSLESS_KEY: b"1" if lossless else b"0"}
+    pq.write_table(table.replace_schema_metadata(meta), tmp, compression="zstd")
+    return lossless
+
+
+def write_parquet_copy(csv_path: str, schema: DatasetSchema) -> Optional[str]:
+    """
+    Escribe la copia Parquet tipada de un CSV RAW (atómica: tmp + rename).
+    Devuelve la ruta, o None si pyarrow no está disponible o falló
+    (la copia es opcional: nunca rompe la extracción).
+    """
+    if not available():
+        return None
+    out = parquet_path_for(csv_path)
+    tmp = f"{out}.{os.getpid()}.part"
+    try:
+        try:
+            _write_streaming(csv_path, tmp, arrow_types(schema))
+        except pa.ArrowInvalid as e:
+            logger.debug(f"[columnar] tipado directo falló en {csv_path}: {e}")
+            if not _write_coerced(csv_path, tmp, schema):
+                logger.warning(f"[columnar] valores no tipables en {csv_path}; copia con coerción (lossless=0)")
+        os.replace(tmp, out)
+    except Exception as e:
+        logger.error(f"[columnar] no se pudo escribir {out}: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+    logger.info(f"[columnar] {out} ({os.path.getsize(out)} bytes)")
+    return out
+
+
+def remove_parquet_copy(csv_path: str) -> None:
+    """Borra la copia Parquet de un CSV (p.ej. cuando el CSV se descarta por duplicado)."""
+    path = parquet_path_for(csv_path)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def lossless_copy(csv_path: str) -> Optional[str]:
+    """Ruta de la copia Parquet si existe, pyarrow está disponible y es lossless."""
+    path = parquet_path_for(csv_path)
+    if pa is None or not os.path.exists(path):
+        return None
+    meta = pq.read_schema(path).metadata or {}
+    return path if meta.get(_LOSSLESS_KEY) == b"1" else None
+
+
+def iter_columnar(
+    csv_path: str,
+    columns: Optional[Sequence[str]] = None,
+    batch_rows: int = 500_000,
+) -> Iterator[pd.DataFrame]:
+    """
+    Itera el dataset en chunks con proyección de columnas: desde la copia
+    Parquet lossless si existe (solo lee las columnas pedidas), si no desde el CSV.
+    Las columnas pedidas que no existen en el archivo se ignoran.
+    """
+    pq_path = csv_path if csv_path.endswith(".parquet") else lossless_copy(csv_path)
+    if pq_path:
+        pf = pq.ParquetFile(pq_path)
+        cols = [c for c in columns if c in pf.schema_arrow.names] if columns else None
+        for batch in pf.iter_batches(batch_size=batch_rows, columns=cols):
+            yield batch.to_pandas(date_as_object=False)
+        return
+    usecols = (lambda c: c in set(columns)) if columns else None
+    with pd.read_csv(csv_path, chunksize=batch_rows, usecols=usecols) as reader:
+        yield from reader
+
+
+def read_columnar(csv_path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Lee el dataset completo (mismas reglas que iter_columnar)."""
+    pq_path = lossless_copy(csv_path)
+    if pq_path:
+        cols = None
+        if columns:
+            names = pq.read_schema(pq_path).names
+            cols = [c for c in columns if c in names]
+        return pq.read_table(pq_path, columns=cols).to_pandas(date_as_object=False)
+    return pd.read_csv(csv_path, usecols=(lambda c: c in set(columns)) if columns else None)
@@ -58,12 +58,74 @@ LOCAL_CSV_PATH: str        = env("LOCAL_CSV_PATH", "./inputs/AB_NYC.csv")
 LOCAL_CSV_SOURCE_NAME: str = env("LOCAL_CSV_SOURCE_NAME", "ab_nyc")
 
 # Banxico
+# Una o varias series separadas por coma (la primera es la principal: BANXICO_SOURCE_NAME)
 BANXICO_SERIES_ID: str = env("BANXICO_SERIES_ID", "SF43718")
 BANXICO_TOKEN: str = env("BANXICO_TOKEN", "")
+# Source (manifest / carpeta RAW / DQ) de la serie principal; las demás: banxico_<serie>
+BANXICO_SOURCE_NAME: str = env("BANXICO_SOURCE_NAME", "banxico")
+
+# Cache local de la serie (SQLite): solo se piden a la API las fechas faltantes
+# Inicio del histórico a backfillear (YYYY-MM-DD); vacío = solo los últimos LOOKBACK días
+BANXICO_BACKFILL_START: str = env("BANXICO_BACKFILL_START", "")
+BANXICO_LOOKBACK_DAYS: int = env_int("BANXICO_LOOKBACK_DAYS", 10)
+# Tamaño de ventana (días) por request del backfill y requests concurrentes
+BANXICO_WINDOW_DAYS: int = env_int("BANXICO_WINDOW_DAYS", 365)
+BANXICO_MAX_WORKERS: int = env_int("BANXICO_MAX_WORKERS", 4)
+# Rate limit: intervalo mínimo entre requests a la API (ms)
+BANXICO_MIN_INTERVAL_MS: int = env_int("BANXICO_MIN_INTERVAL_MS", 500)
+# Máximo de series por request (la API SIE acepta ids separados por coma)
+BANXICO_SERIES_PER_REQUEST: int = env_int("BANXICO_SERIES_PER_REQUEST", 20)
 
 # Política de fallo global: 0 = soft-fail (continúa), 1 = fail-fast (termina proceso con error)
 STRICT_MODE: int = env_int("STRICT_MODE", 0)
 
+# Copia Parquet tipada junto a cada CSV RAW (requiere pyarrow; 0 = desactivada)
+WRITE_PARQUET: int = env_int("WRITE_PARQUET", 1)
+
+# Delta AB_NYC (insert/update/delete por id) contra la versión RAW previa (0 = desactivado;
+# opt-in: ningún paso consume aún sus archivos)
+WRITE_DELTA: int = env_int("WRITE_DELTA", 0)
+
+# Cache de fingerprint (stat) del CSV fuente: 1 = ignorarla y volver a leer/hashear siempre
+FORCE_REHASH: int = env_int("FORCE_REHASH", 0)
+
+# Fuentes (CSV, Banxico, scraper) que se extraen en paralelo (1 = una tras otra)
+EXTRACT_WORKERS: int = env_int("EXTRACT_WORKERS", 3)
+
+# Métricas por stage (src/utils/metrics.py): JSONL por corrida y archivo .prom
+# (textfile collector de node_exporter; vacío = mismo directorio que el JSONL)
+METRICS_DIR: str = env("METRICS_DIR", "./data/status/metrics")
+METRICS_TEXTFILE_DIR: str = env("METRICS_TEXTFILE_DIR", "")
+
+# Perfilado opcional (src/utils/profiling.py): stages separados por coma o "all"
+# (vacío = desactivado). Reportes en data/status/profile/<run>/
+PROFILE: str = env("PROFILE", "")
+# 1 = además tracemalloc (pico y top de asignaciones por stage)
+PROFILE_MEMORY: int = env_int("PROFILE_MEMORY", 0)
+# Profiler por muestreo en lugar de cProfile ("pyinstrument", opcional; vacío = cProfile)
+PROFILE_SAMPLER: str = env("PROFILE_SAMPLER", "")
+# Líneas por reporte (funciones por tiempo acumulado / asignaciones)
+PROFILE_TOP_N: int = env_int("PROFILE_TOP_N", 30)
+
+# Benchmarks (benchmarks/bench_pipeline.py): % máximo que un caso puede ser
+# más lento que el baseline antes de fallar (exit 1)
+BENCH_MAX_REGRESSION_PCT: int = env_int("BENCH_MAX_REGRESSION_PCT", 25)
+
+# ----------------------------
+# Data Quality (DQ)
+# ----------------------------
+# Filas por chunk para validar AB_NYC en streaming (0 = DataFrame completo en memoria)
+DQ_CHUNK_ROWS: int = env_int("DQ_CHUNK_ROWS", 0)
+
+# Unicidad en modo chunks: "exact" (set de hashes) o "bloom" (aproximado, memoria fija)
+DQ_UNIQUE_MODE: str = env("DQ_UNIQUE_MODE", "exact")
+
+# Tamaño del filtro de Bloom en bits (default 2^27 = 16 MiB)
+DQ_BLOOM_BITS: int = env_int("DQ_BLOOM_BITS", 1 << 27)
+
+# Procesos para validar un DataFrame en paralelo (shards por columnas; 1 = serial)
+DQ_WORKERS: int = env_int("DQ_WORKERS", 1)
+
 # ----------------------------
 # Scraper de boroughs (Wikipedia)
 # ----------------------------
@@ -83,6 +145,29 @@ SCRAPER_NYC_URL: str = env(
 HTTP_USER_AGENT: str = env("HTTP_USER_AGENT", "Integrador-ETL/1.0 (+educativo)")
 HTTP_TIMEOUT: int    = env_int("HTTP_TIMEOUT", 30)
 
+# Backend para parsear tablas HTML: auto | selectolax | lxml | bs4
+# (auto = el más rápido instalado; bs4 siempre está disponible)
+SCRAPER_HTML_BACKEND: str = env("SCRAPER_HTML_BACKEND", "auto")
+
+
+# ----------------------------
+# Load (RAW → tablas Postgres con COPY)
+# ----------------------------
+# DSN libpq del DW para el loader (src/load/pg_copy.py). Vacío = host
+# POSTGRES_HOST (default "postgres"), puerto 5432 (red interna de compose),
+# base POSTGRES_DB y credenciales POSTGRES_USER / POSTGRES_PASSWORD.
+RAW_LOAD_DSN: str = env("RAW_LOAD_DSN", "")
+
+
+# ----------------------------
+# Backfill / replay (src/backfill.py)
+# ----------------------------
+# Proyecto dbt y ejecutable; profiles-dir = DBT_PROFILES_DIR o el proyecto
+DBT_PROJECT_DIR: str = env("DBT_PROJECT_DIR", "ab_nyc_dw")
+DBT_BIN: str = env("DBT_BIN", "dbt")
+# Fechas que se reconstruyen en paralelo (procesos dbt simultáneos)
+BACKFILL_WORKERS: int = env_int("BACKFILL_WORKERS", 4)
+
 
 if __name__ == "__main__":
     print("LOG_LEVEL       =", LOG_LEVEL)
@@ -90,9 +175,28 @@ if __name__ == "__main__":
     print("LOCAL_CSV_PATH  =", LOCAL_CSV_PATH)
     print("LOCAL_CSV_NAME  =", LOCAL_CSV_SOURCE_NAME)
     print("BANXICO_SERIES  =", BANXICO_SERIES_ID)
+    print("BANXICO_NAME    =", BANXICO_SOURCE_NAME)
+    print("BANXICO_BACKFILL=", BANXICO_BACKFILL_START or "-")
     print("STRICT_MODE     =", STRICT_MODE)
+    print("FORCE_REHASH    =", FORCE_REHASH)
+    print("WRITE_PARQUET   =", WRITE_PARQUET)
+    print("WRITE_DELTA     =", WRITE_DELTA)
+    print("EXTRACT_WORKERS =", EXTRACT_WORKERS)
+    print("METRICS_DIR     =", METRICS_DIR)
+    print("METRICS_TEXTFILE=", METRICS_TEXTFILE_DIR or "(METRICS_DIR)")
+    print("PROFILE         =", PROFILE or "(off)")
+    print("PROFILE_MEMORY  =", PROFILE_MEMORY)
+    print("PROFILE_SAMPLER =", PROFILE_SAMPLER or "(cProfile)")
+    print("PROFILE_TOP_N   =", PROFILE_TOP_N)
+    print("BENCH_MAX_REGR% =", BENCH_MAX_REGRESSION_PCT)
+    print("DQ_CHUNK_ROWS   =", DQ_CHUNK_ROWS)
+    print("DQ_UNIQUE_MODE  =", DQ_UNIQUE_MODE)
+    print("DQ_WORKERS      =", DQ_WORKERS)
     print("RUN_SCRAPER_NYC =", RUN_SCRAPER_NYC)
     print("SCRAPER_NAME    =", SCRAPER_NYC_SOURCE_NAME)
     print("SCRAPER_URL     =", SCRAPER_NYC_URL)
     print("HTTP_USER_AGENT =", HTTP_USER_AGENT)
-    print("HTTP_TIMEOUT    =", HTTP_TIMEOUT)
\ No newline at end of file
+    print("HTTP_TIMEOUT    =", HTTP_TIMEOUT)
+    print("RAW_LOAD_DSN    =", "(set)" if RAW_LOAD_DSN else "(default)")
+    print("DBT_PROJECT_DIR =", DBT_PROJECT_DIR)
+    print("BACKFILL_WORKERS=", BACKFILL_WORKERS)
\ No newline at end of file
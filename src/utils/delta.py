@@ -0,0 +1,235 @@
+# src/utils/delta.py
+"""
+Delta entre versiones consecutivas de un CSV RAW (AB_NYC), por llave `id`.
+
+- Cada versión se resume como (ids, hashes): un hash de 64 bits por fila
+  (pandas.util.hash_pandas_object sobre el TEXTO de todas las columnas, sin
+  tipar: cualquier cambio de valor cuenta). El resumen se cachea por md5 en
+  data/status/delta/<source>/<md5>.npz, así la versión base no se vuelve a
+  leer en la corrida siguiente.
+- La versión nueva se recorre UNA vez (scan_version): mientras se arma su
+  resumen, cada fila se busca en el de la base (arrays ordenados, numpy) y
+  solo se guardan las filas candidatas (id nuevo o hash distinto). Al final:
+    insert: en la nueva y no en la base
+    update: en ambas con hash distinto
+    delete: en la base y no en la nueva
+  extract_csv alimenta scan_version con la misma lectura que hace el md5 y la
+  copia a RAW (sin releer el archivo); compute_delta lo hace desde disco.
+- Los archivos delta se escriben en raw/delta/<source>/YYYY/MM/DD/<nombre>/
+  (insert.csv.gz y update.csv.gz con las filas completas de la versión nueva,
+  delete.csv.gz solo con `id`). Quedan FUERA de raw/files: los symlinks
+  latest.csv y el loader no los confunden con una versión.
+- ids no numéricos se ignoran; ids duplicados: cuenta la primera fila
+  (la DQ ya los reporta como duplicated).
+"""
+
+from __future__ import annotations
+import os
+import shutil
+import time
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+import src.utils.config as config
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DELTA_KEY = "id"
+DELTA_OPS = ("insert", "update", "delete")
+
+# Carpeta del cache de resúmenes (ids + hashes) por md5
+DELTA_STATUS_ROOT = os.path.join("data", "status", "delta")
+
+_CHUNK_ROWS = 500_000
+
+
+def delta_dir_for(raw_path: str) -> str:
+    """raw/files/<source>/YYYY/MM/DD/<nombre>.csv → raw/delta/<source>/YYYY/MM/DD/<nombre>"""
+    files_root = os.path.join(config.RAW_DIR, "files")
+    rel = os.path.relpath(os.path.splitext(raw_path)[0], files_root)
+    return os.path.join(config.RAW_DIR, "delta", rel)
+
+
+def _iter_text_chunks(path_or_buf) -> Iterator[pd.DataFrame]:
+    """CSV (ruta o stream binario) por chunks como texto crudo (sin tipar ni convertir vacíos a NaN)."""
+    chunksize = config.DQ_CHUNK_ROWS or _CHUNK_ROWS
+    with pd.read_csv(path_or_buf, dtype=str, keep_default_na=False, chunksize=chunksize) as reader:
+        yield from reader
+
+
+def _chunk_ids(chunk: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """(ids int64, máscara de filas con id válido) de un chunk."""
+    ids = pd.to_numeric(chunk[DELTA_KEY], errors="coerce")
+    valid = (ids.notna() & (ids % 1 == 0)).to_numpy()
+    return ids.to_numpy()[valid].astype(np.int64), valid
+
+
+def _summary_path(source: str, md5: str) -> str:
+    return os.path.join(DELTA_STATUS_ROOT, source, f"{md5}.npz")
+
+
+def _save_summary(source: str, md5: str, ids: np.ndarray, hashes: np.ndarray, dups: int) -> None:
+    cache = _summary_path(source, md5)
+    os.makedirs(os.path.dirname(cache), exist_ok=True)
+    tmp = f"{cache}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, ids=ids, hashes=hashes, dups=dups)
+    os.replace(tmp, cache)
+
+
+def scan_version(
+    path_or_buf, base_ids: Optional[np.ndarray] = None, base_hashes: Optional[np.ndarray] = None,
+) -> dict:
+    """
+    Una pasada por una versión: resumen (ids ordenados, hashes alineados, ids
+    duplicados) y, con base, las filas candidatas a insert/update (id ausente
+    en la base o con hash distinto), con su posición en el archivo.
+    """
+    ids_parts, hash_parts, pos_parts, cand = [], [], [], []
+    columns: list = []
+    offset = 0
+    for chunk in _iter_text_chunks(path_or_buf):
+        columns = list(chunk.columns)
+        ids, valid = _chunk_ids(chunk)
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()[valid]
+        pos = offset + np.flatnonzero(valid)
+        offset += len(chunk)
+        ids_parts.append(ids)
+        hash_parts.append(hashes)
+        pos_parts.append(pos)
+        if base_ids is not None:
+            same = np.zeros(len(ids), dtype=bool)
+            if len(base_ids):
+                at = np.searchsorted(base_ids, ids).clip(max=len(base_ids) - 1)
+                same = (base_ids[at] == ids) & (base_hashes[at] == hashes)
+            if not same.all():
+                cand.append((pos[~same], chunk[valid][~same]))
+    ids = np.concatenate(ids_parts) if ids_parts else np.empty(0, np.int64)
+    hashes = np.concatenate(hash_parts) if hash_parts else np.empty(0, np.uint64)
+    pos = np.concatenate(pos_parts) if pos_parts else np.empty(0, np.int64)
+
+    # Orden por id (estable: ante duplicados queda primero la primera fila) y dedupe
+    order = np.argsort(ids, kind="stable")
+    ids, hashes, pos = ids[order], hashes[order], pos[order]
+    first = np.ones(len(ids), dtype=bool)
+    first[1:] = ids[1:] != ids[:-1]
+    return {
+        "ids": ids[first],
+        "hashes": hashes[first],
+        "dups": int((~first).sum()),
+        "first_pos": pos[first],
+        "candidates": cand,
+        "columns": columns,
+    }
+
+
+def row_summary(path: str, source: str, md5: Optional[str] = None) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    Resumen de una versión: (ids ordenados, hashes alineados, ids duplicados).
+    Con md5, se lee/escribe el cache .npz de esa versión.
+    """
+    cache = _summary_path(source, md5) if md5 else None
+    if cache and os.path.exists(cache):
+        with np.load(cache) as z:
+            return z["ids"], z["hashes"], int(z["dups"])
+
+    scan = scan_version(path)
+    if cache:
+        _save_summary(source, md5, scan["ids"], scan["hashes"], scan["dups"])
+    return scan["ids"], scan["hashes"], scan["dups"]
+
+
+def diff_summaries(new_ids, new_hashes, base_ids, base_hashes) -> dict:
+    """Ids de insert / update / delete entre dos resúmenes (ids únicos y ordenados)."""
+    common, i_new, i_base = np.intersect1d(new_ids, base_ids, assume_unique=True, return_indices=True)
+    return {
+        "insert": np.setdiff1d(new_ids, base_ids, assume_unique=True),
+        "update": common[new_hashes[i_new] != base_hashes[i_base]],
+        "delete": np.setdiff1d(base_ids, new_ids, assume_unique=True),
+    }
+
+
+def _write_delta_files(out_dir: str, ids: dict, scan: dict) -> dict:
+    """
+    Escribe los archivos delta en out_dir (atómico: carpeta temporal + rename).
+    insert/update: filas candidatas del scan (sin segunda pasada por la
+    versión nueva), solo la primera fila de cada id. Devuelve {op: ruta}.
+    """
+    tmp_dir = f"{out_dir}.{os.getpid()}.part"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        files = {op: os.path.join(tmp_dir, f"{op}.csv.gz") for op in DELTA_OPS}
+        rows = pd.DataFrame(columns=scan["columns"])
+        if scan["candidates"]:
+            rows = pd.concat([c for _, c in scan["candidates"]], ignore_index=True)
+            rows = rows[np.isin(np.concatenate([p for p, _ in scan["candidates"]]), scan["first_pos"])]
+        rows_ids = pd.to_numeric(rows[DELTA_KEY]).to_numpy() if len(rows) else np.empty(0, np.int64)
+        for op in ("insert", "update"):
+            rows[np.isin(rows_ids, ids[op])].to_csv(files[op], index=False, compression="gzip")
+        pd.DataFrame({DELTA_KEY: ids["delete"]}).to_csv(files["delete"], index=False, compression="gzip")
+
+        if os.path.exists(out_dir):
+            shutil.rmtree(out_dir)
+        os.makedirs(os.path.dirname(out_dir), exist_ok=True)
+        os.replace(tmp_dir, out_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return {op: os.path.join(out_dir, f"{op}.csv.gz") for op in DELTA_OPS}
+
+
+def write_delta(
+    scan: dict,
+    new_path: str,
+    new_md5: str,
+    base_path: str,
+    base_md5: str,
+    source: str,
+) -> dict:
+    """
+    Delta de una versión ya recorrida (scan_version contra el resumen de la
+    base): guarda su resumen en el cache, escribe los archivos y devuelve las
+    estadísticas que se guardan en el manifest (campo "delta") y en el
+    resumen de la corrida.
+    """
+    t0 = time.perf_counter()
+    base_ids, base_hashes, _ = row_summary(base_path, source, base_md5)
+    new_ids, new_hashes = scan["ids"], scan["hashes"]
+    _save_summary(source, new_md5, new_ids, new_hashes, scan["dups"])
+    ids = diff_summaries(new_ids, new_hashes, base_ids, base_hashes)
+    out_dir = delta_dir_for(new_path)
+    files = _write_delta_files(out_dir, ids, scan)
+
+    inserted, updated, deleted = (int(len(ids[op])) for op in DELTA_OPS)
+    return {
+        "base_path": base_path,
+        "base_md5": base_md5,
+        "dir": out_dir,
+        "files": files,
+        "rows": int(len(new_ids)),
+        "inserted": inserted,
+        "updated": updated,
+        "deleted": deleted,
+        "unchanged": int(len(new_ids)) - inserted - updated,
+        "duplicate_ids": scan["dups"],
+        "elapsed_s": round(time.perf_counter() - t0, 3),
+    }
+
+
+def compute_delta(
+    new_path: str,
+    new_md5: str,
+    base_path: str,
+    base_md5: str,
+    source: str,
+) -> dict:
+    """Calcula y escribe el delta new vs base leyendo la versión nueva desde disco (una pasada)."""
+    t0 = time.perf_counter()
+    base_ids, base_hashes, _ = row_summary(base_path, source, base_md5)
+    delta = write_delta(scan_version(new_path, base_ids, base_hashes), new_path, new_md5,
+                        base_path, base_md5, source)
+    delta["elapsed_s"] = round(time.perf_counter() - t0, 3)
+    return delta
@@ -0,0 +1,93 @@
+# src/utils/http_cache.py
+"""
+Cache local de respuestas HTTP para extractores que descargan páginas.
+
+- Por URL guarda los validadores de la última respuesta (ETag /
+  Last-Modified), el MD5 del body y el path RAW que se publicó con ella:
+    data/status/http_cache/<sha1(url)>.json
+- Por MD5 del body guarda el resultado ya parseado (tabla):
+    data/status/http_cache/parsed/<md5>.csv
+  Así, un 304 o un body idéntico no se vuelven a parsear ni a escribir.
+"""
+
+from __future__ import annotations
+import hashlib, json, os
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+HTTP_CACHE_ROOT = os.path.join("data", "status", "http_cache")
+
+
+def _entry_path(url: str) -> str:
+    return os.path.join(HTTP_CACHE_ROOT, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+
+def _parsed_path(body_md5: str) -> str:
+    return os.path.join(HTTP_CACHE_ROOT, "parsed", f"{body_md5}.csv")
+
+
+def _atomic_write(path: str, write) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def load_entry(url: str) -> Optional[dict]:
+    """Última respuesta cacheada para la URL (o None)."""
+    path = _entry_path(url)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        logger.warning(f"[http_cache] entrada ilegible, se ignora: {path}")
+        return None
+
+
+def save_entry(url: str, **fields) -> dict:
+    """Actualiza (merge) la entrada de la URL y la guarda de forma atómica."""
+    entry = load_entry(url) or {}
+    entry.update(fields, url=url, ts_utc=datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"))
+
+    def _write(tmp: str) -> None:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, indent=2)
+
+    _atomic_write(_entry_path(url), _write)
+    return entry
+
+
+def conditional_headers(entry: Optional[dict]) -> dict:
+    """Headers If-None-Match / If-Modified-Since a partir de la entrada previa."""
+    headers: dict = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def load_parsed(body_md5: Optional[str]) -> Optional[pd.DataFrame]:
+    """Tabla ya parseada para un body (por MD5), o None si no está en cache."""
+    if not body_md5:
+        return None
+    path = _parsed_path(body_md5)
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path)
+
+
+def save_parsed(body_md5: str, df: pd.DataFrame) -> str:
+    """Guarda la tabla parseada de un body (por MD5)."""
+    path = _parsed_path(body_md5)
+    _atomic_write(path, lambda tmp: df.to_csv(tmp, index=False, encoding="utf-8", lineterminator="\n"))
+    return path
@@ -0,0 +1,233 @@
+# src/utils/metrics.py
+"""
+Métricas de la extracción: spans por stage (tiempo y volumen) y un registro
+estructurado por corrida.
+
+- span(stage, source) es un context manager que mide el tiempo de pared y
+  la CPU del hilo (time.thread_time: las fuentes corren en hilos; lo que se
+  hace en procesos hijo —DQ_WORKERS— no se cuenta). Dentro del bloque se
+  anotan rows / bytes_read / bytes_written en el Span; rows_per_s se deriva.
+- Los spans se acumulan en el proceso (thread-safe) y pueden anidarse: un
+  stage de main (extract, post_write, dq) contiene los del extractor
+  (csv.ingest, banxico.fetch, …) y "total" envuelve el pipeline de la fuente.
+- write_run() al final de main.main deja:
+    METRICS_DIR/extract_runs.jsonl         una línea JSON por corrida
+    METRICS_TEXTFILE_DIR/extract_<scope>.prom  formato Prometheus (textfile
+        collector de node_exporter), escrito con tmp + rename
+  scope = fuentes de la corrida (--source) o "all": las tareas por fuente
+  del DAG corren en paralelo y no se pisan el archivo.
+"""
+
+from __future__ import annotations
+import json, os, threading, time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl  # lock del JSONL (POSIX)
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+try:
+    import resource  # pico de memoria (POSIX)
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+import src.utils.config as config
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+METRIC_PREFIX = "ab_nyc_extract"
+RUNS_FILE = "extract_runs.jsonl"
+
+
+@dataclass
+class Span:
+    stage: str
+    source: Optional[str] = None
+    rows: Optional[int] = None
+    bytes_read: Optional[int] = None
+    bytes_written: Optional[int] = None
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    ok: bool = True
+
+    @property
+    def rows_per_s(self) -> Optional[float]:
+        if not self.rows or self.wall_s <= 0:
+            return None
+        return round(self.rows / self.wall_s, 1)
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "rows_per_s": self.rows_per_s}
+
+
+_lock = threading.Lock()
+_spans: List[Span] = []
+
+
+def reset() -> None:
+    """Descarta los spans acumulados (inicio de corrida)."""
+    with _lock:
+        _spans.clear()
+
+
+def spans() -> List[Span]:
+    with _lock:
+        return list(_spans)
+
+
+@contextmanager
+def span(stage: str, source: Optional[str] = None) -> Iterator[Span]:
+    """Mide un stage; una excepción lo marca ok=False y se propaga."""
+    sp = Span(stage=stage, source=source)
+    t0, c0 = time.perf_counter(), time.thread_time()
+    try:
+        yield sp
+    except BaseException:
+        sp.ok = False
+        raise
+    finally:
+        sp.wall_s = round(time.perf_counter() - t0, 6)
+        sp.cpu_s = round(time.thread_time() - c0, 6)
+        with _lock:
+            _spans.append(sp)
+
+
+def file_size(path: Optional[str]) -> Optional[int]:
+    """Tamaño en bytes (None si no existe): para anotar bytes leídos/escritos."""
+    try:
+        return os.path.getsize(path) if path else None
+    except OSError:
+        return None
+
+
+def aggregate(items: Optional[List[Span]] = None) -> List[dict]:
+    """Suma los spans por (source, stage): un stage puede repetirse (p.ej. una vez por serie)."""
+    groups: Dict[Tuple[str, str], dict] = {}
+    for sp in spans() if items is None else items:
+        g = groups.setdefault((sp.source or "", sp.stage), {
+            "source": sp.source or "", "stage": sp.stage, "count": 0, "ok": True,
+            "wall_s": 0.0, "cpu_s": 0.0, "rows": None, "bytes_read": None, "bytes_written": None,
+        })
+        g["count"] += 1
+        g["ok"] = g["ok"] and sp.ok
+        g["wall_s"] = round(g["wall_s"] + sp.wall_s, 6)
+        g["cpu_s"] = round(g["cpu_s"] + sp.cpu_s, 6)
+        for k in ("rows", "bytes_read", "bytes_written"):
+            v = getattr(sp, k)
+            if v is not None:
+                g[k] = (g[k] or 0) + int(v)
+    for g in groups.values():
+        g["rows_per_s"] = round(g["rows"] / g["wall_s"], 1) if g["rows"] and g["wall_s"] > 0 else None
+    return sorted(groups.values(), key=lambda g: (g["source"], g["stage"]))
+
+
+# (métrica, campo del agregado, ayuda) por stage
+_STAGE_METRICS = [
+    ("stage_wall_seconds", "wall_s", "Tiempo de pared por stage en la última corrida (s)."),
+    ("stage_cpu_seconds", "cpu_s", "CPU del hilo por stage en la última corrida (s)."),
+    ("stage_rows", "rows", "Filas procesadas por stage en la última corrida."),
+    ("stage_bytes_read", "bytes_read", "Bytes leídos por stage en la última corrida."),
+    ("stage_bytes_written", "bytes_written", "Bytes escritos por stage en la última corrida."),
+    ("stage_rows_per_second", "rows_per_s", "Filas por segundo (pared) por stage en la última corrida."),
+    ("stage_ok", "ok", "1 si ningún span del stage terminó con excepción."),
+]
+
+
+def _value(v) -> str:
+    """Valor de muestra: enteros sin exponente, floats con repr (precisión completa)."""
+    if isinstance(v, (bool, int)):
+        return str(int(v))
+    return repr(float(v))
+
+
+def _labels(**kv) -> str:
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in kv.items()) + "}"
+
+
+def render_prometheus(record: dict) -> str:
+    """Registro de corrida → formato de exposición de Prometheus (gauges)."""
+    scope = record["scope"]
+    lines: List[str] = []
+
+    def gauge(name: str, help_: str, samples: List[Tuple[str, float]]) -> None:
+        if not samples:
+            return
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+        lines.extend(f"{METRIC_PREFIX}_{name}{lbl} {_value(v)}" for lbl, v in samples)
+
+    gauge("run_timestamp_seconds", "Fin de la última corrida (epoch).",
+          [(_labels(scope=scope), record["ts_epoch"])])
+    gauge("run_wall_seconds", "Tiempo de pared de la última corrida (s).",
+          [(_labels(scope=scope), record["wall_s"])])
+    gauge("run_cpu_seconds", "CPU del proceso (user+sys) en la última corrida (s).",
+          [(_labels(scope=scope), record["cpu_s"])])
+    if record.get("max_rss_bytes") is not None:
+        gauge("run_max_rss_bytes", "Pico de memoria residente del proceso (bytes).",
+              [(_labels(scope=scope), record["max_rss_bytes"])])
+    gauge("run_workers", "Hilos de extracción (EXTRACT_WORKERS).",
+          [(_labels(scope=scope), record["workers"])])
+    gauge("source_ok", "1 si la fuente terminó ok o skipped.",
+          [(_labels(scope=scope, source=s["source"]), s["status"] in ("ok", "skipped"))
+           for s in record["sources"]])
+    for name, key, help_ in _STAGE_METRICS:
+        gauge(name, help_, [(_labels(scope=scope, source=g["source"], stage=g["stage"]), g[key])
+                            for g in record["stages"] if g[key] is not None])
+    return "\n".join(lines) + "\n"
+
+
+def _append_jsonl(path: str, rec: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = json.dumps(rec, ensure_ascii=False, default=str) + "\n"
+    with open(path, "a", encoding="utf-8") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            f.write(line)
+            f.flush()
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _write_atomic(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write_run(scope: str, wall_s: float, workers: int, sources: List[dict]) -> Tuple[str, str]:
+    """
+    Registro de la corrida (spans acumulados + estatus por fuente) →
+    (ruta del JSONL, ruta del .prom).
+    `sources`: [{source, status, dq_ok, rows}] de main.
+    """
+    now = datetime.utcnow()
+    cpu = os.times()
+    record = {
+        "ts_utc": f"{now:%Y-%m-%dT%H:%M:%SZ}",
+        "ts_epoch": round(time.time(), 3),
+        "scope": scope,
+        "wall_s": round(wall_s, 3),
+        "cpu_s": round(cpu.user + cpu.system, 3),
+        # ru_maxrss: KiB en Linux
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None,
+        "workers": workers,
+        "sources": sources,
+        "stages": aggregate(),
+        "spans": [sp.as_dict() for sp in spans()],
+    }
+    jsonl_path = os.path.join(config.METRICS_DIR, RUNS_FILE)
+    prom_path = os.path.join(config.METRICS_TEXTFILE_DIR or config.METRICS_DIR, f"extract_{scope}.prom")
+    _append_jsonl(jsonl_path, record)
+    _write_atomic(prom_path, render_prometheus(record))
+    logger.info(f"[metrics] {len(record['spans'])} spans | runs={jsonl_path} | prom={prom_path}")
+    return jsonl_path, prom_path
@@ -0,0 +1,168 @@
+# src/utils/profiling.py
+"""
+Perfilado opcional (CPU y memoria) de stages de la extracción y la DQ.
+
+- Se activa con PROFILE: lista de stages separados por coma ("csv.run,
+  dq.validate") o "all". Vacío (default) = desactivado: @profile_stage
+  devuelve la función original y profiled() un nullcontext compartido,
+  sin costo en la ruta normal.
+- CPU: cProfile por stage → <stage>.prof (pstats / snakeviz) + <stage>.txt
+  (top PROFILE_TOP_N por tiempo acumulado). Con PROFILE_SAMPLER=pyinstrument
+  (opcional, si está instalado) se usa el profiler por muestreo en su lugar
+  (<stage>.txt + <stage>.html; mucho menos overhead que cProfile).
+- Memoria: PROFILE_MEMORY=1 agrega tracemalloc → <stage>.mem.txt con el pico
+  y las PROFILE_TOP_N líneas con más memoria neta asignada durante el stage.
+  tracemalloc es global al proceso: con EXTRACT_WORKERS>1 el reporte incluye
+  lo que asignaron las otras fuentes en paralelo (para medir memoria,
+  EXTRACT_WORKERS=1).
+- Reportes en data/status/profile/<run>/, run = <timestamp UTC>_<pid>
+  (una carpeta por proceso); un stage repetido (p.ej. dq.validate por
+  fuente) lleva la fuente y un contador en el nombre. Un stage anidado en
+  otro (dq.validate dentro de csv.run) no tiene perfil de CPU propio: está
+  en el del externo.
+
+Stages instrumentados: csv.run, banxico.run, scraper.run, dq.validate.
+"""
+
+from __future__ import annotations
+import contextlib, cProfile, functools, io, os, pstats, re, threading, tracemalloc
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+import src.utils.config as config
+from src.utils.logger import get_logger
+
+try:  # dependencia opcional (PROFILE_SAMPLER=pyinstrument)
+    import pyinstrument
+except ImportError:  # pragma: no cover
+    pyinstrument = None
+
+logger = get_logger(__name__)
+
+PROFILE_ROOT = os.path.join("data", "status", "profile")
+
+_STAGES = frozenset(s.strip() for s in config.PROFILE.split(",") if s.strip())
+_NULL = contextlib.nullcontext()
+
+_lock = threading.Lock()
+_run_dir: Optional[str] = None
+_counts: dict = {}
+_mem_users = 0
+_local = threading.local()  # cProfile activo en el hilo (stages anidados)
+
+
+def enabled(stage: str) -> bool:
+    return bool(_STAGES) and ("all" in _STAGES or stage in _STAGES)
+
+
+def _report_base(stage: str, source: Optional[str]) -> str:
+    """data/status/profile/<run>/<stage>[_<source>][_<n>] (sin extensión)."""
+    global _run_dir
+    name = re.sub(r"[^\w.-]+", "_", f"{stage}_{source}" if source else stage)
+    with _lock:
+        if _run_dir is None:
+            _run_dir = os.path.join(PROFILE_ROOT, f"{datetime.utcnow():%Y%m%dT%H%M%SZ}_{os.getpid()}")
+            os.makedirs(_run_dir, exist_ok=True)
+        n = _counts[name] = _counts.get(name, 0) + 1
+    return os.path.join(_run_dir, name if n == 1 else f"{name}_{n}")
+
+
+def _start_memory() -> tracemalloc.Snapshot:
+    global _mem_users
+    with _lock:
+        if _mem_users == 0:
+            tracemalloc.start()
+        _mem_users += 1
+        tracemalloc.reset_peak()
+        return tracemalloc.take_snapshot()
+
+
+def _stop_memory(before: tracemalloc.Snapshot, base: str) -> None:
+    global _mem_users
+    with _lock:
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        _mem_users -= 1
+        if _mem_users == 0:
+            tracemalloc.stop()
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    with open(f"{base}.mem.txt", "w", encoding="utf-8") as f:
+        f.write(f"peak_bytes={peak}\n")
+        f.write(f"net_bytes={sum(s.size_diff for s in stats)}\n\n")
+        for s in stats[:config.PROFILE_TOP_N]:
+            f.write(f"{s}\n")
+
+
+@contextlib.contextmanager
+def _profile(stage: str, source: Optional[str]) -> Iterator[None]:
+    base = _report_base(stage, source)
+    sampler = None
+    prof = None
+    nested = getattr(_local, "active", False)
+    use_sampler = config.PROFILE_SAMPLER == "pyinstrument" and pyinstrument is not None
+    if use_sampler and not nested:
+        sampler = pyinstrument.Profiler()
+    elif config.PROFILE_SAMPLER and not use_sampler:
+        logger.warning(f"[profile] PROFILE_SAMPLER={config.PROFILE_SAMPLER} no disponible; se usa cProfile")
+    mem_before = _start_memory() if config.PROFILE_MEMORY == 1 else None
+    try:
+        if sampler is not None:
+            sampler.start()
+            _local.active = True
+        elif not nested and not use_sampler:
+            # Un stage anidado (dq.validate dentro de csv.run) queda en el
+            # perfil del externo: un segundo profiler en el hilo lo reemplazaría
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+                _local.active = True
+            except ValueError as e:
+                # Python 3.12+: un solo cProfile activo por proceso (stages en paralelo)
+                logger.warning(f"[profile] {stage}: cProfile ocupado por otro stage ({e}); sin perfil de CPU")
+                prof = None
+        yield
+    finally:
+        # Detener todo antes de escribir reportes: pstats/pyinstrument no deben
+        # aparecer en el reporte de memoria
+        if sampler is not None:
+            sampler.stop()
+            _local.active = False
+        elif prof is not None:
+            prof.disable()
+            _local.active = False
+        if mem_before is not None:
+            _stop_memory(mem_before, base)
+        if sampler is not None:
+            with open(f"{base}.txt", "w", encoding="utf-8") as f:
+                f.write(sampler.output_text(unicode=True, color=False))
+            with open(f"{base}.html", "w", encoding="utf-8") as f:
+                f.write(sampler.output_html())
+        elif prof is not None:
+            prof.dump_stats(f"{base}.prof")
+            out = io.StringIO()
+            pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(config.PROFILE_TOP_N)
+            with open(f"{base}.txt", "w", encoding="utf-8") as f:
+                f.write(out.getvalue())
+        logger.info(f"[profile] {stage}{f' ({source})' if source else ''} → {base}.*")
+
+
+def profiled(stage: str, source: Optional[str] = None):
+    """Context manager: perfila el bloque si el stage está en PROFILE (si no, nullcontext)."""
+    if not enabled(stage):
+        return _NULL
+    return _profile(stage, source)
+
+
+def profile_stage(stage: str) -> Callable[[Callable], Callable]:
+    """Decorador: sin el stage en PROFILE devuelve la función original (cero overhead)."""
+    def deco(fn: Callable) -> Callable:
+        if not enabled(stage):
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _profile(stage, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
@@ -2,18 +2,26 @@
 """
 Validación de calidad de los datos
 - Define "reglas" por columna (tipo, nulos, rangos, unicidad).
-- Aplica esas reglas a un DataFrame.
-- Genera un REPORTE JSON en data/status/quality/.
+- Compila el esquema una sola vez en un plan de validación vectorizado.
+- Aplica ese plan a un DataFrame (sin copiarlo ni modificarlo) o, para
+  archivos más grandes que la memoria, a un iterador de chunks.
+- Opcionalmente reparte las columnas entre varios procesos (DQ_WORKERS).
+- Genera un REPORTE JSON en data/status/dq/.
 - Devuelve (ok, ruta_del_reporte, dict_con_el_reporte).
 """
 
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Any, Optional, Sequence, Dict, List, Tuple
-import os, json, re
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional, Sequence, Dict, List, Tuple, Union
+import os, json, re, threading
+import multiprocessing as mp
 from datetime import datetime
+import numpy as np
 import pandas as pd
+import src.utils.config as config
 from src.utils.logger import get_logger
+from src.utils.metrics import span
+from src.utils.profiling import profiled
 
 logger = get_logger(__name__)
 
@@ -39,29 +47,353 @@ class DatasetSchema:
     rules: List[ColumnRule] #Modelo de reglas por columna
     required_rows_min: int = 1 #Umbral de data set vacio 
     exact_row_count: Optional[int] = None # Si se espera una cantidad exacta de filas 
+    _plan: Optional["ValidationPlan"] = field(default=None, init=False, repr=False, compare=False)
 
-#============== HELPERS ============
-# forzar cada columna a su tipo antes de validar reglas.
-def _coerce_series(s:pd.Series, dtype: str) -> pd.Series:
-    if dtype == "int":
-        return pd.to_numeric(s, errors= "coerce").astype("Int64")
-    if dtype == "float":
-        return pd.to_numeric(s, errors="coerce")
-    if dtype == "date":
-        return pd.to_datetime(s, errors="coerce", utc=False).dt.date
-    return s.astype("string").str.strip()
-
-#Separar “nulos que ya estaban” de “nulos creados por tipado malo”.
-def _coerce_types(df: pd.DataFrame, schema: DatasetSchema)-> Dict[str, int]:
-    conv_errors: Dict[str, int] = {}
-    for r in schema.rules:
-        if r.name not in df.columns:
-            continue
-        before = int(df[r.name].isna().sum())
-        df[r.name] = _coerce_series(df[r.name], r.dtype)
-        after = int(df[r.name].isna().sum())
-        conv_errors[r.name] = max(0, after - before)
-    return conv_errors
+    def compile(self) -> "ValidationPlan":
+        """Compila (una sola vez) el esquema en un plan de validación."""
+        if self._plan is None:
+            self._plan = ValidationPlan(self)
+        return self._plan
+
+#============== PLAN COMPILADO ============
+# Cada regla se traduce a un "chequeo" con lo que necesita ya preparado
+# (regex compilada, conjunto de permitidos, qué contadores aplican).
+@dataclass
+class _CompiledRule:
+    rule: ColumnRule
+    numeric: bool
+    check_len: bool
+    pattern: Optional[re.Pattern]
+    allowed: Optional[list]
+
+# Orden de los contadores = orden de los issues en el reporte.
+_ISSUE_FORMATS = (
+    ("type_coercion_failed", lambda r, n: f"type_coercion_failed ({n}) expected={r.dtype}"),
+    ("unique_violations",    lambda r, n: f"unique_violations ({n})"),
+    ("min_value_violation",  lambda r, n: f"min_value_violation (<{r.min_value}) ({n})"),
+    ("max_value_violation",  lambda r, n: f"max_value_violation (>{r.max_value}) ({n})"),
+    ("allowed_values_violation", lambda r, n: f"allowed_values_violation ({n})"),
+    ("min_len_violation",    lambda r, n: f"min_len_violation (<{r.min_len}) ({n})"),
+    ("max_len_violation",    lambda r, n: f"max_len_violation (>{r.max_len}) ({n})"),
+    ("regex_violation",      lambda r, n: f"regex_violation ({n})"),
+)
+
+#Valores tipados de una columna: se calculan UNA vez y los usan todos los chequeos.
+# - Numéricos: arreglo denso float64/int64 (comparaciones vectorizadas de NumPy).
+# - str/date: codificación por diccionario (pd.factorize). El tipado, strip,
+#   longitudes, regex y permitidos se calculan por valor DISTINTO y se
+#   ponderan por su frecuencia; no se materializa nada del tamaño del frame.
+@dataclass
+class _ColumnValues:
+    raw_nulls: int                          # nulos que ya venían en el origen
+    numbers: Optional[np.ndarray] = None    # numéricos: valores por fila
+    null: Optional[np.ndarray] = None       # numéricos: nulos tras tipar, por fila
+    uniques: Optional[pd.Series] = None     # str/date: valor tipado por código
+    freq: Optional[np.ndarray] = None       # str/date: filas por código
+    lengths: Optional[np.ndarray] = None    # str: longitud por código
+
+
+class ValidationPlan:
+    """
+    Esquema compilado. Por columna calcula una sola vez máscara de nulos,
+    valores tipados y longitudes; cada regla se evalúa como una reducción
+    booleana de NumPy. No copia ni modifica el DataFrame de entrada.
+    """
+
+    def __init__(self, schema: DatasetSchema):
+        self.schema = schema
+        self.required_cols = [r.name for r in schema.rules if r.required]
+        self.rules = [
+            _CompiledRule(
+                rule=r,
+                numeric=r.dtype in ("int", "float"),
+                check_len=r.dtype == "str" and (r.min_len is not None or r.max_len is not None),
+                pattern=re.compile(r.regex) if (r.dtype == "str" and r.regex is not None) else None,
+                allowed=list(r.allowed_values) if r.allowed_values is not None else None,
+            )
+            for r in schema.rules
+        ]
+
+    # ---- tipado (una pasada por columna) ----
+    @staticmethod
+    def _column_values(c: _CompiledRule, s: pd.Series) -> _ColumnValues:
+        dtype = c.rule.dtype
+        if c.numeric:
+            if pd.api.types.is_integer_dtype(s.dtype) and not isinstance(s.dtype, pd.api.extensions.ExtensionDtype):
+                # int64 sin nulos: se usa tal cual (sin copia)
+                numbers = s.to_numpy()
+                return _ColumnValues(0, numbers=numbers, null=np.zeros(len(numbers), dtype=bool))
+            raw_null = s.isna().to_numpy()
+            num = s if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype) \
+                else pd.to_numeric(s, errors="coerce")
+            numbers = num.to_numpy(dtype="float64", na_value=np.nan)
+            null = np.isnan(numbers)
+            if dtype == "int":
+                # Un decimal no es un entero válido: cuenta como coerción fallida
+                frac = np.mod(numbers, 1, where=~null, out=np.zeros_like(numbers))
+                null |= frac != 0
+                # Copia enmascarada: con float64, to_numpy devuelve una vista del DataFrame
+                numbers = np.where(null, np.nan, numbers)
+            return _ColumnValues(int(np.count_nonzero(raw_null)), numbers=numbers, null=null)
+
+        codes, uniques = pd.factorize(s, use_na_sentinel=True)
+        valid_codes = codes[codes >= 0]
+        freq = np.bincount(valid_codes, minlength=len(uniques))
+        raw_nulls = len(codes) - len(valid_codes)
+        if dtype == "date":
+            typed = pd.Series(pd.to_datetime(uniques, errors="coerce", utc=False))
+            return _ColumnValues(raw_nulls, uniques=typed, freq=freq)
+        typed = pd.Series(uniques).astype("string").str.strip()
+        lengths = typed.str.len().to_numpy(dtype="float64", na_value=np.nan) if c.check_len else None
+        return _ColumnValues(raw_nulls, uniques=typed, freq=freq, lengths=lengths)
+
+    # ---- contadores por columna (todos sumables: sirven también por chunks) ----
+    @staticmethod
+    def _column_counts(c: _CompiledRule, v: _ColumnValues, with_unique: bool = True) -> Dict[str, int]:
+        r = c.rule
+        counts: Dict[str, int] = {}
+        if v.numbers is not None:
+            nulls = int(np.count_nonzero(v.null))
+            counts["nulls"] = nulls
+            counts["type_coercion_failed"] = nulls - v.raw_nulls
+            if r.unique and with_unique:
+                counts["unique_violations"] = int(np.count_nonzero(
+                    pd.Series(v.numbers, copy=False).duplicated(keep=False).to_numpy()))
+            with np.errstate(invalid="ignore"):
+                if r.min_value is not None:
+                    counts["min_value_violation"] = int(np.count_nonzero(v.numbers < r.min_value))
+                if r.max_value is not None:
+                    counts["max_value_violation"] = int(np.count_nonzero(v.numbers > r.max_value))
+            if c.allowed is not None:
+                ok = np.isin(v.numbers, np.asarray(c.allowed, dtype="float64"))
+                counts["allowed_values_violation"] = int(np.count_nonzero(~v.null & ~ok))
+            return counts
+
+        # Diccionario: cada chequeo es una máscara por código ponderada por frecuencia
+        freq = v.freq
+        unull = v.uniques.isna().to_numpy()
+        conv = int(freq[unull].sum())
+        counts["nulls"] = v.raw_nulls + conv
+        counts["type_coercion_failed"] = conv
+        if r.unique and with_unique:
+            # Re-agrupa tras el tipado ("a " y "a" son el mismo valor); NaN cuentan como iguales
+            codes2, _ = pd.factorize(v.uniques, use_na_sentinel=True)
+            per_value = np.bincount(codes2[codes2 >= 0], weights=freq[codes2 >= 0])
+            dup = int(per_value[per_value > 1].sum())
+            n_null = counts["nulls"]
+            counts["unique_violations"] = dup + (n_null if n_null > 1 else 0)
+        if c.allowed is not None:
+            ok = v.uniques.isin(c.allowed).to_numpy(dtype=bool, na_value=False)
+            counts["allowed_values_violation"] = int(freq[~unull & ~ok].sum())
+        if v.lengths is not None:
+            with np.errstate(invalid="ignore"):
+                if r.min_len is not None:
+                    counts["min_len_violation"] = int(freq[v.lengths < r.min_len].sum())
+                if r.max_len is not None:
+                    counts["max_len_violation"] = int(freq[v.lengths > r.max_len].sum())
+        if c.pattern is not None:
+            ok = v.uniques.str.match(c.pattern).to_numpy(dtype=bool, na_value=True)
+            counts["regex_violation"] = int(freq[~unull & ~ok].sum())
+        return counts
+
+    def counts(self, df: pd.DataFrame, workers: int = 1) -> Dict[str, Optional[Dict[str, int]]]:
+        """
+        Contadores por columna (None = columna ausente).
+        Con workers > 1 las columnas se reparten en grupos entre procesos
+        (ver _parallel_counts); cada columna se evalúa completa en un solo
+        proceso, así que la unicidad sigue siendo exacta. Fuera del hilo
+        principal se evalúa en serie.
+        """
+        names = [c.rule.name for c in self.rules if c.rule.name in df.columns]
+        if workers > 1 and len(names) > 1 and _can_fork():
+            present = _parallel_counts(self, df, _shard_groups(df, names, workers))
+        else:
+            present = self._counts_for(df, names)
+        return {c.rule.name: present.get(c.rule.name) for c in self.rules}
+
+    def _counts_for(self, df: pd.DataFrame, names: Sequence[str]) -> Dict[str, Dict[str, int]]:
+        wanted = set(names)
+        return {
+            c.rule.name: self._column_counts(c, self._column_values(c, df[c.rule.name]))
+            for c in self.rules if c.rule.name in wanted
+        }
+
+    # ---- reporte ----
+    def report(self, row_count: int, columns: Sequence[str],
+               counts: Dict[str, Optional[Dict[str, int]]]) -> Tuple[bool, Dict[str, Any]]:
+        schema = self.schema
+        report: Dict[str, Any] = {
+            "source": schema.source,
+            "ts_utc": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "row_count": int(row_count),
+            "issues": [],
+            "by_column": {},
+        }
+        #numero de filas exactas o minimo establecido 
+        if schema.exact_row_count is not None and row_count != schema.exact_row_count:
+            report["issues"].append(f"row_count != {schema.exact_row_count} (got {row_count})")
+        if row_count < schema.required_rows_min:
+            report["issues"].append(f"row_count < {schema.required_rows_min} (got {row_count})")
+        # Columnas obligatorias
+        missing = [c for c in self.required_cols if c not in columns]
+        if missing:
+            report["issues"].append(f"missing_columns: {missing}")
+
+        for c in self.rules:
+            r = c.rule
+            cnt = counts.get(r.name)
+            if cnt is None:
+                report["by_column"][r.name] = {"present": False, "issues": ["missing"]}
+                continue
+            col: Dict[str, Any] = {"present": True, "nulls": cnt["nulls"]}
+            issues: List[str] = []
+            if not r.allow_nulls and cnt["nulls"] > 0:
+                issues.append(f"nulls_not_allowed ({cnt['nulls']})")
+            for key, fmt in _ISSUE_FORMATS:
+                n = cnt.get(key, 0)
+                if n > 0:
+                    issues.append(fmt(r, n))
+            if issues:
+                col["issues"] = issues
+            report["by_column"][r.name] = col
+        # Semáforo final (ok): no debe haber issues a nivel dataset ni por columna.
+        ok = len(report["issues"]) == 0 and all(
+            "issues" not in col for col in report["by_column"].values()
+        )
+        return ok, report
+
+    def run(self, df: pd.DataFrame, workers: int = 1) -> Tuple[bool, Dict[str, Any]]:
+        """Evalúa el plan sobre un DataFrame en memoria (no escribe reporte)."""
+        return self.report(len(df), list(df.columns), self.counts(df, workers))
+
+    @staticmethod
+    def _unique_keys(v: _ColumnValues) -> Tuple[np.ndarray, np.ndarray, int]:
+        """(hash uint64 por valor no nulo, filas por valor, nulos) para unicidad incremental."""
+        if v.numbers is not None:
+            vals = v.numbers[~v.null].astype("float64", copy=False)  # mismo hash si un chunk viene int y otro float
+            return pd.util.hash_array(vals), np.ones(len(vals), dtype="int64"), int(np.count_nonzero(v.null))
+        unull = v.uniques.isna().to_numpy()
+        vals = v.uniques[~unull]
+        vals = vals.to_numpy() if vals.dtype.kind == "M" else vals.to_numpy(dtype=object)
+        return pd.util.hash_array(vals), v.freq[~unull], v.raw_nulls + int(v.freq[unull].sum())
+
+    def run_chunks(self, chunks: Iterable[pd.DataFrame],
+                   unique_mode: str = "exact") -> Tuple[bool, Dict[str, Any]]:
+        """
+        Evalúa el plan sobre un iterador de chunks (p. ej. read_csv(chunksize=...)
+        o lotes de pyarrow convertidos a pandas) y fusiona los resultados
+        parciales en el mismo reporte que run(). Solo un chunk vive en memoria;
+        la unicidad usa un _UniqueTracker por columna.
+        """
+        row_count, n_chunks = 0, 0
+        columns: Optional[List[str]] = None
+        totals: Dict[str, Optional[Dict[str, int]]] = {}
+        trackers = {c.rule.name: _UniqueTracker(unique_mode) for c in self.rules if c.rule.unique}
+
+        for chunk in chunks:
+            n_chunks += 1
+            row_count += len(chunk)
+            if columns is None:
+                columns = list(chunk.columns)
+            for c in self.rules:
+                name = c.rule.name
+                if name not in chunk.columns:
+                    continue
+                v = self._column_values(c, chunk[name])
+                acc = totals.setdefault(name, {})
+                for key, n in self._column_counts(c, v, with_unique=False).items():
+                    acc[key] = acc.get(key, 0) + n
+                if name in trackers:
+                    trackers[name].add(*self._unique_keys(v))
+
+        for name, tracker in trackers.items():
+            if name in totals:
+                totals[name]["unique_violations"] = tracker.violations()
+        counts = {c.rule.name: totals.get(c.rule.name) for c in self.rules}
+        ok, report = self.report(row_count, columns or [], counts)
+        report["chunked"] = {"chunks": n_chunks, "unique_mode": unique_mode}
+        return ok, report
+
+
+class _UniqueTracker:
+    """
+    Unicidad incremental entre chunks sobre hashes de 64 bits de los valores.
+
+    - "exact": hashes vistos en tramos ordenados y disjuntos + conteo de los
+      repetidos; reproduce duplicated(keep=False) (salvo colisiones de 64
+      bits). Los hashes nuevos de cada chunk son un tramo más; los tramos se
+      fusionan cuando el anterior no es más del doble (como un contador
+      binario): O(log n) tramos y cada hash se re-copia O(log n) veces, en
+      vez de re-ordenar todo lo visto en cada chunk. Memoria: 8 bytes por
+      valor distinto, no por fila.
+    - "bloom": filtro de Bloom de tamaño fijo (DQ_BLOOM_BITS); cuenta filas que
+      repiten un valor ya visto (semántica keep='first'), con posibles falsos
+      positivos. Memoria constante.
+    """
+
+    _BLOOM_HASHES = 4
+
+    def __init__(self, mode: str = "exact"):
+        if mode not in ("exact", "bloom"):
+            raise ValueError(f"unique_mode inválido: {mode!r} (exact|bloom)")
+        self.mode = mode
+        self.nulls = 0
+        if mode == "exact":
+            self._runs: List[np.ndarray] = []
+            self._dups: Dict[int, int] = {}
+        else:
+            self._bits = np.zeros(max(config.DQ_BLOOM_BITS, 1024) // 8, dtype="uint8")
+            self._repeats = 0
+
+    def add(self, hashes: np.ndarray, weights: np.ndarray, nulls: int) -> None:
+        self.nulls += nulls
+        if len(hashes) == 0:
+            return
+        # Agrupa dentro del chunk: hash → filas
+        h, inv = np.unique(hashes, return_inverse=True)
+        w = np.bincount(inv, weights=weights).astype("int64")
+        if self.mode == "exact":
+            self._add_exact(h, w)
+        else:
+            self._add_bloom(h, w)
+
+    def _add_exact(self, h: np.ndarray, w: np.ndarray) -> None:
+        found = np.zeros(len(h), dtype=bool)
+        for run in self._runs:
+            pos = np.searchsorted(run, h)
+            hit = pos < len(run)
+            hit[hit] = run[pos[hit]] == h[hit]
+            found |= hit
+        for key, n in zip(h[found].tolist(), w[found].tolist()):
+            # Ya visto: si aún no era duplicado, tenía exactamente 1 fila
+            self._dups[key] = self._dups.get(key, 1) + n
+        for key, n in zip(h[~found & (w > 1)].tolist(), w[~found & (w > 1)].tolist()):
+            self._dups[key] = n
+        new = h[~found]  # ya ordenado (np.unique)
+        if len(new) == 0:
+            return
+        self._runs.append(new)
+        while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+            b, a = self._runs.pop(), self._runs.pop()
+            self._runs.append(np.sort(np.concatenate((a, b)), kind="stable"))
+
+    def _bloom_positions(self, h: np.ndarray) -> np.ndarray:
+        m = np.uint64(len(self._bits) * 8)
+        h1, h2 = h & np.uint64(0xFFFFFFFF), (h >> np.uint64(32)) | np.uint64(1)
+        return np.stack([(h1 + np.uint64(i) * h2) % m for i in range(self._BLOOM_HASHES)])
+
+    def _add_bloom(self, h: np.ndarray, w: np.ndarray) -> None:
+        pos = self._bloom_positions(h)
+        byte, bit = pos // np.uint64(8), (pos % np.uint64(8)).astype("uint8")
+        seen = np.all(self._bits[byte] & (np.uint8(1) << bit), axis=0)
+        self._repeats += int(w[seen].sum() + (w[~seen] - 1).sum())
+        np.bitwise_or.at(self._bits, byte.ravel(), (np.uint8(1) << bit).ravel())
+
+    def violations(self) -> int:
+        nulls = self.nulls if self.nulls > 1 else 0  # NaN repetidos cuentan como iguales
+        if self.mode == "exact":
+            return int(sum(self._dups.values())) + nulls
+        return self._repeats + nulls
 
 #Genera ruta para reporte JSON 
 def _report_path(source: str) -> str:
@@ -73,93 +405,87 @@ def _report_path(source: str) -> str:
     filename = f"dq_{source}_{now:%Y%m%dT%H%M%SZ}.json"
     return os.path.join(out_dir, filename)
 
-# ========= Motor generico ==========
-def validate_df (df: pd.DataFrame, schema: DatasetSchema) -> Tuple[bool, str, dict]:
-    report: Dict[str, Any] ={
-        "source" :schema.source,
-        "ts_utc" : datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "row_count" : int(len(df)),
-        "issues": [],
-        "by_column" :{}, 
-    }
-#numero de filas exactas o minimo establecido 
-    if schema.exact_row_count is not None and len(df) != schema.exact_row_count:
-        report["issues"].append(f"row_count != {schema.exact_row_count} (got {len(df)})")
-    if len(df) < schema.required_rows_min:
-        report["issues"].append(f"row_count < {schema.required_rows_min} (got {len(df)})")
-        
-# Columnas obligatorias
-    required_cols = [r.name for r in schema.rules if r.required]
-    missing = [c for c in required_cols if c not in df.columns]
-    if missing:
-        report["issues"].append(f"missing_columns: {missing}")
-
-#Convierte tipos y registra los errores de coerción (por columna).
-    conv_errors = _coerce_types(df, schema)
-
-    for r in schema.rules:
-        col = {"present": r.name in df.columns}
-        if not col["present"]:
-            col["issues"] = ["missing"]
-            report["by_column"][r.name] = col
-            continue
-#Cuenta los nulos y compara con allow_nulls
-    s = df[r.name]
-    issues: List[str] = []
-    nulls = int(s.isna().sum())
-    col["nulls"] = nulls
-
-    if not r.allow_nulls and nulls > 0:
-        issues.append(f"nulls_not_allowed ({nulls})")
-# Registra si el tipado forzado generó nulos (valores inválidos)
-    ce = conv_errors.get(r.name, 0)
-    if ce > 0:
-            issues.append(f"type_coercion_failed ({ce}) expected={r.dtype}")
-#Unicidad: duplicated(keep=False) marca todas las filas duplicadas.
-    if r.unique:
-        dup = int(s.duplicated(keep=False).sum())
-        if dup > 0:
-            issues.append(f"unique_violations ({dup})")
-
-#Rangos: solo compara valores no nulos.
-        if r.dtype in ("int", "float"):
-            if r.min_value is not None:
-                bad = int((s.dropna() < r.min_value).sum())
-                if bad > 0: issues.append(f"min_value_violation (<{r.min_value}) ({bad})")
-            if r.max_value is not None:
-                bad = int((s.dropna() > r.max_value).sum())
-                if bad > 0: issues.append(f"max_value_violation (>{r.max_value}) ({bad})")
-#valores fuera del conjunto permitido
-        if r.allowed_values is not None:
-            bad = int((~s.dropna().isin(r.allowed_values)).sum())
-            if bad > 0: issues.append(f"allowed_values_violation ({bad})")
-# validación de Strings: longitudes y regex
-        if r.dtype == "str":
-            if r.min_len is not None:
-                bad = int((s.dropna().astype(str).str.len() < r.min_len).sum())
-                if bad > 0: issues.append(f"min_len_violation (<{r.min_len}) ({bad})")
-            if r.max_len is not None:
-                bad = int((s.dropna().astype(str).str.len() > r.max_len).sum())
-                if bad > 0: issues.append(f"max_len_violation (>{r.max_len}) ({bad})")
-            if r.regex is not None:
-                pat = re.compile(r.regex)
-                bad = int((~s.dropna().astype(str).str.match(pat)).sum())
-                if bad > 0: issues.append(f"regex_violation ({bad})")
-# Adjunta las incidencias por columna 
-        if issues:
-            col["issues"] = issues
-        report["by_column"][r.name] = col
-# Semáforo final (ok): no debe haber issues a nivel dataset ni por columna.
-    ok = len(report["issues"]) == 0 and all(
-        "issues" not in report["by_column"].get(r.name, {}) for r in schema.rules
-    )
 #Guarda el reporte JSON
+def _write_report(schema: DatasetSchema, ok: bool, report: Dict[str, Any]) -> str:
     path = _report_path(schema.source)
     with open(path, "w", encoding="utf-8") as f:
         json.dump(report, f, ensure_ascii=False, indent=2)
     logger.info(f"[dq] {schema.source} {'OK' if ok else 'FAIL'} | report={path}")
+    return path
+
+# ========= Ejecución multi-núcleo (shards por grupos de columnas) ==========
+# Los procesos hijos se crean con "fork" y heredan el plan y el DataFrame por
+# copy-on-write (initargs del Pool de cada llamada: con fork no se serializan);
+# solo viajan la lista de columnas de cada shard (ida) y los contadores
+# (vuelta). Hacer fork desde un proceso con varios hilos no es seguro (locks
+# tomados por otros hilos quedan tomados en el hijo): solo se reparte desde
+# el hilo principal y un fork a la vez; en otro hilo, o sin fork (Windows),
+# se valida en serie.
+_FORK_OK = "fork" in mp.get_all_start_methods()
+_FORK_LOCK = threading.Lock()
+_SHARD_STATE: Optional[Tuple[ValidationPlan, pd.DataFrame]] = None  # solo en los hijos
+
+def _can_fork() -> bool:
+    return _FORK_OK and threading.current_thread() is threading.main_thread()
+
+def _shard_groups(df: pd.DataFrame, names: Sequence[str], workers: int) -> List[List[str]]:
+    """Reparte columnas en `workers` grupos balanceados (texto pesa más que numérico)."""
+    def cost(name: str) -> int:
+        return 4 if df[name].dtype == object else 1
+    groups: List[List[str]] = [[] for _ in range(min(workers, len(names)))]
+    loads = [0] * len(groups)
+    for name in sorted(names, key=cost, reverse=True):
+        i = loads.index(min(loads))
+        groups[i].append(name)
+        loads[i] += cost(name)
+    return groups
+
+def _init_shard(plan: ValidationPlan, df: pd.DataFrame) -> None:
+    global _SHARD_STATE
+    _SHARD_STATE = (plan, df)
+
+def _shard_counts(names: List[str]) -> Dict[str, Dict[str, int]]:
+    plan, df = _SHARD_STATE
+    return plan._counts_for(df, names)
+
+def _parallel_counts(plan: ValidationPlan, df: pd.DataFrame,
+                     groups: List[List[str]]) -> Dict[str, Dict[str, int]]:
+    with _FORK_LOCK:
+        with mp.get_context("fork").Pool(len(groups), initializer=_init_shard,
+                                         initargs=(plan, df)) as pool:
+            parts = pool.map(_shard_counts, groups)
+    out: Dict[str, Dict[str, int]] = {}
+    for part in parts:
+        out.update(part)
+    return out
+
+# ========= Motor generico ==========
+def validate_df (df: Union[pd.DataFrame, Iterable[pd.DataFrame]], schema: DatasetSchema,
+                 unique_mode: Optional[str] = None, workers: Optional[int] = None) -> Tuple[bool, str, dict]:
+    """
+    Valida `df` contra `schema` con el plan compilado. El DataFrame no se
+    copia ni se modifica (el tipado vive solo dentro del plan).
+    Si `df` es un iterador de DataFrames (chunks), valida en modo streaming:
+    memoria acotada por el tamaño del chunk y el mismo formato de reporte.
+    `unique_mode` (exact|bloom) aplica solo a ese modo; default DQ_UNIQUE_MODE.
+    `workers` (default DQ_WORKERS) reparte las columnas del DataFrame entre procesos.
+    """
+    plan = schema.compile()
+    with span("dq.validate", schema.source) as sp, profiled("dq.validate", schema.source):
+        if isinstance(df, pd.DataFrame):
+            ok, report = plan.run(df, workers or config.DQ_WORKERS)
+        else:
+            ok, report = plan.run_chunks(df, unique_mode or config.DQ_UNIQUE_MODE)
+        sp.rows = report.get("row_count")
+    path = _write_report(schema, ok, report)
     return ok, path, report
 
+#Lectura por chunks de un archivo RAW (desde su copia Parquet si existe; ver utils/columnar.py)
+def iter_file_chunks(path: str, chunksize: Optional[int] = None,
+                     columns: Optional[Sequence[str]] = None) -> Iterable[pd.DataFrame]:
+    from src.utils.columnar import iter_columnar  # import diferido: columnar importa este módulo
+    yield from iter_columnar(path, columns, chunksize or config.DQ_CHUNK_ROWS or 500_000)
+
 # ======== Esquemas para CSV capa RAW ==========
 EXPECTED_BOROUGHS = {"Manhattan","Brooklyn","Queens","Bronx","Staten Island"}
 
@@ -179,9 +505,10 @@ def schema_nyc_boroughs() -> DatasetSchema:
     )
 
 #API banxico
-def schema_banxico_raw() -> DatasetSchema:
+def schema_banxico_raw(source: str = "banxico") -> DatasetSchema:
+    # Una serie por archivo; las series adicionales usan su propio source (banxico_<serie>)
     return DatasetSchema(
-        source="banxico",
+        source=source,
         required_rows_min=1,
         rules=[
             ColumnRule("fecha", "date", required=True, allow_nulls=False, unique=True),
@@ -229,11 +556,28 @@ def schema_ab_nyc() -> DatasetSchema:
             ColumnRule("calculated_host_listings_count", "int", required=True, allow_nulls=False, min_value=0),
         ],
     )
+# Esquemas compilados una sola vez por proceso (el plan no depende de los datos)
+_SCHEMAS: Dict[str, DatasetSchema] = {}
+
+def _compiled(factory, *args) -> DatasetSchema:
+    key = ":".join((factory.__name__,) + args)
+    schema = _SCHEMAS.get(key)
+    if schema is None:
+        schema = _SCHEMAS[key] = factory(*args)
+        schema.compile()
+    return schema
+
 def validate_nyc_boroughs(df: pd.DataFrame):
-    return validate_df(df.copy(), schema_nyc_boroughs())
+    return validate_df(df, _compiled(schema_nyc_boroughs))
 
-def validate_banxico_raw(df: pd.DataFrame):
-    return validate_df(df.copy(), schema_banxico_raw())
+def validate_banxico_raw(df: pd.DataFrame, source: str = "banxico"):
+    return validate_df(df, _compiled(schema_banxico_raw, source))
 
 def validate_ab_nyc(df: pd.DataFrame):
-    return validate_df(df.copy(), schema_ab_nyc())
+    return validate_df(df, _compiled(schema_ab_nyc))
+
+def validate_ab_nyc_file(path: str, chunksize: Optional[int] = None):
+    """DQ de AB_NYC leyendo el archivo por chunks (no carga el CSV completo)."""
+    schema = _compiled(schema_ab_nyc)
+    columns = [r.name for r in schema.rules]  # proyección: solo las columnas con reglas
+    return validate_df(iter_file_chunks(path, chunksize, columns), schema)
@@ -1,8 +1,14 @@
 # src/utils/verify.py
 from __future__ import annotations
-import hashlib, json, os
+import hashlib, json, os, sqlite3, threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Iterable
+from typing import Iterable, Iterator
+
+try:  # fcntl solo existe en POSIX (contenedores); en Windows se omite el lock
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
 
 from src.utils.logger import get_logger
 
@@ -12,6 +18,16 @@ logger = get_logger(__name__)
 #   data/status/verify/<source>/manifest_raw.jsonl
 VERIFY_ROOT = os.path.join("data", "status", "verify")
 
+# Índice SQLite sincronizado con los JSONL (los JSONL siguen siendo la fuente de verdad):
+#   data/status/verify/manifest_index.sqlite
+INDEX_PATH = os.path.join(VERIFY_ROOT, "manifest_index.sqlite")
+
+# Versión del esquema del índice; si cambia, el índice se reconstruye desde los JSONL.
+_INDEX_VERSION = 2
+
+# Conexión al índice y estado de sincronización, por hilo (ver _index_state)
+_local = threading.local()
+
 
 
 # Helpers de ruta
@@ -38,6 +54,14 @@ def _iter_all_manifests() -> Iterable[str]:
                     yield os.path.join(root, f)
 
 
+def _norm_path(path: str | None) -> str | None:
+    """Path comparable entre manifests: separadores '/' y sin './' inicial (los viejos traen '\\')."""
+    if path is None:
+        return None
+    norm = path.replace("\\", "/")
+    return norm[2:] if norm.startswith("./") else norm
+
+
 
 # Verificaciones básicas
 
@@ -62,6 +86,272 @@ def md5sum(path: str, chunk: int = 1024 * 1024) -> str:
 
 
 
+# Índice de manifests (SQLite)
+#
+# - Cada línea de cada manifest_raw.jsonl se refleja en la tabla `records`.
+# - La tabla `manifests` guarda hasta qué byte se importó cada JSONL; sincronizar
+#   es leer solo la "cola" nueva, así que el costo no crece con el historial.
+# - WAL + BEGIN IMMEDIATE permiten varios extractores escribiendo a la vez.
+# - Cada hilo reutiliza su conexión y recuerda el tamaño de cada JSONL ya
+#   importado: una consulta solo hace stat de los manifests (sin abrir el
+#   índice de nuevo ni consultar offsets) y vuelve a recorrer VERIFY_ROOT solo
+#   si cambió su mtime (un source nuevo).
+
+def _manifest_key(manifest_path: str) -> str:
+    return os.path.normpath(manifest_path)
+
+
+def _create_index_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS records (
+            id        INTEGER PRIMARY KEY AUTOINCREMENT,
+            manifest  TEXT    NOT NULL,
+            ts_utc    TEXT    NOT NULL DEFAULT '',
+            source    TEXT,
+            path      TEXT,
+            path_norm TEXT,
+            md5       TEXT,
+            reference INTEGER NOT NULL DEFAULT 0,
+            rec       TEXT    NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_records_md5    ON records (md5, ts_utc)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_records_source ON records (source, ts_utc)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_records_path   ON records (path_norm, ts_utc)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS manifests (
+            manifest TEXT PRIMARY KEY,
+            offset   INTEGER NOT NULL
+        )
+        """
+    )
+
+
+def _open_index() -> sqlite3.Connection:
+    """
+    Abre una conexión al índice. Si el esquema no corresponde a
+    _INDEX_VERSION, lo recrea vacío; la sincronización posterior lo vuelve a
+    poblar desde los JSONL.
+    """
+    os.makedirs(os.path.dirname(INDEX_PATH), exist_ok=True)
+    conn = sqlite3.connect(INDEX_PATH, timeout=30, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != _INDEX_VERSION:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != _INDEX_VERSION:
+                conn.execute("DROP TABLE IF EXISTS records")
+                conn.execute("DROP TABLE IF EXISTS manifests")
+                _create_index_schema(conn)
+                conn.execute(f"PRAGMA user_version={_INDEX_VERSION}")
+            conn.execute("COMMIT")
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+def _index_state() -> dict:
+    """
+    Conexión del hilo al índice + estado de sincronización. Una por hilo y
+    proceso (sqlite3 no comparte conexiones entre hilos; un fork no hereda la
+    del padre); se reabre si el archivo del índice es otro (otro cwd, o fue
+    borrado/recreado).
+    """
+    path = os.path.abspath(INDEX_PATH)
+    try:
+        ino = os.stat(path).st_ino
+    except FileNotFoundError:
+        ino = None
+    state = getattr(_local, "state", None)
+    if state is None or state["pid"] != os.getpid() or state["path"] != path or state["ino"] != ino:
+        if state is not None and state["pid"] == os.getpid():
+            state["conn"].close()
+        conn = _open_index()
+        state = {
+            "pid": os.getpid(), "path": path, "ino": os.stat(path).st_ino, "conn": conn,
+            "synced": {},           # manifest → tamaño ya importado por este hilo
+            "root_mtime": None,     # mtime de VERIFY_ROOT del último recorrido
+            "manifests": [],
+        }
+        _local.state = state
+    return state
+
+
+@contextmanager
+def _index_conn() -> Iterator[sqlite3.Connection]:
+    """Conexión al índice del hilo actual (ver _index_state)."""
+    yield _index_state()["conn"]
+
+
+def _sync_manifest(conn: sqlite3.Connection, manifest_path: str) -> int:
+    """
+    Importa al índice las líneas nuevas de un manifest (desde el último offset).
+    Devuelve cuántos registros se importaron.
+    """
+    key = _manifest_key(manifest_path)
+    try:
+        size = os.path.getsize(manifest_path)
+    except FileNotFoundError:
+        return 0
+
+    row = conn.execute("SELECT offset FROM manifests WHERE manifest = ?", (key,)).fetchone()
+    if row is not None and row[0] == size:
+        return 0  # camino rápido: nada nuevo
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT offset FROM manifests WHERE manifest = ?", (key,)).fetchone()
+        offset = row[0] if row else 0
+        if offset > size:
+            # El JSONL fue truncado/reescrito → reimportar completo
+            conn.execute("DELETE FROM records WHERE manifest = ?", (key,))
+            offset = 0
+
+        with open(manifest_path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read(size - offset)
+        # Solo líneas completas: una escritura concurrente puede estar a medias
+        end = chunk.rfind(b"\n") + 1
+        imported = 0
+        for raw in chunk[:end].splitlines():
+            line = raw.decode("utf-8").strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            conn.execute(
+                "INSERT INTO records (manifest, ts_utc, source, path, path_norm, md5, reference, rec) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    rec.get("ts_utc", ""),
+                    rec.get("source"),
+                    rec.get("path"),
+                    _norm_path(rec.get("path")),
+                    rec.get("md5"),
+                    1 if rec.get("reference") else 0,
+                    json.dumps(rec, ensure_ascii=False),
+                ),
+            )
+            imported += 1
+
+        conn.execute(
+            "INSERT INTO manifests (manifest, offset) VALUES (?, ?) "
+            "ON CONFLICT(manifest) DO UPDATE SET offset = excluded.offset",
+            (key, offset + end),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return imported
+
+
+def _known_manifests(state: dict) -> list[str]:
+    """
+    Manifests bajo VERIFY_ROOT; el árbol se recorre de nuevo solo si cambió el
+    mtime de VERIFY_ROOT (carpeta de un source nuevo). Incluye el manifest
+    esperado de cada carpeta de source aunque todavía no exista.
+    """
+    try:
+        mtime = os.stat(VERIFY_ROOT).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    if state["root_mtime"] != mtime:
+        found = set(_iter_all_manifests())
+        with os.scandir(VERIFY_ROOT) as it:
+            found.update(os.path.join(e.path, "manifest_raw.jsonl") for e in it if e.is_dir())
+        state["root_mtime"], state["manifests"] = mtime, sorted(found)
+    return state["manifests"]
+
+
+def _sync_changed(state: dict, manifests: Iterable[str] | None = None) -> int:
+    """Sincroniza solo los manifests cuyo tamaño cambió desde la última vez (en este hilo)."""
+    paths = list(manifests) if manifests is not None else _known_manifests(state)
+    imported = 0
+    for mf in paths:
+        try:
+            size = os.path.getsize(mf)
+        except FileNotFoundError:
+            continue
+        key = _manifest_key(mf)
+        if state["synced"].get(key) != size:
+            imported += _sync_manifest(state["conn"], mf)
+            state["synced"][key] = size
+    return imported
+
+
+def sync_index(manifests: Iterable[str] | None = None) -> int:
+    """
+    Sincroniza el índice con los manifests indicados (o con todos los de
+    data/status/verify/**). Devuelve el total de registros nuevos importados.
+    """
+    paths = list(manifests) if manifests is not None else list(_iter_all_manifests())
+    state = _index_state()
+    imported = 0
+    for mf in paths:
+        try:
+            size = os.path.getsize(mf)  # antes de importar: lo que crezca después se vuelve a leer
+        except FileNotFoundError:
+            size = None
+        imported += _sync_manifest(state["conn"], mf)
+        if size is not None:
+            state["synced"][_manifest_key(mf)] = size
+    return imported
+
+
+def rebuild_index() -> int:
+    """
+    Importador one-shot: descarta el índice y lo reconstruye desde todos los
+    manifest_raw.jsonl existentes. Devuelve el total de registros importados.
+    """
+    with _index_conn() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM records")
+        conn.execute("DELETE FROM manifests")
+        conn.execute("COMMIT")
+        _index_state()["synced"].clear()
+        total = sum(_sync_manifest(conn, mf) for mf in _iter_all_manifests())
+    logger.info(f"[verify] index_rebuilt records={total} index={INDEX_PATH}")
+    return total
+
+
+def _query_one(sql: str, params: tuple, manifests: Iterable[str] | None = None) -> dict | None:
+    """Sincroniza (solo lo que cambió) y ejecuta una consulta que devuelve (a lo sumo) un registro."""
+    state = _index_state()
+    _sync_changed(state, manifests)
+    row = state["conn"].execute(sql, params).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _append_record(manifest_path: str, rec: dict) -> None:
+    """
+    Agrega una línea al manifest con lock exclusivo (varios extractores pueden
+    escribir a la vez) y deja el índice sincronizado.
+    """
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    line = json.dumps(rec, ensure_ascii=False) + "\n"
+    with open(manifest_path, "a", encoding="utf-8") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            f.write(line)
+            f.flush()
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    sync_index([manifest_path])
+
+
+
 # Dedupe + registro
 
 def is_duplicate(path: str, md5: str, registry_path: str | None = None) -> bool:
@@ -69,82 +359,104 @@ def is_duplicate(path: str, md5: str, registry_path: str | None = None) -> bool:
     Devuelve True si ya existe un registro con el mismo MD5.
     - Si registry_path se pasa y existe, solo busca allí.
     - Si no, busca en TODOS los manifests bajo data/status/verify/**.
+    La búsqueda se resuelve en el índice (no recorre los JSONL).
     """
     if registry_path and os.path.exists(registry_path):
-        manifests = [registry_path]
+        rec = _query_one(
+            "SELECT rec FROM records WHERE md5 = ? AND manifest = ? LIMIT 1",
+            (md5, _manifest_key(registry_path)),
+            manifests=[registry_path],
+        )
     else:
-        manifests = list(_iter_all_manifests())
+        rec = _query_one("SELECT rec FROM records WHERE md5 = ? LIMIT 1", (md5,))
 
-    for mf in manifests:
-        try:
-            with open(mf, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        rec = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    if rec.get("md5") == md5:
-                        logger.warning(
-                            f"[verify] duplicate_detected source={rec.get('source')} "
-                            f"path={path} == {rec.get('path')} md5={md5}"
-                        )
-                        return True
-        except FileNotFoundError:
-            continue
+    if rec is not None:
+        logger.warning(
+            f"[verify] duplicate_detected source={rec.get('source')} "
+            f"path={path} == {rec.get('path')} md5={md5}"
+        )
+        return True
     return False
 
 
-def register_file(path: str, source: str, md5: str, registry_path: str | None = None) -> None:
+def register_file(path: str, source: str, md5: str, registry_path: str | None = None,
+                  extra: dict | None = None) -> None:
     """
     Registra el archivo en el manifest por source:
       data/status/verify/<source>/manifest_raw.jsonl
     - Si registry_path se pasa, escribe allí (modo compatibilidad).
+    - extra: campos adicionales del registro (p.ej. "delta" de AB_NYC).
     """
     manifest_path = registry_path or _manifest_path_for(source)
-    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
 
     rec = {
         "ts_utc": f"{datetime.utcnow():%Y-%m-%dT%H:%M:%SZ}",
         "source": source,
         "path": path,
         "md5": md5,
+        **(extra or {}),
     }
-
-    with open(manifest_path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    _append_record(manifest_path, rec)
 
     logger.info(
         f"[verify] registered source={source} path={path} md5={md5} manifest={manifest_path}"
     )
 # === Obtener el último registro por MD5 (para reutilizar path) ===
-def find_last_record_by_md5(md5: str) -> dict | None:
+def find_last_record_by_md5(md5: str, source: str | None = None) -> dict | None:
     """
     Devuelve el último registro (por ts_utc) en todos los manifests que tenga ese md5.
+    Si se pasa `source`, restringe la búsqueda a ese source.
     """
-    last = None
-    last_ts = ""
-    for mf in _iter_all_manifests():
-        try:
-            with open(mf, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        rec = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    if rec.get("md5") == md5:
-                        ts = rec.get("ts_utc", "")
-                        if ts >= last_ts:
-                            last = rec
-                            last_ts = ts
-        except FileNotFoundError:
-            continue
-    return last
+    if source is None:
+        return _query_one(
+            "SELECT rec FROM records WHERE md5 = ? ORDER BY ts_utc DESC, id DESC LIMIT 1",
+            (md5,),
+        )
+    return _query_one(
+        "SELECT rec FROM records WHERE md5 = ? AND source = ? ORDER BY ts_utc DESC, id DESC LIMIT 1",
+        (md5, source),
+    )
+
+
+def find_last_record(source: str, include_references: bool = True) -> dict | None:
+    """
+    Devuelve el último registro (por ts_utc) de un source.
+    Con include_references=False ignora las referencias diarias y devuelve
+    la última versión realmente copiada a RAW.
+    """
+    sql = "SELECT rec FROM records WHERE source = ?"
+    if not include_references:
+        sql += " AND reference = 0"
+    sql += " ORDER BY ts_utc DESC, id DESC LIMIT 1"
+    return _query_one(sql, (source,))
+
+def list_records(source: str, include_references: bool = False) -> list[dict]:
+    """
+    Devuelve los registros de un source en orden de llegada (ts_utc, id).
+    Por default solo las versiones copiadas a RAW (sin referencias diarias).
+    """
+    sql = "SELECT rec FROM records WHERE source = ?"
+    if not include_references:
+        sql += " AND reference = 0"
+    sql += " ORDER BY ts_utc, id"
+    state = _index_state()
+    _sync_changed(state)
+    rows = state["conn"].execute(sql, (source,)).fetchall()
+    return [json.loads(r[0]) for r in rows]
+
+def find_last_record_by_path(path: str, source: str | None = None) -> dict | None:
+    """
+    Devuelve el último registro de un path ya publicado en RAW (o None).
+    Compara por path_norm (separadores '/', sin './'; los manifests viejos
+    traen '\\'), con índice.
+    """
+    sql = "SELECT rec FROM records WHERE path_norm = ?"
+    params: tuple = (_norm_path(path),)
+    if source:
+        sql += " AND source = ?"
+        params += (source,)
+    sql += " ORDER BY ts_utc DESC, id DESC LIMIT 1"
+    return _query_one(sql, params)
 
 # === Registrar una “referencia diaria” (sin copiar) ===
 def register_reference(source: str, path: str, md5: str) -> None:
@@ -153,7 +465,6 @@ def register_reference(source: str, path: str, md5: str) -> None:
     usó la misma versión (sin nueva copia).
     """
     manifest_path = _manifest_path_for(source)
-    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
     rec = {
         "ts_utc": f"{datetime.utcnow():%Y-%m-%dT%H:%M:%SZ}",
         "source": source,
@@ -161,6 +472,80 @@ def register_reference(source: str, path: str, md5: str) -> None:
         "md5": md5,
         "reference": True
     }
-    with open(manifest_path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-    logger.info(f"[verify] reference_registered source={source} path={path} md5={md5} manifest={manifest_path}")
\ No newline at end of file
+    _append_record(manifest_path, rec)
+    logger.info(f"[verify] reference_registered source={source} path={path} md5={md5} manifest={manifest_path}")
+
+
+
+# === Fingerprint por stat (path, size, mtime_ns, inode) ===
+# Si el fuente no cambió según stat, el extractor puede saltarse lectura y hash.
+# Se guarda junto al manifest: data/status/verify/<source>/fingerprint.json
+
+def file_fingerprint(path: str) -> dict:
+    """Llave barata de 'mismo archivo': no lee contenido, solo os.stat()."""
+    st = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "inode": st.st_ino,
+    }
+
+
+def _fingerprint_path_for(source: str) -> str:
+    return os.path.join(os.path.dirname(_manifest_path_for(source)), "fingerprint.json")
+
+
+def load_fingerprint(source: str) -> dict | None:
+    """Devuelve la entrada cacheada del source (o None si no hay / está corrupta)."""
+    path = _fingerprint_path_for(source)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_fingerprint(source: str, **fields) -> dict:
+    """
+    Actualiza (merge) la entrada cacheada del source y la escribe de forma
+    atómica (tmp + rename). Devuelve la entrada resultante.
+    """
+    entry = load_fingerprint(source) or {}
+    entry.update(fields)
+    entry["ts_utc"] = f"{datetime.utcnow():%Y-%m-%dT%H:%M:%SZ}"
+    path = _fingerprint_path_for(source)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+    return entry
+
+
+def fingerprint_hit(source: str, path: str) -> dict | None:
+    """
+    Devuelve la entrada cacheada si el stat actual de `path` coincide con el
+    guardado y la versión RAW registrada sigue existiendo; si no, None.
+    """
+    entry = load_fingerprint(source)
+    if not entry or entry.get("key") != file_fingerprint(path):
+        return None
+    if not entry.get("raw_path") or not os.path.exists(entry["raw_path"]):
+        return None
+    return entry
+
+if __name__ == "__main__":
+    # Importador one-shot de los JSONL existentes:
+    #   python -m src.utils.verify --rebuild-index
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Índice de manifests RAW")
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="Reconstruye el índice SQLite desde todos los manifest_raw.jsonl")
+    args = parser.parse_args()
+
+    if args.rebuild_index:
+        n = rebuild_index()
+    else:
+        n = sync_index()
+    print(f"registros importados: {n} | índice: {INDEX_PATH}")
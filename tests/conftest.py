@@ -0,0 +1,22 @@
+# tests/conftest.py
+"""
+Fixtures comunes. Las rutas del pipeline (data/raw, data/status/verify) son
+relativas al cwd: cada test corre en un árbol vacío bajo tmp_path.
+
+Ejecución (desde la raíz del repo):
+    python -m pytest -q
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """cwd = tmp_path (data/ vacío)."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,56 @@
+# tests/test_pg_copy.py
+"""Carga RAW → Postgres con registros del manifest con rutas de Windows ('\\')."""
+
+import json
+import os
+from datetime import date
+
+import src.load.pg_copy as pg_copy
+from src.backfill import plan
+
+MD5 = "f772a1d8d29bae6e7a9beac0ae880a2b"
+
+
+def _legacy_manifest(source: str) -> str:
+    """Archivo RAW real + registro de manifest con el path como lo dejaba la versión vieja."""
+    rel = os.path.join("data", "raw", "files", source, "2025", "08", "28", f"{source}_20250828T194408Z.csv")
+    os.makedirs(os.path.dirname(rel))
+    with open(rel, "w", encoding="utf-8") as f:
+        f.write("borough,population\nBronx,1\n")
+    legacy = f"./data/raw\\files\\{source}\\2025/08/28\\{source}_20250828T194408Z.csv"
+    out = os.path.join("data", "status", "verify", source)
+    os.makedirs(out)
+    with open(os.path.join(out, "manifest_raw.jsonl"), "w", encoding="utf-8") as f:
+        rec = {"ts_utc": "2025-08-28T19:44:08Z", "source": source, "path": legacy, "md5": MD5}
+        f.write(json.dumps(rec) + "\n")
+    return legacy
+
+
+def test_load_source_normaliza_path_legacy(workdir, monkeypatch):
+    legacy = _legacy_manifest("nyc_boroughs")
+    assert not os.path.exists(legacy)
+
+    loaded, latest = [], []
+    monkeypatch.setattr(pg_copy, "_loaded_md5s", lambda conn, source: set())
+    monkeypatch.setattr(pg_copy, "_analyze", lambda conn, parts: None)
+    monkeypatch.setattr(pg_copy, "load_file",
+                        lambda conn, table, source, rec: loaded.append(rec) or ("nyc_boroughs_20250828", 1))
+    monkeypatch.setattr(pg_copy, "_set_latest",
+                        lambda conn, dataset, source, md5: latest.append(md5) or date(2025, 8, 28))
+
+    res = pg_copy.load_source(None, "nyc_boroughs", "nyc_boroughs", "nyc_boroughs")
+
+    path = "data/raw/files/nyc_boroughs/2025/08/28/nyc_boroughs_20250828T194408Z.csv"
+    assert [r["path"] for r in loaded] == [path]
+    assert os.path.exists(path)
+    assert pg_copy.load_date_for(loaded[0]) == date(2025, 8, 28)
+    assert res["rows"] == 1 and res["latest_md5"] == MD5
+    assert latest == [MD5]
+
+
+def test_backfill_plan_normaliza_path_legacy(workdir):
+    _legacy_manifest("ab_nyc")
+    entries, skipped = plan(date(2025, 8, 28), date(2025, 8, 29), source="ab_nyc")
+    assert skipped == []
+    assert {e["path"] for e in entries} == {"data/raw/files/ab_nyc/2025/08/28/ab_nyc_20250828T194408Z.csv"}
+    assert all(os.path.exists(e["path"]) for e in entries)
@@ -0,0 +1,53 @@
+# tests/test_quality.py
+"""Unicidad en streaming (run_chunks) contra pandas, con duplicados entre chunks y NaN."""
+
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.quality import ColumnRule, DatasetSchema, _UniqueTracker
+
+
+def _frame() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    n = 5_000
+    ids = rng.integers(0, 4_000, n).astype("float64")   # repetidos en chunks distintos
+    ids[rng.choice(n, 40, replace=False)] = np.nan         # NaN repetidos cuentan como iguales
+    names = pd.Series(rng.integers(0, 3_000, n)).map("h{}".format).astype(object)
+    names[rng.choice(n, 25, replace=False)] = None
+    return pd.DataFrame({"id": ids, "name": names})
+
+
+def _unique_violations(df: pd.DataFrame, chunksize: int, mode: str) -> dict:
+    schema = DatasetSchema("test_unique", [
+        ColumnRule("id", "float", allow_nulls=True, unique=True),
+        ColumnRule("name", "str", allow_nulls=True, unique=True),
+    ])
+    chunks = (df.iloc[i:i + chunksize] for i in range(0, len(df), chunksize))
+    _, report = schema.compile().run_chunks(chunks, unique_mode=mode)
+    out = {}
+    for c in ("id", "name"):
+        issues = " ".join(report["by_column"][c].get("issues", []))
+        m = re.search(r"unique_violations \((\d+)\)", issues)
+        out[c] = int(m.group(1)) if m else 0
+    return out
+
+
+@pytest.mark.parametrize("chunksize", [1, 7, 333, 5_000])
+def test_exact_igual_a_duplicated_keep_false(chunksize):
+    df = _frame()
+    expected = {c: int(df[c].duplicated(keep=False).sum()) for c in ("id", "name")}
+    assert _unique_violations(df, chunksize, "exact") == expected
+
+
+def test_exact_muchos_chunks_sin_repetidos():
+    t = _UniqueTracker("exact")
+    for i in range(200):
+        h = np.arange(i * 50, (i + 1) * 50, dtype="uint64")
+        t.add(h, np.ones(len(h), dtype="int64"), 0)
+    assert t.violations() == 0
+    assert len(t._runs) <= 10  # tramos fusionados: O(log n), no uno por chunk
+    t.add(np.array([0, 9_999], dtype="uint64"), np.ones(2, dtype="int64"), 0)
+    assert t.violations() == 4